@@ -7,6 +7,72 @@ ELECTRICITY_INGEST_FOLDER = "./emission_calculator_backend/import/electricity/"
 
 MILES_TO_KM_CONVERSION = 1.60934
 
+# Number of distinct date strings memoised by the ingest date parser
+DATE_CACHE_SIZE = 4096
+
+# "batch" inserts rows with bulk_create, "strict" saves each row through its serializer (debug mode)
+INGEST_WRITE_MODE = "batch"
+INGEST_BATCH_SIZE = 5000
+# Number of activity rows loaded into arrays for each CO2e calculation
+INGEST_CHUNK_SIZE = 10000
+# Number of processes parsing activity files in parallel. 1 ingests files sequentially
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", 1))
+# Activity files of at least this many bytes are split into byte ranges parsed in parallel, when INGEST_WORKERS > 1
+INGEST_LARGE_FILE_SIZE = 256 * 1024 * 1024
+# Target number of bytes per range for large activity files
+INGEST_RANGE_SIZE = 32 * 1024 * 1024
+# Skip files already ingested with the same content, as recorded in the ingest manifest table
+INGEST_INCREMENTAL = True
+
+# Folder ingest run reports are written to. Set to None to not write report files
+INGEST_REPORT_FOLDER = "./emission_calculator_backend/ingest_runs/"
+INGEST_STORE_RUN = True
+# Number of rejected rows buffered before being written to the run's rejects file
+INGEST_REJECTS_BUFFER_SIZE = 10000
+# Number of rejected rows logged as samples at the end of a run
+INGEST_REJECTS_SAMPLE_SIZE = 10
+
+# Folder CSV files uploaded through the ingest API are written to, in a folder per ingest job
+INGEST_UPLOAD_FOLDER = "./emission_calculator_backend/uploads/"
+# Number of bytes read from the request body and written to disk at a time
+INGEST_UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Number of background threads running ingest jobs
+INGEST_JOB_WORKERS = int(os.environ.get("INGEST_JOB_WORKERS", 2))
+# Number of times a failed ingest job is run before it is marked as failed
+INGEST_JOB_MAX_ATTEMPTS = 3
+# Seconds before a failed ingest job is retried, doubled after each failed attempt
+INGEST_JOB_RETRY_BACKOFF = 30
+# Number of ingest jobs run at the same time for each activity, so ingests of the same tables do not clash.
+# Activities not listed can run INGEST_ACTIVITY_CONCURRENCY_DEFAULT jobs at a time
+INGEST_ACTIVITY_CONCURRENCY = {}
+INGEST_ACTIVITY_CONCURRENCY_DEFAULT = 1
+# Seconds after which a running ingest job is treated as stopped, eg after a restart, and queued again
+INGEST_JOB_STALE_SECONDS = 6 * 60 * 60
+# Seconds between checks of the ingest job queue and schedules
+INGEST_QUEUE_POLL_SECONDS = 5
+# Recurring ingests of an activity's folder, with a cron expression in UTC, eg:
+# {"name": "nightly electricity", "activity": "electricity", "path": ELECTRICITY_INGEST_FOLDER, "cron": "0 2 * * *"}
+INGEST_SCHEDULES = []
+
+# Default and maximum number of rows per page of the emissions response
+EMISSIONS_PAGE_SIZE = 1000
+EMISSIONS_MAX_PAGE_SIZE = 10000
+# Number of rows fetched from the database and written to the client at a time by the emissions export
+EMISSIONS_EXPORT_CHUNK_SIZE = 5000
+
+# Django cache backend emission responses are cached in, keyed by the data version bumped on each ingest.
+# "django.core.cache.backends.filebased.FileBasedCache" shares the cache between server processes
+RESPONSE_CACHE_BACKEND = "django.core.cache.backends.locmem.LocMemCache"
+# Local memory cache name, or folder for the file based cache
+RESPONSE_CACHE_LOCATION = "emission-responses"
+# Number of cached responses kept. When full, a third are evicted, least recently used first in local memory
+RESPONSE_CACHE_MAX_ENTRIES = 256
+# Responses with more JSON bytes than this are not cached, so one large page cannot fill the cache
+RESPONSE_CACHE_MAX_ENTRY_SIZE = 8 * 1024 * 1024
+# Seconds the data version is cached for, so cached and unchanged (304) responses need no queries.
+# Ingests in another process are seen after this delay, unless the cache is shared between processes
+DATA_VERSION_CACHE_SECONDS = 5
+
 LOG_LEVEL = "INFO"
 
 ORIGIN = os.environ.get("ORIGIN", "239.255.255.250")
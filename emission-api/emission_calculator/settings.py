@@ -12,7 +12,12 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 import sys
-from config import ORIGIN
+from config import (
+    ORIGIN,
+    RESPONSE_CACHE_BACKEND,
+    RESPONSE_CACHE_LOCATION,
+    RESPONSE_CACHE_MAX_ENTRIES,
+)
 
 # Build paths inside the project like this: BASE_DIR / "subdir".
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -100,6 +105,23 @@ DATABASES = {
 }
 
 
+# Caches
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Emission responses, keyed by data version so entries are never served after an ingest
+    "responses": {
+        "BACKEND": RESPONSE_CACHE_BACKEND,
+        "LOCATION": RESPONSE_CACHE_LOCATION,
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": RESPONSE_CACHE_MAX_ENTRIES},
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -26,4 +26,9 @@ urlpatterns = [
     path("auth/login/", auth_views.user_login, name="login"),
     path("auth/logout/", auth_views.user_logout, name="logout"),
     path("emissions/", emission_views.emissions, name="emissions"),
+    path("emissions/timeseries/", emission_views.emissions_timeseries, name="emissions_timeseries"),
+    path("emissions/export/<str:export_format>/", emission_views.emissions_export, name="emissions_export"),
+    path("emissions/cache/", emission_views.response_cache_stats, name="response_cache_stats"),
+    path("ingest/upload/", emission_views.ingest_upload, name="ingest_upload"),
+    path("ingest/jobs/<int:job_id>/", emission_views.ingest_job, name="ingest_job"),
 ]
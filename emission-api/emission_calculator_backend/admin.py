@@ -6,3 +6,9 @@ admin.site.register(models.EmissionFactors)
 admin.site.register(models.AirTravel)
 admin.site.register(models.PurchasedGoodsAndServices)
 admin.site.register(models.Electricity)
+admin.site.register(models.IngestManifest)
+admin.site.register(models.IngestRun)
+admin.site.register(models.IngestJob)
+admin.site.register(models.IngestSchedule)
+admin.site.register(models.EmissionSummary)
+admin.site.register(models.DataVersion)
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class EmissionCalculatorBackendConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "emission_calculator_backend"
+
+    def ready(self):
+        from django.db.models.signals import pre_delete
+
+        import emission_calculator_backend.models as models
+        from emission_calculator_backend.ingest import summary
+
+        # Rows deleted with their file's manifest entry are removed from the emission summary
+        pre_delete.connect(summary.remove_file_rows, sender=models.IngestManifest)
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import logging
+import threading
+
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+
+import emission_calculator_backend.models as models
+import config
+
+logger = logging.getLogger("root")
+
+# Name of the data version bumped each time activity rows are ingested, replaced or recalculated
+EMISSIONS_DATA = "emissions"
+
+RESPONSE_CACHE_ALIAS = "responses"
+
+
+def _data_version_key(name: str) -> str:
+    return f"data_version:{name}"
+
+
+def data_version(name: str = EMISSIONS_DATA) -> int:
+    """
+    Function returning the current version of a data set. The version is cached for
+    DATA_VERSION_CACHE_SECONDS, so repeated reads do not query the database
+
+    :param name: Data set name
+
+    :return: Data version, 0 if the data set has never changed
+    """
+    backend = caches[RESPONSE_CACHE_ALIAS]
+    version = backend.get(_data_version_key(name))
+    if version is None:
+        version = models.DataVersion.objects.filter(name=name).values_list("version", flat=True).first() or 0
+        backend.set(_data_version_key(name), version, config.DATA_VERSION_CACHE_SECONDS)
+    return version
+
+
+def bump_data_version(name: str = EMISSIONS_DATA) -> None:
+    """
+    Function to increment the version of a data set, in the caller's transaction, so the new version is
+    read by other connections once the changed rows are committed. The cached version is removed now,
+    and again once the transaction commits, in case it was cached by another request in between
+
+    :param name: Data set name
+    """
+    updated = models.DataVersion.objects.filter(name=name).update(version=F("version") + 1)
+    if not updated:
+        models.DataVersion.objects.create(name=name, version=1)
+
+    backend = caches[RESPONSE_CACHE_ALIAS]
+    backend.delete(_data_version_key(name))
+    transaction.on_commit(lambda: backend.delete(_data_version_key(name)))
+
+
+def versioned_etag(request, *args, **kwargs) -> str:
+    """
+    Function returning a strong ETag for an emission read endpoint, from the emissions data version and the
+    request's path and query parameters, for use with Django's condition decorator
+
+    :param request: HTTP request
+
+    :return: ETag, without quotes
+    """
+    query = sorted((key, value) for key, values in request.GET.lists() for value in values)
+    content = json.dumps([data_version(), request.path, query])
+    return hashlib.sha256(content.encode()).hexdigest()[:32]
+
+
+class ResponseCache:
+    """
+    Cache of API response payloads, keyed by the data version they were built from. Entries built from an older
+    version are never read again, and are evicted by the cache backend as new entries are added.
+    Hit and miss counts are kept for this process
+
+    :param alias: Django cache alias, as configured in CACHES
+    :param max_entry_size: Responses with more JSON bytes than this are not cached
+    """
+
+    def __init__(self, alias: str = RESPONSE_CACHE_ALIAS, max_entry_size: int = config.RESPONSE_CACHE_MAX_ENTRY_SIZE):
+        self.alias = alias
+        self.max_entry_size = max_entry_size
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def key(self, prefix: str, version: int, *parts) -> str:
+        """
+        Function returning the cache key of a response
+
+        :param prefix: Response name, eg the endpoint
+        :param version: Data version the response is built from
+        :param parts: Request parameters the response depends on
+
+        :return: Cache key
+        """
+        # Parameters are hashed, so keys are valid for every cache backend whatever the parameter values
+        parts_hash = hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()
+        return f"{prefix}:{version}:{parts_hash}"
+
+    def get(self, key: str):
+        """
+        Function returning a cached response, counting the lookup as a hit or miss
+
+        :param key: Cache key
+
+        :return: Cached response, or None if not cached
+        """
+        response = self.backend.get(key)
+        with self._lock:
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return response
+
+    def set(self, key: str, response) -> bool:
+        """
+        Function to cache a response, unless it is larger than the maximum entry size
+
+        :param key: Cache key
+        :param response: JSON serialisable response
+
+        :return: True if the response was cached
+        """
+        size = len(json.dumps(response))
+        if size > self.max_entry_size:
+            with self._lock:
+                self.skipped += 1
+            logger.debug(f"Response not cached, {size} bytes is over the maximum entry size: {key}")
+            return False
+        self.backend.set(key, response)
+        return True
+
+    def clear(self) -> None:
+        """
+        Function to remove every cached response, and reset the hit and miss counts
+        """
+        self.backend.clear()
+        with self._lock:
+            self.hits = self.misses = self.skipped = 0
+
+    def stats(self) -> dict:
+        """
+        Function returning the hit and miss counts of this process
+
+        :return: Dictionary of cache metrics
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": f"{type(self.backend).__module__}.{type(self.backend).__name__}",
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0,
+                "skipped": self.skipped,
+            }
+
+
+# Cache shared by the API views in this process
+response_cache = ResponseCache()
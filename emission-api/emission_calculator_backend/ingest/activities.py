@@ -0,0 +1,106 @@
+import emission_calculator_backend.serializers as serializers
+import emission_calculator_backend.models as models
+from emission_calculator_backend.ingest.calculation import DISTANCE_UNIT_CONVERSIONS
+import config
+
+
+class ActivityType:
+    """
+    Declaration of an activity type ingested by the ingest engine. Rows are validated through the input
+    class, joined to the emission factors on (activity, lookup field, unit), and CO2e is calculated from
+    the quantity field. Input class fields are saved to the model fields of the same name, with the
+    calculated CO2e, scope and category
+
+    :param name: Activity name, as used in the emission factor files
+    :param folder: Default ingest folder path
+    :param input_class: Input class used to validate each row
+    :param model: Model rows are saved to
+    :param serializer_class: Serializer for the model
+    :param lookup_field: Field joined to the emission factor lookup identifier
+    :param quantity_field: Field CO2e is calculated from
+    :param unit_field: Field with the quantity's unit
+    :param unit_conversions: Coefficient for each unit to convert quantities into the standard unit, if any
+    :param standard_unit: Unit quantities are converted to, and saved with
+    """
+
+    def __init__(
+        self,
+        name: str,
+        folder: str,
+        input_class,
+        model,
+        serializer_class,
+        lookup_field: str,
+        quantity_field: str,
+        unit_field: str,
+        unit_conversions: dict = None,
+        standard_unit: str = None,
+    ):
+        self.name = name
+        self.folder = folder
+        self.input_class = input_class
+        self.model = model
+        self.serializer_class = serializer_class
+        self.lookup_field = lookup_field
+        self.quantity_field = quantity_field
+        self.unit_field = unit_field
+        self.unit_conversions = unit_conversions
+        self.standard_unit = standard_unit
+        # Fields copied from each input object to the model
+        self.fields = input_class.__slots__
+
+    def __repr__(self):
+        return f"ActivityType({self.name!r})"
+
+
+ACTIVITY_TYPES = {}
+
+
+def register(activity_type: ActivityType) -> ActivityType:
+    """
+    Function to add an activity type to the registry, so it is ingested and recalculated with the others
+
+    :param activity_type: Activity type declaration
+
+    :return: Registered activity type
+    """
+    if activity_type.name in ACTIVITY_TYPES:
+        raise ValueError(f"Activity type already registered: {activity_type.name}")
+    ACTIVITY_TYPES[activity_type.name] = activity_type
+    return activity_type
+
+
+AIR_TRAVEL = register(ActivityType(
+    name="air travel",
+    folder=config.AIR_TRAVEL_INGEST_FOLDER,
+    input_class=models.InputAirTravel,
+    model=models.AirTravel,
+    serializer_class=serializers.AirTravelSerializer,
+    lookup_field="booking_type",
+    quantity_field="distance_travelled",
+    unit_field="distance_unit",
+    unit_conversions=DISTANCE_UNIT_CONVERSIONS,
+    standard_unit="kilometres",
+))
+
+PURCHASED_GOODS_AND_SERVICES = register(ActivityType(
+    name="purchased goods and services",
+    folder=config.GOODS_AND_SERVICES_INGEST_FOLDER,
+    input_class=models.InputPurchasedGoodsAndServices,
+    model=models.PurchasedGoodsAndServices,
+    serializer_class=serializers.PurchasedGoodsAndServicesSerializer,
+    lookup_field="supplier_category",
+    quantity_field="spend",
+    unit_field="spend_unit",
+))
+
+ELECTRICITY = register(ActivityType(
+    name="electricity",
+    folder=config.ELECTRICITY_INGEST_FOLDER,
+    input_class=models.InputElectricity,
+    model=models.Electricity,
+    serializer_class=serializers.ElectricitySerializer,
+    lookup_field="country",
+    quantity_field="electricity_usage",
+    unit_field="unit",
+))
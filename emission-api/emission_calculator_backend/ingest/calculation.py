@@ -0,0 +1,108 @@
+from contextlib import nullcontext
+
+import numpy as np
+
+from emission_calculator_backend.ingest.factor_index import EmissionFactorIndex
+from emission_calculator_backend.ingest.report import IngestReport
+import config
+
+# Coefficients to convert each distance unit into kilometres
+DISTANCE_UNIT_CONVERSIONS = {
+    "miles": config.MILES_TO_KM_CONVERSION,
+    "kilometres": 1.0,
+}
+
+KEY_SEPARATOR = "\x1f"
+
+
+def convert_units(quantities: np.ndarray, units: list, conversions: dict) -> np.ndarray:
+    """
+    Function to convert a column of quantities into a standard unit
+
+    :param quantities: Quantity for each row
+    :param units: Unit of measure for each row, validated to be a key of the conversions
+    :param conversions: Coefficient for each unit to convert into the standard unit
+
+    :return: Converted quantities
+    """
+    units = np.asarray(units)
+    coefficients = np.ones(len(quantities))
+
+    for unit, coefficient in conversions.items():
+        coefficients[units == unit] = coefficient
+
+    return quantities * coefficients
+
+
+class EmissionCalculation:
+    """
+    CO2e, scope and category calculated for a chunk of activity rows
+    """
+
+    def __init__(self, co2e: np.ndarray, scope: np.ndarray, category: np.ndarray, matched: np.ndarray):
+        self.co2e = co2e
+        self.scope = scope
+        self.category = category
+        self.matched = matched
+
+    def rows(self):
+        """
+        Function returning the calculated values for each row as Python types
+
+        :return: Iterator of (matched, co2e, scope, category) tuples
+        """
+        return zip(self.matched.tolist(), self.co2e.tolist(), self.scope.tolist(), self.category.tolist())
+
+
+def calculate_emissions(
+    factor_index: EmissionFactorIndex,
+    activities: list,
+    lookup_identifiers: list,
+    units: list,
+    quantities: np.ndarray,
+    report: IngestReport = None,
+) -> EmissionCalculation:
+    """
+    Function to calculate emissions for a chunk of activity rows at once.
+    Rows are joined to the emission factor table through their unique keys, so the factor
+    index is only queried once per distinct key rather than once per row
+
+    :param factor_index: Emission factor index
+    :param activities: Activity name for each row
+    :param lookup_identifiers: Identifier for the specific activity for each row
+    :param units: Unit of measure for each row
+    :param quantities: Quantity (distance, spend or usage) for each row
+    :param report: Ingest report timing the factor lookup and CO2e calculation stages, if given
+
+    :return: Calculated emissions for the chunk. Rows without an emission factor are not matched
+    """
+    def stage(name: str):
+        return report.stage(name) if report else nullcontext()
+
+    with stage("factor_lookup"):
+        keys = np.char.add(
+            np.char.add(np.char.add(activities, KEY_SEPARATOR), np.char.add(lookup_identifiers, KEY_SEPARATOR)),
+            units,
+        )
+        unique_keys, key_indices = np.unique(keys, return_inverse=True)
+
+        factor_co2e = np.zeros(len(unique_keys))
+        factor_scope = np.zeros(len(unique_keys), dtype=object)
+        factor_category = np.full(len(unique_keys), None, dtype=object)
+        factor_found = np.zeros(len(unique_keys), dtype=bool)
+
+        for i, key in enumerate(unique_keys.tolist()):
+            emission_factor_obj = factor_index.get(*key.split(KEY_SEPARATOR))
+            if emission_factor_obj:
+                factor_co2e[i] = emission_factor_obj.co2e
+                factor_scope[i] = emission_factor_obj.scope
+                factor_category[i] = emission_factor_obj.category
+                factor_found[i] = True
+
+    with stage("co2e_calculation"):
+        return EmissionCalculation(
+            co2e=factor_co2e[key_indices] * quantities,
+            scope=factor_scope[key_indices],
+            category=factor_category[key_indices],
+            matched=factor_found[key_indices],
+        )
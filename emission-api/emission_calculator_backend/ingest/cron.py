@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+
+# (name, minimum, maximum) of each cron expression field
+FIELDS = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day of month", 1, 31),
+    ("month", 1, 12),
+    # 0 and 7 are both Sunday
+    ("day of week", 0, 7),
+)
+
+# Number of days searched for the next run time, so expressions that never match (eg 30th of February) stop
+MAX_SEARCH_DAYS = 366 * 5
+
+
+def _parse_field(value: str, name: str, minimum: int, maximum: int) -> frozenset:
+    """
+    Function to parse a cron field into the set of values it matches.
+    Supports "*", single values, ranges ("1-5"), steps ("*/15", "0-30/10") and comma separated lists
+
+    :param value: Field value
+    :param name: Field name, used for error messages
+    :param minimum: Minimum value of the field
+    :param maximum: Maximum value of the field
+
+    :return: Set of matched values
+    """
+    values = set()
+    for part in value.split(","):
+        part_range, _, step = part.partition("/")
+        try:
+            step = int(step) if step else 1
+            if part_range == "*":
+                start, end = minimum, maximum
+            elif "-" in part_range:
+                start, end = (int(bound) for bound in part_range.split("-", 1))
+            else:
+                start = end = int(part_range)
+                if step > 1:
+                    end = maximum
+        except ValueError:
+            raise ValueError(f"Invalid cron {name} field: '{value}'")
+
+        if step < 1 or start < minimum or end > maximum or start > end:
+            raise ValueError(f"Invalid cron {name} field: '{value}'")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronSchedule:
+    """
+    Standard 5 field cron expression (minute, hour, day of month, month, day of week), eg "30 2 * * 1-5".
+    Days of the week run from 0 (Sunday) to 6 (Saturday), and 7 is also Sunday. As with cron, when both the day
+    of month and day of week are restricted, a day matching either runs
+    """
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != len(FIELDS):
+            raise ValueError(f"Cron expression must have {len(FIELDS)} fields: '{expression}'")
+
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            _parse_field(value, *field) for value, field in zip(fields, FIELDS)
+        )
+        self.weekdays = frozenset(weekday % 7 for weekday in weekdays)
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def __repr__(self):
+        return f"CronSchedule({self.expression!r})"
+
+    def _matches_day(self, day: datetime) -> bool:
+        if day.month not in self.months:
+            return False
+        day_match = day.day in self.days
+        # Python weekdays run from 0 (Monday), cron weekdays from 0 (Sunday)
+        weekday_match = (day.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_match and weekday_match
+        return day_match or weekday_match
+
+    def next_after(self, after: datetime) -> datetime:
+        """
+        Function returning the first run time after a date time. Days are checked before hours and minutes,
+        so the search does not step through every minute
+
+        :param after: Date time to search from, exclusive
+
+        :return: Next run time, with the time zone of the date time searched from
+        """
+        start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.replace(hour=0, minute=0)
+
+        for _ in range(MAX_SEARCH_DAYS):
+            if self._matches_day(day):
+                for hour in sorted(self.hours):
+                    for minute in sorted(self.minutes):
+                        run_at = day.replace(hour=hour, minute=minute)
+                        if run_at >= start:
+                            return run_at
+            day += timedelta(days=1)
+
+        raise ValueError(f"Cron expression never runs: '{self.expression}'")
@@ -0,0 +1,62 @@
+from datetime import date, datetime
+from functools import lru_cache
+
+import config
+
+DATE_FORMAT = "%d/%m/%Y"
+
+
+def _parse_date(date_string: str) -> date:
+    """
+    Function to parse a date string of format DD/MM/YYYY.
+    Zero-padded dates are parsed by slicing the string, and any other input falls back to
+    strptime, so accepted dates and errors are the same as datetime.strptime
+
+    :param date_string: Input date as string type
+
+    :return: Date as date type
+    """
+    if (
+        len(date_string) == 10
+        and date_string[2] == "/"
+        and date_string[5] == "/"
+        and date_string.isascii()
+    ):
+        day, month, year = date_string[:2], date_string[3:5], date_string[6:]
+        if day.isdigit() and month.isdigit() and year.isdigit():
+            # Raises ValueError for out of range values, eg 31/02/2023
+            return date(int(year), int(month), int(day))
+    return datetime.strptime(date_string, DATE_FORMAT).date()
+
+
+class DateParser:
+    """
+    Date parser for the ingest path, memoising parsed dates in a bounded LRU cache keyed
+    by the raw string, as activity files repeat the same dates across many rows
+    """
+
+    def __init__(self, cache_size: int):
+        self.parse = lru_cache(maxsize=cache_size)(_parse_date)
+
+    def stats(self) -> dict:
+        """
+        Function returning cache statistics
+
+        :return: Dictionary with cache hits, misses, current size and max size
+        """
+        cache_info = self.parse.cache_info()
+        return {
+            "hits": cache_info.hits,
+            "misses": cache_info.misses,
+            "size": cache_info.currsize,
+            "max_size": cache_info.maxsize,
+        }
+
+    def clear(self) -> None:
+        """
+        Function to empty the cache and reset statistics
+        """
+        self.parse.cache_clear()
+
+
+date_parser = DateParser(config.DATE_CACHE_SIZE)
@@ -0,0 +1,80 @@
+import logging
+
+import emission_calculator_backend.models as models
+
+logger = logging.getLogger("root")
+
+
+class EmissionFactorIndex:
+    """
+    In-memory index of the Emission Factors table, keyed by (activity, lookup_identifier, unit).
+
+    The table is loaded with a single query the first time a lookup is made, and reused by every
+    activity ingester in the same run. Calling invalidate() forces a reload on the next lookup,
+    which must happen whenever emission factors are re-ingested.
+    """
+
+    def __init__(self):
+        self._factors = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._factors is not None
+
+    def load(self) -> None:
+        """
+        Function to load all emission factors into the index
+        """
+        # unique_together on the model guarantees one factor per key
+        self._factors = {
+            (factor.activity, factor.lookup_identifier, factor.unit): factor
+            for factor in models.EmissionFactors.objects.all()
+        }
+        logger.info(f"Emission factor index loaded with {len(self._factors)} factors")
+
+    def invalidate(self) -> None:
+        """
+        Function to drop the loaded factors, so the next lookup reloads the table
+        """
+        self._factors = None
+
+    def get(
+        self,
+        activity: str,
+        lookup_identifier: str,
+        unit: str,
+    ) -> models.EmissionFactors:
+        """
+        Function to return emission factor object
+
+        :param activity: Activity name
+        :param lookup_identifier: Identifier for specific activity
+        :param unit: Unit of measure for activity
+
+        :return: Emission Factor object, or None if no factor exists for the key
+        """
+        if self._factors is None:
+            self.load()
+
+        emission_factor_obj = self._factors.get((activity, lookup_identifier, unit))
+
+        if emission_factor_obj:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+        return emission_factor_obj
+
+    def stats(self) -> dict:
+        """
+        Function returning lookup statistics for the index
+
+        :return: Dictionary with factor count, hits and misses
+        """
+        return {
+            "factors": len(self._factors) if self._factors is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
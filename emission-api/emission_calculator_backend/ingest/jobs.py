@@ -0,0 +1,291 @@
+from datetime import timedelta
+import logging
+import os
+import shutil
+import threading
+from typing import Iterable, Iterator
+
+from django.db import connection
+from django.utils import timezone
+
+import emission_calculator_backend.models as models
+from emission_calculator_backend.ingest.activities import ACTIVITY_TYPES
+from emission_calculator_backend.ingest.factor_index import EmissionFactorIndex
+from emission_calculator_backend.ingest.manifest import find_files_to_ingest
+from emission_calculator_backend.ingest.rejects import INVALID_ROW
+from emission_calculator_backend.ingest.report import IngestReport, FAILED_STATUS
+from emission_calculator_backend.scripts import import_data
+import config
+
+logger = logging.getLogger("root")
+
+EMISSION_FACTORS = "emission factors"
+
+UPLOADING_STATUS = "uploading"
+QUEUED_STATUS = "queued"
+RUNNING_STATUS = "running"
+
+REJECTS_FILE_NAME = "rejects.ndjson"
+
+# Progress of the jobs running in this process, keyed by job id
+_running_jobs = {}
+
+
+def job_activities() -> list:
+    """
+    Function returning the activities files can be uploaded for
+
+    :return: Array of activity names
+    """
+    return [EMISSION_FACTORS, *ACTIVITY_TYPES]
+
+
+class JobProgress:
+    """
+    Live row counts of a running ingest job. Rows are counted as they are read from the uploaded file,
+    so progress is reported before the file's rows are written in a single transaction
+    """
+
+    def __init__(self, activity: str, report: IngestReport):
+        self.activity = activity
+        self.report = report
+        self.rows_read = 0
+
+    def count(self, rows: Iterable) -> Iterator:
+        """
+        Generator counting input objects as they are read
+
+        :param rows: Iterable of input objects
+
+        :return: Iterator of input objects
+        """
+        for row in rows:
+            self.rows_read += 1
+            yield row
+
+    @property
+    def rows_rejected(self) -> int:
+        return self.report.rejects.total
+
+    @property
+    def rows_processed(self) -> int:
+        # Rows failing input validation are not yielded by the reader, so are added from the rejects
+        return self.rows_read + self.report.rejects.counts.get(self.activity, {}).get(INVALID_ROW, 0)
+
+
+def job_folder(job: models.IngestJob) -> str:
+    """
+    Function returning the folder a job's uploaded file and rejected rows are written to
+
+    :param job: Ingest job
+
+    :return: Folder path
+    """
+    return os.path.join(config.INGEST_UPLOAD_FOLDER, str(job.pk))
+
+
+def save_upload(job: models.IngestJob, stream, chunk_size: int = config.INGEST_UPLOAD_CHUNK_SIZE) -> str:
+    """
+    Function to write an uploaded file to the job's upload folder, one chunk at a time,
+    so the request body is never held in memory
+
+    :param job: Ingest job the file is uploaded for
+    :param stream: File-like request body
+    :param chunk_size: Number of bytes read and written at a time
+
+    :return: Upload file path
+    """
+    os.makedirs(job_folder(job), exist_ok=True)
+    path = os.path.abspath(os.path.join(job_folder(job), job.file_name))
+
+    with open(path, "wb") as file:
+        for chunk in iter(lambda: stream.read(chunk_size), b""):
+            file.write(chunk)
+            job.size += len(chunk)
+    return path
+
+
+def create_job(
+    activity: str,
+    file_name: str,
+    stream,
+    priority: int = 0,
+    chunk_size: int = config.INGEST_UPLOAD_CHUNK_SIZE,
+) -> models.IngestJob:
+    """
+    Function to save an uploaded CSV file, and queue an ingest job for it
+
+    :param activity: Activity name of the uploaded file
+    :param file_name: Uploaded file name
+    :param stream: File-like request body
+    :param priority: Job priority. Queued jobs with a higher priority are run first
+    :param chunk_size: Number of bytes read and written at a time
+
+    :return: Queued IngestJob object
+    """
+    job = models.IngestJob.objects.create(
+        activity=activity,
+        file_name=file_name,
+        status=UPLOADING_STATUS,
+        priority=priority,
+        max_attempts=config.INGEST_JOB_MAX_ATTEMPTS,
+    )
+    try:
+        job.path = save_upload(job, stream, chunk_size)
+    except Exception as e:
+        shutil.rmtree(job_folder(job), ignore_errors=True)
+        job.status = FAILED_STATUS
+        job.error = f"Upload failed: {e}"
+        job.finished_at = timezone.now()
+        job.save()
+        raise
+
+    # Job can be claimed once the upload is complete
+    job.status = QUEUED_STATUS
+    job.run_after = timezone.now()
+    job.save()
+    logger.info(f"Queued ingest job {job.pk} for {activity} file: '{file_name}' ({job.size} bytes)")
+    return job
+
+
+def enqueue_job(
+    activity: str,
+    path: str,
+    priority: int = 0,
+    run_after=None,
+    schedule: models.IngestSchedule = None,
+) -> models.IngestJob:
+    """
+    Function to queue an incremental ingest of an activity's folder, eg for a backfill or a schedule
+
+    :param activity: Activity name
+    :param path: Folder path containing files to be ingested
+    :param priority: Job priority. Queued jobs with a higher priority are run first
+    :param run_after: Date time the job can be run from, or None to run as soon as possible
+    :param schedule: Schedule the job was queued by
+
+    :return: Queued IngestJob object
+    """
+    if activity not in job_activities():
+        raise ValueError(f"Activity must be one of: {', '.join(job_activities())}")
+
+    job = models.IngestJob.objects.create(
+        activity=activity,
+        path=os.path.abspath(path),
+        status=QUEUED_STATUS,
+        priority=priority,
+        max_attempts=config.INGEST_JOB_MAX_ATTEMPTS,
+        run_after=run_after or timezone.now(),
+        schedule=schedule,
+    )
+    logger.info(f"Queued ingest job {job.pk} for {activity} folder: '{path}'")
+    return job
+
+
+def _ingest_job(job: models.IngestJob, progress: JobProgress, report: IngestReport) -> None:
+    """
+    Function to ingest the file uploaded for a job, or the folder queued for a job, with the ingest engine
+
+    :param job: Ingest job
+    :param progress: Row counts of the job
+    :param report: Ingest report for the job
+    """
+    factor_index = EmissionFactorIndex()
+
+    if job.activity == EMISSION_FACTORS:
+        input_class = models.InputEmissionFactors
+    else:
+        activity_type = ACTIVITY_TYPES[job.activity]
+        input_class = activity_type.input_class
+
+    if job.file_name:
+        # Only the uploaded file is ingested. It is a new file with its own manifest entry, so its rows are
+        # only added, and rows from other files or rows without a file are never replaced
+        files = (
+            (source_file, import_data._read_csv_file(source_file.path, input_class, job.activity, report))
+            for source_file in find_files_to_ingest([job.path], incremental=False)
+        )
+    else:
+        # Folders are ingested incrementally
+        files = import_data._data_ingest(job.path, input_class, job.activity, report, incremental=True)
+    files = ((source_file, progress.count(file)) for source_file, file in files)
+
+    if job.activity == EMISSION_FACTORS:
+        import_data._emission_factor_files_ingest(files, factor_index, report)
+    else:
+        import_data._activity_data_ingest(activity_type, files, factor_index, report)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """
+    Function returning the time before a failed job is retried, doubled after each failed attempt
+
+    :param attempts: Number of attempts made
+
+    :return: Retry delay
+    """
+    return timedelta(seconds=config.INGEST_JOB_RETRY_BACKOFF * 2 ** max(attempts - 1, 0))
+
+
+def run_job(job_id: int) -> models.IngestJob:
+    """
+    Function to run a claimed ingest job, eg in a background worker thread.
+    The job's row counts and run report are saved when it finishes. A failed job is queued again
+    after a backoff delay, until it has been attempted max attempts times
+
+    :param job_id: Ingest job id
+
+    :return: Finished IngestJob object
+    """
+    try:
+        job = models.IngestJob.objects.get(pk=job_id)
+        report = IngestReport(os.path.join(job_folder(job), REJECTS_FILE_NAME))
+        progress = JobProgress(job.activity, report)
+
+        job.status = RUNNING_STATUS
+        job.started_at = timezone.now()
+        job.save(update_fields=["status", "started_at"])
+        _running_jobs[job_id] = progress
+
+        error = None
+        try:
+            _ingest_job(job, progress, report)
+        except Exception as e:
+            logger.error(f"Error occurred during ingest job {job_id}, see: {e}")
+            error = e
+        finally:
+            _running_jobs.pop(job_id, None)
+
+        report.finish(error)
+        job.status = report.status
+        job.error = report.error
+        job.rows_processed = progress.rows_processed
+        job.rows_rejected = progress.rows_rejected
+        job.report = report.to_dict()
+        job.finished_at = report.finished_at
+
+        if error and job.attempts < job.max_attempts:
+            job.status = QUEUED_STATUS
+            job.run_after = report.finished_at + retry_delay(job.attempts)
+            logger.info(f"Retrying ingest job {job_id} after: {job.run_after.isoformat()}")
+        job.save()
+        logger.info(f"Ingest job {job_id} {job.status}. Rows processed: {job.rows_processed}")
+        return job
+    finally:
+        # Worker threads open their own database connection, which is closed once the job is done
+        if threading.current_thread() is not threading.main_thread():
+            connection.close()
+
+
+def job_progress(job: models.IngestJob) -> dict:
+    """
+    Function returning the row counts of a job, with live counts if it is running in this process
+
+    :param job: Ingest job
+
+    :return: Dictionary of rows processed and rejected
+    """
+    progress = _running_jobs.get(job.pk)
+    if progress is None:
+        return {"rows_processed": job.rows_processed, "rows_rejected": job.rows_rejected}
+    return {"rows_processed": progress.rows_processed, "rows_rejected": progress.rows_rejected}
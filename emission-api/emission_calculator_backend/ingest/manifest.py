@@ -0,0 +1,166 @@
+from contextlib import contextmanager, nullcontext
+import hashlib
+import logging
+import os
+
+from django.db import transaction
+
+import emission_calculator_backend.models as models
+from emission_calculator_backend.ingest import summary
+from emission_calculator_backend.ingest.report import IngestReport
+
+logger = logging.getLogger("root")
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def content_hash(file_path: str) -> str:
+    """
+    Function returning the SHA-256 hash of a file, read in chunks
+
+    :param file_path: File path
+
+    :return: Hex digest of file content
+    """
+    file_hash = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+class SourceFile:
+    """
+    CSV file to be ingested, with its manifest entry if it has been ingested before
+    """
+
+    def __init__(self, path: str, manifest: models.IngestManifest = None):
+        self.path = path
+        self.manifest = manifest
+        stat = os.stat(path)
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime
+        self._content_hash = None
+
+    @property
+    def content_hash(self) -> str:
+        if self._content_hash is None:
+            self._content_hash = content_hash(self.path)
+        return self._content_hash
+
+    def is_unchanged(self) -> bool:
+        """
+        Function checking if the file matches its manifest entry.
+        Size and modified time are checked first, so the file is only hashed when they differ.
+        Files with rows that had no emission factor are stale once factors are added or changed
+
+        :return: True if the file content has already been ingested
+        """
+        if not self.manifest or self.manifest.stale:
+            return False
+        if self.manifest.size == self.size and self.manifest.mtime == self.mtime:
+            return True
+        if self.manifest.content_hash == self.content_hash:
+            # File has been touched without changing, so record the new modified time
+            self.manifest.size = self.size
+            self.manifest.mtime = self.mtime
+            self.manifest.save(update_fields=["size", "mtime"])
+            return True
+        return False
+
+
+def find_files_to_ingest(file_paths: list, incremental: bool = True) -> list:
+    """
+    Function returning the files that need to be ingested. In incremental mode, files already
+    ingested with the same content are skipped
+
+    :param file_paths: CSV file paths found in an ingest folder
+    :param incremental: Skip unchanged files if True, otherwise ingest all files
+
+    :return: Array of SourceFile objects
+    """
+    paths = [os.path.abspath(file_path) for file_path in file_paths]
+    manifests = models.IngestManifest.objects.in_bulk(paths, field_name="path")
+
+    source_files = []
+    for path in paths:
+        source_file = SourceFile(path, manifests.get(path))
+        if incremental and source_file.is_unchanged():
+            logger.info(f"Skipping unchanged file: '{os.path.basename(path)}'")
+            continue
+        source_files.append(source_file)
+
+    return source_files
+
+
+def remove_untracked_rows(activity_model) -> int:
+    """
+    Function to delete rows ingested before files were tracked, which have no manifest entry to be replaced
+    with, so they are not duplicated when their files are ingested again. Rows are only deleted while none of
+    the activity model's rows are linked to a file, so once a folder run has tracked its files, rows added
+    without a file are kept
+
+    :param activity_model: Activity model rows are saved to
+
+    :return: Number of rows deleted
+    """
+    with transaction.atomic():
+        if activity_model.objects.filter(ingest_file__isnull=False).exists():
+            return 0
+        untracked_rows = activity_model.objects.filter(ingest_file__isnull=True)
+        summary.remove_rows(untracked_rows)
+        deleted, _ = untracked_rows.delete()
+    if deleted:
+        logger.info(f"Replacing {deleted} {activity_model.__name__} rows ingested before files were tracked")
+    return deleted
+
+
+def mark_unmatched_files_stale() -> int:
+    """
+    Function to mark the files with rows that had no emission factor as stale, once factors are added or changed,
+    so the next incremental ingest ingests them again rather than skipping them as unchanged
+
+    :return: Number of manifest entries marked stale
+    """
+    return models.IngestManifest.objects.filter(unmatched_rows__gt=0, stale=False).update(stale=True)
+
+
+@contextmanager
+def replace_file_rows(source_file: SourceFile, activity_model=None, report: IngestReport = None):
+    """
+    Context manager to atomically replace the rows previously ingested from a file.
+    Old rows are deleted and the manifest entry and emission summary updated in the same transaction
+    the new rows are written in, so a failed ingest leaves the previous rows in place
+
+    :param source_file: File being ingested
+    :param activity_model: Activity model rows from the file are saved to, or None if rows are not tracked
+    :param report: Ingest report timing the row deletion, manifest and summary updates as database writes, if given
+
+    :return: Manifest entry to link new rows to
+    """
+    def db_write():
+        return report.stage("db_write") if report else nullcontext()
+
+    with transaction.atomic():
+        with db_write():
+            manifest = source_file.manifest or models.IngestManifest(path=source_file.path)
+
+            if manifest.pk and activity_model is not None:
+                previous_rows = activity_model.objects.filter(ingest_file=manifest)
+                summary.remove_rows(previous_rows)
+                deleted, _ = previous_rows.delete()
+                logger.info(f"Replacing {deleted} rows from changed file: '{os.path.basename(source_file.path)}'")
+
+            manifest.size = source_file.size
+            manifest.mtime = source_file.mtime
+            manifest.content_hash = source_file.content_hash
+            manifest.unmatched_rows = 0
+            manifest.stale = False
+            manifest.save()
+
+        yield manifest
+
+        if activity_model is not None:
+            # New rows are added to the emission summary in the transaction they are written in
+            with db_write():
+                summary.add_rows(activity_model.objects.filter(ingest_file=manifest))
@@ -0,0 +1,252 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import logging
+import threading
+
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+import emission_calculator_backend.models as models
+from emission_calculator_backend.ingest import jobs
+from emission_calculator_backend.ingest.cron import CronSchedule
+from emission_calculator_backend.ingest.report import FAILED_STATUS
+import config
+
+logger = logging.getLogger("root")
+
+
+def activity_concurrency(activity: str) -> int:
+    """
+    Function returning the number of jobs that can run at the same time for an activity
+
+    :param activity: Activity name
+
+    :return: Concurrency limit
+    """
+    return config.INGEST_ACTIVITY_CONCURRENCY.get(activity, config.INGEST_ACTIVITY_CONCURRENCY_DEFAULT)
+
+
+def claim_jobs(slots: int) -> list:
+    """
+    Function to claim the queued jobs that are due, by highest priority then earliest run time,
+    without going over each activity's concurrency limit. Jobs are claimed with a conditional update,
+    so a job is only claimed once when more than one process runs the queue
+
+    :param slots: Maximum number of jobs to claim
+
+    :return: Array of claimed job ids
+    """
+    if slots < 1:
+        return []
+
+    now = timezone.now()
+    claimed = []
+    with transaction.atomic():
+        running = dict(
+            models.IngestJob.objects.filter(status=jobs.RUNNING_STATUS)
+            .values_list("activity")
+            .annotate(Count("id"))
+        )
+        queued = (
+            models.IngestJob.objects.filter(status=jobs.QUEUED_STATUS, run_after__lte=now)
+            .order_by("-priority", "run_after", "id")
+            .values_list("id", "activity")
+        )
+        # Read before claiming, as SQLite cursors do not isolate reads from writes to the same table
+        for job_id, activity in list(queued):
+            if running.get(activity, 0) >= activity_concurrency(activity):
+                continue
+            updated = models.IngestJob.objects.filter(pk=job_id, status=jobs.QUEUED_STATUS).update(
+                status=jobs.RUNNING_STATUS, attempts=F("attempts") + 1, started_at=now,
+            )
+            if updated:
+                running[activity] = running.get(activity, 0) + 1
+                claimed.append(job_id)
+                if len(claimed) >= slots:
+                    break
+    return claimed
+
+
+def requeue_stale_jobs(exclude=(), stale_seconds: int = config.INGEST_JOB_STALE_SECONDS) -> int:
+    """
+    Function to queue jobs again that have been running for longer than stale seconds, eg as the process
+    running them stopped, so they are retried and do not hold their activity's concurrency limit
+
+    :param exclude: Ids of jobs running in this process
+    :param stale_seconds: Seconds after which a running job is treated as stopped
+
+    :return: Number of jobs queued again
+    """
+    now = timezone.now()
+    stale = models.IngestJob.objects.filter(
+        status=jobs.RUNNING_STATUS, started_at__lt=now - timedelta(seconds=stale_seconds),
+    ).exclude(pk__in=exclude)
+    error = "Job stopped before finishing"
+
+    requeued = stale.filter(attempts__lt=F("max_attempts")).update(
+        status=jobs.QUEUED_STATUS, run_after=now, error=error,
+    )
+    failed = stale.update(status=FAILED_STATUS, finished_at=now, error=error)
+    if requeued or failed:
+        logger.error(f"Stopped ingest jobs queued again: {requeued}, failed: {failed}")
+    return requeued
+
+
+def sync_schedules(schedules: list) -> None:
+    """
+    Function to create or update the schedules declared in config. Cron expressions are validated,
+    and the next run time is recalculated when an expression changes
+
+    :param schedules: Array of dictionaries with a name, activity, path, cron expression, and optional priority
+    """
+    for schedule in schedules:
+        if schedule["activity"] not in jobs.job_activities():
+            raise ValueError(f"Unknown activity for schedule '{schedule['name']}': {schedule['activity']}")
+        cron = CronSchedule(schedule["cron"])
+
+        obj, created = models.IngestSchedule.objects.get_or_create(
+            name=schedule["name"],
+            defaults={"activity": schedule["activity"], "path": schedule["path"], "cron": schedule["cron"]},
+        )
+        if created or obj.cron != schedule["cron"]:
+            obj.next_run_at = cron.next_after(timezone.now())
+        obj.activity = schedule["activity"]
+        obj.path = schedule["path"]
+        obj.cron = schedule["cron"]
+        obj.priority = schedule.get("priority", 0)
+        obj.save()
+
+
+def enqueue_due_schedules() -> list:
+    """
+    Function to queue a job for each enabled schedule that is due. A schedule is skipped while its previous
+    job is still queued or running, so slow ingests do not pile up
+
+    :return: Array of queued IngestJob objects
+    """
+    now = timezone.now()
+    queued = []
+    for schedule in models.IngestSchedule.objects.filter(enabled=True, next_run_at__lte=now):
+        with transaction.atomic():
+            next_run_at = CronSchedule(schedule.cron).next_after(now)
+            # Conditional update, so a schedule is only queued once when more than one process runs the queue
+            updated = models.IngestSchedule.objects.filter(pk=schedule.pk, next_run_at=schedule.next_run_at).update(
+                last_run_at=now, next_run_at=next_run_at,
+            )
+            if not updated:
+                continue
+
+            active = models.IngestJob.objects.filter(
+                schedule=schedule, status__in=[jobs.QUEUED_STATUS, jobs.RUNNING_STATUS],
+            )
+            if active.exists():
+                logger.info(f"Skipping schedule '{schedule.name}', previous job has not finished")
+                continue
+            queued.append(jobs.enqueue_job(schedule.activity, schedule.path, schedule.priority, schedule=schedule))
+    return queued
+
+
+class JobQueue:
+    """
+    Local ingest job queue, backed by the IngestJob and IngestSchedule tables so no external broker is needed.
+    A dispatcher thread queues due schedules, and claims due jobs onto a pool of worker threads.
+    The dispatcher runs when woken, eg after an upload, when a job finishes, and every poll interval
+
+    :param workers: Number of worker threads running jobs
+    :param poll_seconds: Seconds between checks of the queue and schedules
+    """
+
+    def __init__(
+        self,
+        workers: int = config.INGEST_JOB_WORKERS,
+        poll_seconds: float = config.INGEST_QUEUE_POLL_SECONDS,
+    ):
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self._executor = None
+        self._thread = None
+        # Re-entrant, as a job's done callback runs straight away if it finishes before the callback is added
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._active = set()
+
+    def start(self) -> None:
+        """
+        Function to start the worker pool and dispatcher thread, if not already started
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            sync_schedules(config.INGEST_SCHEDULES)
+            self._stop.clear()
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ingest-job")
+            self._thread = threading.Thread(target=self._run, name="ingest-dispatcher", daemon=True)
+            self._thread.start()
+        logger.info(f"Ingest job queue started with {self.workers} workers")
+
+    def stop(self, wait: bool = True) -> None:
+        """
+        Function to stop the dispatcher thread, and the worker pool once running jobs finish
+
+        :param wait: Wait for running jobs to finish
+        """
+        with self._lock:
+            thread, executor = self._thread, self._executor
+            if thread is None:
+                return
+            self._stop.set()
+            self._wake.set()
+        # Joined without the lock, as the dispatcher and finished jobs take it
+        thread.join()
+        executor.shutdown(wait=wait)
+        with self._lock:
+            self._thread = None
+            self._executor = None
+
+    def wake(self) -> None:
+        """
+        Function to start the queue if needed, and run the dispatcher straight away
+        """
+        self.start()
+        self._wake.set()
+
+    def dispatch(self) -> list:
+        """
+        Function to queue due schedules, and submit due jobs to free workers
+
+        :return: Array of submitted job ids
+        """
+        enqueue_due_schedules()
+        with self._lock:
+            requeue_stale_jobs(exclude=self._active)
+            job_ids = claim_jobs(self.workers - len(self._active))
+            for job_id in job_ids:
+                self._active.add(job_id)
+                future = self._executor.submit(jobs.run_job, job_id)
+                future.add_done_callback(lambda _, job_id=job_id: self._finished(job_id))
+        return job_ids
+
+    def _finished(self, job_id: int) -> None:
+        with self._lock:
+            self._active.discard(job_id)
+        # A worker is free, so the next job can be claimed
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.dispatch()
+            except Exception as e:
+                logger.error(f"Error occurred during ingest job dispatch, see: {e}")
+            finally:
+                connection.close()
+
+
+# Queue shared by the API views in this process
+job_queue = JobQueue()
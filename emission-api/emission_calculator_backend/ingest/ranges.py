@@ -0,0 +1,94 @@
+import csv
+import io
+import mmap
+import os
+
+QUOTE = ord('"')
+NEWLINE = b"\n"
+
+
+def _find_row_end(mapped_file: mmap.mmap, position: int, in_quotes: bool) -> int:
+    """
+    Function to find the end of the CSV row containing a position. Newlines inside quoted fields are
+    skipped, by tracking whether each newline follows an odd number of quotes. Escaped quotes ("")
+    are counted twice, so they do not change the quote state
+
+    :param mapped_file: Memory mapped CSV file
+    :param position: Byte offset to search from
+    :param in_quotes: Whether the position is inside a quoted field
+
+    :return: Byte offset after the row's newline, or the file size for the last row
+    """
+    while True:
+        newline = mapped_file.find(NEWLINE, position)
+        if newline == -1:
+            return len(mapped_file)
+
+        in_quotes ^= _count_quotes(mapped_file, position, newline) % 2 == 1
+        position = newline + 1
+        if not in_quotes:
+            return position
+
+
+def _count_quotes(mapped_file: mmap.mmap, start: int, end: int) -> int:
+    """
+    Function to count the quote characters in a byte range
+
+    :param mapped_file: Memory mapped CSV file
+    :param start: Range start byte offset
+    :param end: Range end byte offset
+
+    :return: Number of quote characters
+    """
+    return mapped_file[start:end].count(QUOTE)
+
+
+def split_byte_ranges(file_path: str, range_size: int) -> tuple:
+    """
+    Function to split a CSV file into byte ranges of roughly range_size bytes, that can be parsed
+    independently. Range boundaries are moved forward to the end of the row they fall in, so no row
+    (including rows with quoted newlines) is split across ranges
+
+    :param file_path: CSV file path
+    :param range_size: Target number of bytes per range
+
+    :return: CSV header row, and an array of (start, end) byte offsets for the rows after the header
+    """
+    with open(file_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return [], []
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+            header_end = _find_row_end(mapped_file, 0, False)
+            header = next(csv.reader(io.StringIO(mapped_file[:header_end].decode("utf-8"), newline="")), [])
+
+            ranges = []
+            start = header_end
+            while start < len(mapped_file):
+                target = start + range_size
+                if target >= len(mapped_file):
+                    end = len(mapped_file)
+                else:
+                    # Each range starts at a row boundary, so the quote state at the target is given by
+                    # the number of quotes since the range start, and the file is only scanned once
+                    in_quotes = _count_quotes(mapped_file, start, target) % 2 == 1
+                    end = _find_row_end(mapped_file, target, in_quotes)
+                ranges.append((start, end))
+                start = end
+
+    return header, ranges
+
+
+def read_byte_range(file_path: str, start: int, end: int) -> io.StringIO:
+    """
+    Function to read a byte range of a CSV file, eg in a worker process
+
+    :param file_path: CSV file path
+    :param start: Range start byte offset
+    :param end: Range end byte offset
+
+    :return: Text buffer with the range's rows, to be read with a CSV reader
+    """
+    with open(file_path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+            return io.StringIO(mapped_file[start:end].decode("utf-8"), newline="")
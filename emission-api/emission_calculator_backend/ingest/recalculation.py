@@ -0,0 +1,180 @@
+import logging
+
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+from rest_framework import serializers as drf_serializers
+
+import emission_calculator_backend.serializers as serializers
+import emission_calculator_backend.models as models
+from emission_calculator_backend.ingest import summary
+from emission_calculator_backend.ingest.activities import ACTIVITY_TYPES
+
+logger = logging.getLogger("root")
+
+FACTOR_STAGING_TABLE = "recalculation_emission_factors"
+CHANGED_FACTORS_TABLE = "recalculation_changed_factors"
+FACTOR_TABLE_COLUMNS = (
+    "activity varchar(200) NOT NULL, lookup_identifier varchar(200) NOT NULL, unit varchar(200) NOT NULL, "
+    "co2e double precision NOT NULL, scope integer NOT NULL, category integer NULL"
+)
+
+
+def _stage_factors(cursor, emission_factors) -> int:
+    """
+    Function to load an updated emission factor set into a temporary staging table.
+    Factors are validated through the emission factor update serializer. As with the emission factor ingest,
+    the first factor for each key is kept, and later factors with the same key are rejected
+
+    :param cursor: Database cursor
+    :param emission_factors: Iterable of InputEmissionFactors objects
+
+    :return: Number of rejected factors
+    """
+    serializer = serializers.EmissionFactorsUpdateSerializer()
+    factors = {}
+    rejected = 0
+
+    for emission_factor_obj in emission_factors:
+        try:
+            factor = serializer.run_validation({
+                "activity": emission_factor_obj.activity,
+                "lookup_identifier": emission_factor_obj.lookup_identifier,
+                "unit": emission_factor_obj.unit,
+                "co2e": emission_factor_obj.co2e,
+                "scope": emission_factor_obj.scope,
+                "category": emission_factor_obj.category,
+            })
+        except drf_serializers.ValidationError as e:
+            logger.error(f"Emission factor validation failed. Data: {emission_factor_obj}, Reason: {e.detail}")
+            rejected += 1
+            continue
+        key = (factor["activity"], factor["lookup_identifier"], factor["unit"])
+        if key in factors:
+            logger.error(f"Emission factor rejected, key already loaded. Data: {emission_factor_obj}")
+            rejected += 1
+            continue
+        factors[key] = (*key, factor["co2e"], factor["scope"], factor.get("category"))
+
+    cursor.execute(f"DROP TABLE IF EXISTS {FACTOR_STAGING_TABLE}")
+    cursor.execute(f"CREATE TEMPORARY TABLE {FACTOR_STAGING_TABLE} ({FACTOR_TABLE_COLUMNS})")
+    cursor.executemany(
+        f"INSERT INTO {FACTOR_STAGING_TABLE} (activity, lookup_identifier, unit, co2e, scope, category) "
+        "VALUES (%s, %s, %s, %s, %s, %s)",
+        list(factors.values()),
+    )
+    return rejected
+
+
+def _recalculate_activity_rows(cursor) -> dict:
+    """
+    Function to recalculate CO2e, scope and category for the activity rows using a factor in the changed
+    factors table, with a single UPDATE ... FROM statement per activity table. The emission summary is
+    updated for the recalculated rows only
+
+    :param cursor: Database cursor
+
+    :return: Dictionary of the number of rows changed, keyed by activity table
+    """
+    rows_changed = {}
+    for activity_type in ACTIVITY_TYPES.values():
+        activity_table = activity_type.model._meta.db_table
+        key_join = (
+            "activity_row.activity = changed.activity "
+            f"AND activity_row.{activity_type.lookup_field} = changed.lookup_identifier "
+            f"AND activity_row.{activity_type.unit_field} = changed.unit"
+        )
+        # Rows using a changed factor are moved between emission summary groups, by subtracting their
+        # previous CO2e and adding it again once recalculated
+        changed_rows = activity_type.model.objects.filter(id__in=RawSQL(
+            f"SELECT activity_row.id FROM {activity_table} AS activity_row "
+            f"JOIN {CHANGED_FACTORS_TABLE} AS changed ON {key_join}",
+            [],
+        ))
+        summary.remove_rows(changed_rows)
+
+        # Activity rows are saved with quantities in the standard unit, so CO2e is the factor times the quantity
+        cursor.execute(
+            f"UPDATE {activity_table} AS activity_row "
+            f"SET co2e = changed.co2e * activity_row.{activity_type.quantity_field}, "
+            "scope = changed.scope, category = changed.category "
+            f"FROM {CHANGED_FACTORS_TABLE} AS changed WHERE {key_join}"
+        )
+        rows_changed[activity_table] = cursor.rowcount
+        summary.add_rows(changed_rows)
+    return rows_changed
+
+
+def recalculate_changed_factors(changed_factors: list) -> dict:
+    """
+    Function to recalculate CO2e for the activity rows using factors that have already been changed in
+    the Emission Factors table, eg by the emission factor ingest
+
+    :param changed_factors: Array of (activity, lookup identifier, unit, CO2e, scope, category) tuples
+
+    :return: Dictionary of the number of rows changed, keyed by activity table
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {CHANGED_FACTORS_TABLE}")
+        cursor.execute(f"CREATE TEMPORARY TABLE {CHANGED_FACTORS_TABLE} ({FACTOR_TABLE_COLUMNS})")
+        cursor.executemany(
+            f"INSERT INTO {CHANGED_FACTORS_TABLE} (activity, lookup_identifier, unit, co2e, scope, category) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            changed_factors,
+        )
+        rows_changed = _recalculate_activity_rows(cursor)
+        cursor.execute(f"DROP TABLE {CHANGED_FACTORS_TABLE}")
+
+    return rows_changed
+
+
+def recalculate_emissions(emission_factors) -> dict:
+    """
+    Function to apply an updated emission factor set, and recalculate CO2e for only the activity
+    rows using a changed factor. The factors with a changed CO2e, scope or category are found with a
+    join against the Emission Factors table, and each activity table is updated with a single
+    UPDATE ... FROM statement, so activity rows are never loaded into Python.
+    Everything is applied in one transaction
+
+    :param emission_factors: Iterable of InputEmissionFactors objects with the updated factor set
+
+    :return: Dictionary with the number of factors added, changed and rejected, and rows changed per table
+    """
+    factor_table = models.EmissionFactors._meta.db_table
+    key_join = "{0}.activity = {1}.activity AND {0}.lookup_identifier = {1}.lookup_identifier AND {0}.unit = {1}.unit"
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        rejected = _stage_factors(cursor, emission_factors)
+
+        cursor.execute(f"DROP TABLE IF EXISTS {CHANGED_FACTORS_TABLE}")
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {CHANGED_FACTORS_TABLE} AS "
+            f"SELECT staged.* FROM {FACTOR_STAGING_TABLE} AS staged "
+            f"JOIN {factor_table} AS factor ON {key_join.format('factor', 'staged')} "
+            "WHERE factor.co2e <> staged.co2e OR factor.scope <> staged.scope "
+            "OR COALESCE(factor.category, -1) <> COALESCE(staged.category, -1)"
+        )
+
+        rows_changed = _recalculate_activity_rows(cursor)
+
+        cursor.execute(
+            f"UPDATE {factor_table} AS factor "
+            "SET co2e = changed.co2e, scope = changed.scope, category = changed.category "
+            f"FROM {CHANGED_FACTORS_TABLE} AS changed WHERE {key_join.format('factor', 'changed')}"
+        )
+        changed = cursor.rowcount
+
+        cursor.execute(
+            f"INSERT INTO {factor_table} (activity, lookup_identifier, unit, co2e, scope, category) "
+            "SELECT staged.activity, staged.lookup_identifier, staged.unit, staged.co2e, staged.scope, staged.category "
+            f"FROM {FACTOR_STAGING_TABLE} AS staged WHERE NOT EXISTS ("
+            f"SELECT 1 FROM {factor_table} AS factor WHERE {key_join.format('factor', 'staged')})"
+        )
+        added = cursor.rowcount
+
+        cursor.execute(f"DROP TABLE {CHANGED_FACTORS_TABLE}")
+        cursor.execute(f"DROP TABLE {FACTOR_STAGING_TABLE}")
+
+    return {
+        "factors": {"added": added, "changed": changed, "rejected": rejected},
+        "rows_changed": rows_changed,
+    }
@@ -0,0 +1,123 @@
+import json
+import logging
+import os
+import shutil
+
+import config
+
+logger = logging.getLogger("root")
+
+# Reason codes for rejected rows, and the report outcome each is counted against
+INVALID_ROW = "invalid_row"
+SERIALIZER_INVALID = "serializer_invalid"
+FACTOR_NOT_FOUND = "factor_not_found"
+
+REASON_OUTCOMES = {
+    INVALID_ROW: "rejected",
+    SERIALIZER_INVALID: "rejected",
+    FACTOR_NOT_FOUND: "unmatched",
+}
+
+
+class RejectSink:
+    """
+    Buffered sink for rows rejected during ingest. Rejects are written to an NDJSON file in
+    batches, and only the counts per activity and reason, and the first few rejects, are kept
+    in memory. If no path is set, rejects are counted but not written
+    """
+
+    def __init__(
+        self,
+        path: str = None,
+        buffer_size: int = config.INGEST_REJECTS_BUFFER_SIZE,
+        sample_size: int = config.INGEST_REJECTS_SAMPLE_SIZE,
+    ):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.sample_size = sample_size
+        self.counts = {}
+        self.samples = []
+        self._buffer = []
+
+    @property
+    def total(self) -> int:
+        return sum(sum(reasons.values()) for reasons in self.counts.values())
+
+    def add(self, activity: str, reason: str, row: dict, detail=None) -> None:
+        """
+        Function to record a rejected row
+
+        :param activity: Activity name
+        :param reason: Reason code, eg "factor_not_found"
+        :param row: Row data
+        :param detail: Validation error message or serializer errors for the row
+        """
+        reasons = self.counts.setdefault(activity, {})
+        reasons[reason] = reasons.get(reason, 0) + 1
+
+        record = {"activity": activity, "reason": reason, "detail": detail, "row": row}
+        if len(self.samples) < self.sample_size:
+            self.samples.append(record)
+
+        if self.path:
+            self._buffer.append(record)
+            if len(self._buffer) >= self.buffer_size:
+                self.flush()
+
+    def flush(self) -> None:
+        """
+        Function to append the buffered rejects to the rejects file
+        """
+        if not self._buffer:
+            return
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a") as file:
+            file.write("".join(json.dumps(record, default=str) + "\n" for record in self._buffer))
+        self._buffer = []
+
+    def merge(self, other: "RejectSink") -> None:
+        """
+        Function to add the rejects of another sink, eg from a worker process.
+        The other sink's file is appended to this sink's file, and removed
+
+        :param other: Sink to merge
+        """
+        for activity, reasons in other.counts.items():
+            for reason, rows in reasons.items():
+                self.counts.setdefault(activity, {})
+                self.counts[activity][reason] = self.counts[activity].get(reason, 0) + rows
+        self.samples.extend(other.samples[:self.sample_size - len(self.samples)])
+
+        if other.path and os.path.exists(other.path):
+            if self.path:
+                self.flush()
+                with open(other.path) as source, open(self.path, "a") as destination:
+                    shutil.copyfileobj(source, destination)
+            os.remove(other.path)
+
+    def close(self) -> None:
+        """
+        Function to write any remaining rejects, and log the reject counts and samples
+        """
+        if self.path:
+            self.flush()
+
+        if self.counts:
+            logger.error(f"Rejected {self.total} rows: {self.counts}")
+            for record in self.samples:
+                logger.error(f"Rejected row sample: {json.dumps(record, default=str)}")
+            if self.path:
+                logger.error(f"All rejected rows written to: '{self.path}'")
+
+    def to_dict(self) -> dict:
+        """
+        Function returning the reject counts and samples as a JSON serialisable dictionary
+
+        :return: Rejects dictionary
+        """
+        return {
+            "path": self.path if self.counts else None,
+            "counts": self.counts,
+            "samples": json.loads(json.dumps(self.samples, default=str)),
+        }
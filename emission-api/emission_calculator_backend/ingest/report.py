@@ -0,0 +1,188 @@
+from contextlib import contextmanager
+import json
+import logging
+import os
+import time
+
+from django.utils import timezone
+
+from emission_calculator_backend.ingest.rejects import RejectSink, REASON_OUTCOMES
+import emission_calculator_backend.models as models
+
+logger = logging.getLogger("root")
+
+STAGES = (
+    "file_discovery",
+    "range_split",
+    "csv_parse",
+    "validation",
+    "factor_lookup",
+    "co2e_calculation",
+    "db_write",
+)
+
+OUTCOMES = (
+    "accepted",
+    "rejected",
+    "unmatched",
+)
+
+SUCCESS_STATUS = "success"
+FAILED_STATUS = "failed"
+
+
+class IngestReport:
+    """
+    Timers for each ingest stage, counts of rows accepted, rejected and unmatched per activity, and
+    the rejected rows sink. Worker processes keep their own report, which is merged into the run's report
+    """
+
+    def __init__(self, rejects_path: str = None):
+        self.started_at = timezone.now()
+        self.finished_at = None
+        self.status = None
+        self.error = None
+        self.stage_seconds = dict.fromkeys(STAGES, 0.0)
+        self.activities = {}
+        self.stats = {}
+        self.rejects = RejectSink(rejects_path)
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Context manager adding the time spent in the block to a stage
+
+        :param name: Stage name
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds[name] += time.perf_counter() - start
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """
+        Function to add time to a stage, for hot loops where a context manager is too slow
+
+        :param name: Stage name
+        :param seconds: Time spent in the stage
+        """
+        self.stage_seconds[name] += seconds
+
+    def count(self, activity: str, outcome: str, rows: int = 1) -> None:
+        """
+        Function to count rows for an activity
+
+        :param activity: Activity name
+        :param outcome: One of "accepted", "rejected" or "unmatched", or "added", "changed" or "unchanged" for
+            emission factors
+        :param rows: Number of rows
+        """
+        if activity not in self.activities:
+            self.activities[activity] = dict.fromkeys(OUTCOMES, 0)
+        self.activities[activity][outcome] = self.activities[activity].get(outcome, 0) + rows
+
+    def reject(self, activity: str, reason: str, row: dict, detail=None) -> None:
+        """
+        Function to count a rejected row, and add it to the rejects sink
+
+        :param activity: Activity name
+        :param reason: Reason code, eg "factor_not_found"
+        :param row: Row data
+        :param detail: Validation error message or serializer errors for the row
+        """
+        self.count(activity, REASON_OUTCOMES[reason])
+        self.rejects.add(activity, reason, row, detail)
+
+    def add_stats(self, name: str, values: dict) -> None:
+        """
+        Function to add counts to a named set of stats, eg cache hits and misses counted in a worker process
+
+        :param name: Stats name
+        :param values: Counts to add
+        """
+        stats = self.stats.setdefault(name, {})
+        for key, value in values.items():
+            stats[key] = stats.get(key, 0) + value
+
+    def merge(self, other: "IngestReport") -> None:
+        """
+        Function to add the timers, counts and stats of another report, eg from a worker process
+
+        :param other: Report to merge
+        """
+        for name, seconds in other.stage_seconds.items():
+            self.stage_seconds[name] += seconds
+        for activity, counts in other.activities.items():
+            for outcome, rows in counts.items():
+                self.count(activity, outcome, rows)
+        for name, values in other.stats.items():
+            self.add_stats(name, values)
+        self.rejects.merge(other.rejects)
+
+    def finish(self, error: Exception = None) -> None:
+        """
+        Function to mark the run as finished
+
+        :param error: Exception that stopped the run, if it failed
+        """
+        self.rejects.close()
+        self.finished_at = timezone.now()
+        self.status = FAILED_STATUS if error else SUCCESS_STATUS
+        self.error = str(error) if error else None
+
+    def to_dict(self) -> dict:
+        """
+        Function returning the report as a JSON serialisable dictionary
+
+        :return: Report dictionary
+        """
+        return {
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "status": self.status,
+            "error": self.error,
+            "stage_seconds": self.stage_seconds,
+            "activities": self.activities,
+            "stats": self.stats,
+            "rejects": self.rejects.to_dict(),
+        }
+
+    def file_path(self, report_folder: str, suffix: str = ".json") -> str:
+        """
+        Function returning the path of a run file, named after the run start time
+
+        :param report_folder: Folder run files are written to
+        :param suffix: File name suffix
+
+        :return: File path
+        """
+        return os.path.join(report_folder, f"ingest_run_{self.started_at.strftime('%Y%m%dT%H%M%S%f')}{suffix}")
+
+    def write(self, report_folder: str) -> str:
+        """
+        Function to write the report to a JSON file named after the run start time
+
+        :param report_folder: Folder the report is written to
+
+        :return: Report file path
+        """
+        os.makedirs(report_folder, exist_ok=True)
+        report_path = self.file_path(report_folder)
+        with open(report_path, "w") as file:
+            json.dump(self.to_dict(), file, indent=4)
+        logger.info(f"Ingest run report written to: '{report_path}'")
+        return report_path
+
+    def save(self) -> models.IngestRun:
+        """
+        Function to store the report in the IngestRun table
+
+        :return: IngestRun object
+        """
+        return models.IngestRun.objects.create(
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            status=self.status,
+            report=self.to_dict(),
+        )
@@ -0,0 +1,107 @@
+import logging
+
+from django.db import transaction
+from django.db.models import Count, F, QuerySet, Sum
+from django.db.models.functions import TruncMonth
+
+from emission_calculator_backend import cache
+import emission_calculator_backend.models as models
+from emission_calculator_backend.ingest.activities import ACTIVITY_TYPES
+
+logger = logging.getLogger("root")
+
+SUMMARY_FIELDS = ("activity", "scope", "category", "month")
+
+
+def activity_models() -> list:
+    """
+    Function returning the activity models rows are saved to, once each
+
+    :return: Array of activity models
+    """
+    return list(dict.fromkeys(activity_type.model for activity_type in ACTIVITY_TYPES.values()))
+
+
+def _month_groups(rows: QuerySet) -> QuerySet:
+    """
+    Function returning the CO2e total and row count of activity rows, grouped by activity, scope, category
+    and month
+
+    :param rows: Activity rows query
+
+    :return: Grouped query
+    """
+    return (
+        rows.annotate(month=TruncMonth("date"))
+        .order_by()
+        .values(*SUMMARY_FIELDS)
+        .annotate(co2e_total=Sum("co2e"), row_count=Count("id"))
+    )
+
+
+def add_rows(rows: QuerySet, sign: int = 1) -> None:
+    """
+    Function to add the CO2e of activity rows to the summary table, or subtract it with a sign of -1,
+    eg before the rows are deleted or recalculated. Only the summary rows for the groups the activity rows
+    fall in are updated, in the caller's transaction. The emissions data version is bumped when any group
+    changes, so cached responses are rebuilt once the transaction commits
+
+    :param rows: Activity rows query
+    :param sign: 1 to add the rows, -1 to subtract them
+    """
+    activity_table = rows.model._meta.db_table
+    # Callers update activity rows in their own transaction, so no savepoint is needed
+    with transaction.atomic(savepoint=False):
+        groups = list(_month_groups(rows))
+        for group in groups:
+            co2e = sign * group["co2e_total"]
+            row_count = sign * group["row_count"]
+            key = {field: group[field] for field in SUMMARY_FIELDS}
+
+            updated = models.EmissionSummary.objects.filter(activity_table=activity_table, **key).update(
+                co2e=F("co2e") + co2e, rows=F("rows") + row_count,
+            )
+            if not updated:
+                models.EmissionSummary.objects.create(
+                    activity_table=activity_table, co2e=co2e, rows=row_count, **key,
+                )
+        if sign < 0:
+            # Groups with no rows left are removed, rather than keeping a rounding error as their total
+            models.EmissionSummary.objects.filter(activity_table=activity_table, rows__lte=0).delete()
+        if groups:
+            cache.bump_data_version()
+
+
+def remove_rows(rows: QuerySet) -> None:
+    """
+    Function to subtract the CO2e of activity rows from the summary table
+
+    :param rows: Activity rows query
+    """
+    add_rows(rows, sign=-1)
+
+
+def remove_file_rows(sender, instance: models.IngestManifest, **kwargs) -> None:
+    """
+    Signal receiver subtracting the rows ingested from a file from the summary table, before the file's
+    manifest entry is deleted with its rows
+
+    :param sender: IngestManifest model
+    :param instance: Manifest entry being deleted
+    """
+    for activity_model in activity_models():
+        remove_rows(activity_model.objects.filter(ingest_file=instance))
+
+
+def rebuild() -> int:
+    """
+    Function to rebuild the summary table from every activity row, eg after rows are changed outside the
+    ingest pipeline
+
+    :return: Number of summary rows
+    """
+    with transaction.atomic():
+        models.EmissionSummary.objects.all().delete()
+        for activity_model in activity_models():
+            add_rows(activity_model.objects.all())
+        return models.EmissionSummary.objects.count()
@@ -0,0 +1,12 @@
+import os
+
+import django
+
+
+def init_worker() -> None:
+    """
+    Initializer for ingest worker processes. Sets up Django so model and input classes
+    can be imported when workers are started without forking the parent process
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "emission_calculator.settings")
+    django.setup()
@@ -0,0 +1,341 @@
+from contextlib import nullcontext
+import logging
+
+from django.db import transaction
+from rest_framework import serializers as drf_serializers
+
+from emission_calculator_backend.ingest.rejects import SERIALIZER_INVALID
+from emission_calculator_backend.ingest.report import IngestReport
+import config
+
+logger = logging.getLogger("root")
+
+STRICT_WRITE_MODE = "strict"
+BATCH_WRITE_MODE = "batch"
+
+
+def _stage(report: IngestReport, name: str):
+    """
+    Function returning a context manager timing a report stage, or doing nothing without a report
+
+    :param report: Ingest report, or None
+    :param name: Stage name
+
+    :return: Context manager
+    """
+    return report.stage(name) if report else nullcontext()
+
+
+def _reject(report: IngestReport, activity: str, data: dict, source, errors) -> None:
+    """
+    Function to record a row failing serializer validation. Rows are sent to the report's rejects
+    sink when writing for an ingest run, and logged otherwise
+
+    :param report: Ingest report, or None
+    :param activity: Activity name
+    :param data: Serializer input data for the row
+    :param source: Input object the row was built from
+    :param errors: Serializer errors
+    """
+    if report:
+        report.reject(activity, SERIALIZER_INVALID, data, errors)
+    else:
+        logger.error(f"Ingest data validation failed. Data: {source}, Reason: {errors}")
+
+
+class SerializerWriter:
+    """
+    Strict (debug) writer, validating and saving every row through its serializer.
+    Each row is a separate INSERT, so errors can be traced back to a single entry.
+    """
+
+    def __init__(
+        self,
+        serializer_class,
+        instance_fields: dict = None,
+        report: IngestReport = None,
+        activity: str = None,
+    ):
+        self.serializer_class = serializer_class
+        self.instance_fields = instance_fields or {}
+        self.report = report
+        self.activity = activity
+        self.written = 0
+        self.rejected = 0
+
+    def write(self, data: dict, source) -> None:
+        """
+        Function to validate and save a single row
+
+        :param data: Serializer input data for the row
+        :param source: Input object the row was built from, used for logging
+        """
+        serializer = self.serializer_class(data=data)
+
+        # Execute mandatory input object validator method
+        with _stage(self.report, "validation"):
+            is_valid = serializer.is_valid()
+        if is_valid:
+            with _stage(self.report, "db_write"):
+                serializer.save(**self.instance_fields)
+            self.written += 1
+        else:
+            _reject(self.report, self.activity, data, source, serializer.errors)
+            self.rejected += 1
+
+    def close(self) -> None:
+        """
+        Function to finish writing. Rows are saved as they are written, so there is nothing to flush
+        """
+
+
+class BatchWriter:
+    """
+    Batched writer, validating rows through the serializer's fields and collecting model
+    instances, which are inserted with bulk_create inside one transaction per batch
+    """
+
+    def __init__(
+        self,
+        serializer_class,
+        batch_size: int,
+        ignore_conflicts: bool = False,
+        instance_fields: dict = None,
+        report: IngestReport = None,
+        activity: str = None,
+    ):
+        self.serializer = serializer_class()
+        self.model = serializer_class.Meta.model
+        self.batch_size = batch_size
+        self.ignore_conflicts = ignore_conflicts
+        self.instance_fields = instance_fields or {}
+        self.report = report
+        self.activity = activity
+        self.written = 0
+        self.rejected = 0
+        self._batch = []
+
+    def write(self, data: dict, source) -> None:
+        """
+        Function to add a row to the current batch, flushing the batch once full
+
+        :param data: Serializer input data for the row
+        :param source: Input object the row was built from, used for logging
+        """
+        self._batch.append((data, source))
+
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def _validate_row(self, data: dict, source):
+        """
+        Function to validate a row, rejecting it if invalid
+
+        :param data: Serializer input data for the row
+        :param source: Input object the row was built from, used for logging
+
+        :return: Model instance for the row, or None if rejected
+        """
+        try:
+            # Reuses a single serializer to validate each row, rather than building one per row
+            validated_data = self.serializer.run_validation(data)
+        except drf_serializers.ValidationError as e:
+            _reject(self.report, self.activity, data, source, e.detail)
+            self.rejected += 1
+            return None
+        return self.model(**validated_data, **self.instance_fields)
+
+    def _validate_batch(self) -> list:
+        """
+        Function to validate the current batch, rejecting invalid rows
+
+        :return: Array of model instances for the valid rows
+        """
+        instances = []
+
+        for data, source in self._batch:
+            instance = self._validate_row(data, source)
+            if instance is not None:
+                instances.append(instance)
+
+        return instances
+
+    def flush(self) -> None:
+        """
+        Function to validate the current batch and insert the valid rows
+        """
+        with _stage(self.report, "validation"):
+            instances = self._validate_batch()
+
+        with _stage(self.report, "db_write"):
+            with transaction.atomic():
+                self.model.objects.bulk_create(instances, ignore_conflicts=self.ignore_conflicts)
+
+        self.written += len(instances)
+        self._batch = []
+
+    def close(self) -> None:
+        """
+        Function to write any remaining rows
+        """
+        if self._batch:
+            self.flush()
+
+
+class UpsertWriter(BatchWriter):
+    """
+    Batched writer inserting new rows, and updating existing rows matching on the unique fields, with
+    bulk_create update_conflicts. Current values are loaded once, so each valid row is counted as added,
+    changed or unchanged, and unchanged rows are not written. As with the unique together check of a
+    strict insert, the first row for each key in a run is kept, and repeated keys are rejected, so counts
+    do not depend on the batch size
+    """
+
+    def __init__(
+        self,
+        serializer_class,
+        batch_size: int,
+        unique_fields: list,
+        update_fields: list,
+        instance_fields: dict = None,
+        report: IngestReport = None,
+        activity: str = None,
+    ):
+        super().__init__(
+            serializer_class, batch_size, instance_fields=instance_fields, report=report, activity=activity,
+        )
+        self.unique_fields = unique_fields
+        self.update_fields = update_fields
+        self.added = 0
+        self.changed = 0
+        self.unchanged = 0
+        # Rows added or changed, as (*unique field values, *update field values) tuples
+        self.changed_rows = []
+        self._current = None
+        # Unique field values of the rows written in this run
+        self._seen = set()
+
+    def _load_current(self) -> dict:
+        """
+        Function to load the update field values of all existing rows, keyed by their unique field values
+
+        :return: Dictionary of update field value tuples
+        """
+        key_length = len(self.unique_fields)
+        return {
+            row[:key_length]: row[key_length:]
+            for row in self.model.objects.values_list(*self.unique_fields, *self.update_fields).iterator()
+        }
+
+    def _validate_row(self, data: dict, source):
+        """
+        Function to validate a row, rejecting it if invalid or if its key was already written in this run
+
+        :param data: Serializer input data for the row
+        :param source: Input object the row was built from, used for logging
+
+        :return: Model instance for the row, or None if rejected
+        """
+        instance = super()._validate_row(data, source)
+        if instance is None:
+            return None
+
+        key = tuple(getattr(instance, field) for field in self.unique_fields)
+        if key in self._seen:
+            errors = {"non_field_errors": [f"The fields {', '.join(self.unique_fields)} must make a unique set."]}
+            _reject(self.report, self.activity, data, source, errors)
+            self.rejected += 1
+            return None
+        self._seen.add(key)
+        return instance
+
+    def flush(self) -> None:
+        """
+        Function to validate the current batch, and insert or update the added and changed rows
+        """
+        if self._current is None:
+            with _stage(self.report, "db_write"):
+                self._current = self._load_current()
+
+        with _stage(self.report, "validation"):
+            instances = self._validate_batch()
+
+        upserts = []
+        for instance in instances:
+            key = tuple(getattr(instance, field) for field in self.unique_fields)
+            values = tuple(getattr(instance, field) for field in self.update_fields)
+            current = self._current.get(key)
+            if current is None:
+                self.added += 1
+            elif current != values:
+                self.changed += 1
+                self.changed_rows.append((*key, *values))
+            else:
+                self.unchanged += 1
+                continue
+            self._current[key] = values
+            upserts.append(instance)
+
+        with _stage(self.report, "db_write"):
+            with transaction.atomic():
+                self.model.objects.bulk_create(
+                    upserts,
+                    update_conflicts=True,
+                    unique_fields=self.unique_fields,
+                    update_fields=self.update_fields,
+                )
+
+        self.written += len(upserts)
+        self._batch = []
+
+
+def create_writer(
+    serializer_class,
+    write_mode: str = config.INGEST_WRITE_MODE,
+    batch_size: int = config.INGEST_BATCH_SIZE,
+    ignore_conflicts: bool = False,
+    instance_fields: dict = None,
+    report: IngestReport = None,
+    activity: str = None,
+    unique_fields: list = None,
+    update_fields: list = None,
+):
+    """
+    Function returning the writer for the requested write mode
+
+    :param serializer_class: Serializer for the target model
+    :param write_mode: "batch" for bulk inserts, or "strict" for per-row serializer saves
+    :param batch_size: Number of rows inserted per transaction in batch mode
+    :param ignore_conflicts: Skip rows violating unique constraints in batch mode
+    :param instance_fields: Model fields set on every saved row, that are not validated by the serializer
+    :param report: Ingest report timing the validation and database write stages and collecting rejected rows,
+        if given
+    :param activity: Activity name rejected rows are counted against in the report
+    :param unique_fields: Fields identifying existing rows to update. If given, rows are upserted in batches,
+        with a batch size of 1 in strict mode
+    :param update_fields: Fields updated on existing rows, when upserting
+
+    :return: Writer object
+    """
+    if unique_fields and write_mode in (STRICT_WRITE_MODE, BATCH_WRITE_MODE):
+        return UpsertWriter(
+            serializer_class,
+            1 if write_mode == STRICT_WRITE_MODE else batch_size,
+            unique_fields,
+            update_fields,
+            instance_fields=instance_fields,
+            report=report,
+            activity=activity,
+        )
+    if write_mode == STRICT_WRITE_MODE:
+        return SerializerWriter(serializer_class, instance_fields=instance_fields, report=report, activity=activity)
+    elif write_mode == BATCH_WRITE_MODE:
+        return BatchWriter(
+            serializer_class,
+            batch_size,
+            ignore_conflicts=ignore_conflicts,
+            instance_fields=instance_fields,
+            report=report,
+            activity=activity,
+        )
+    raise ValueError(f"Unknown ingest write mode: {write_mode}")
@@ -0,0 +1,55 @@
+# Generated by Django 4.1.13 on 2026-10-18 12:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("emission_calculator_backend", "0009_rename_electricty_electricity_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IngestManifest",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("path", models.CharField(max_length=1000, unique=True)),
+                ("size", models.BigIntegerField()),
+                ("mtime", models.FloatField()),
+                ("content_hash", models.CharField(max_length=64)),
+                ("ingested_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "Ingest Manifest",
+            },
+        ),
+        migrations.AddField(
+            model_name="airtravel",
+            name="ingest_file",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="emission_calculator_backend.ingestmanifest",
+            ),
+        ),
+        migrations.AddField(
+            model_name="electricity",
+            name="ingest_file",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="emission_calculator_backend.ingestmanifest",
+            ),
+        ),
+        migrations.AddField(
+            model_name="purchasedgoodsandservices",
+            name="ingest_file",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="emission_calculator_backend.ingestmanifest",
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.1.13 on 2026-10-18 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("emission_calculator_backend", "0010_ingestmanifest_airtravel_ingest_file_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IngestRun",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("started_at", models.DateTimeField()),
+                ("finished_at", models.DateTimeField(null=True)),
+                ("status", models.CharField(max_length=200)),
+                ("report", models.JSONField()),
+            ],
+            options={
+                "verbose_name_plural": "Ingest Runs",
+            },
+        ),
+    ]
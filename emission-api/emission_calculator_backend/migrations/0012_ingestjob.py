@@ -0,0 +1,34 @@
+# Generated by Django 4.1.13 on 2026-10-18 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("emission_calculator_backend", "0011_ingestrun"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IngestJob",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("activity", models.CharField(max_length=200)),
+                ("file_name", models.CharField(max_length=200)),
+                ("path", models.CharField(max_length=1000, null=True)),
+                ("size", models.BigIntegerField(default=0)),
+                ("status", models.CharField(max_length=200)),
+                ("rows_processed", models.IntegerField(default=0)),
+                ("rows_rejected", models.IntegerField(default=0)),
+                ("error", models.TextField(null=True)),
+                ("report", models.JSONField(null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("started_at", models.DateTimeField(null=True)),
+                ("finished_at", models.DateTimeField(null=True)),
+            ],
+            options={
+                "verbose_name_plural": "Ingest Jobs",
+            },
+        ),
+    ]
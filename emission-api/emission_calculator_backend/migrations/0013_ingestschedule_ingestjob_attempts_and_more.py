@@ -0,0 +1,70 @@
+# Generated by Django 4.1.13 on 2026-10-18 12:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("emission_calculator_backend", "0012_ingestjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IngestSchedule",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("name", models.CharField(max_length=200, unique=True)),
+                ("activity", models.CharField(max_length=200)),
+                ("path", models.CharField(max_length=1000)),
+                ("cron", models.CharField(max_length=200)),
+                ("priority", models.IntegerField(default=0)),
+                ("enabled", models.BooleanField(default=True)),
+                ("last_run_at", models.DateTimeField(null=True)),
+                ("next_run_at", models.DateTimeField(null=True)),
+            ],
+            options={
+                "verbose_name_plural": "Ingest Schedules",
+            },
+        ),
+        migrations.AddField(
+            model_name="ingestjob",
+            name="attempts",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="ingestjob",
+            name="max_attempts",
+            field=models.IntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name="ingestjob",
+            name="priority",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="ingestjob",
+            name="run_after",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name="ingestjob",
+            name="file_name",
+            field=models.CharField(max_length=200, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="ingestjob",
+            index=models.Index(fields=["status", "-priority", "run_after"], name="emission_ca_status_2b3def_idx"),
+        ),
+        migrations.AddField(
+            model_name="ingestjob",
+            name="schedule",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="emission_calculator_backend.ingestschedule",
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.1.13 on 2026-10-18 12:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("emission_calculator_backend", "0013_ingestschedule_ingestjob_attempts_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="airtravel",
+            index=models.Index(fields=["co2e", "id"], name="emission_ca_co2e_fe80aa_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="electricity",
+            index=models.Index(fields=["co2e", "id"], name="emission_ca_co2e_1e2e6c_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="purchasedgoodsandservices",
+            index=models.Index(fields=["co2e", "id"], name="emission_ca_co2e_8938c7_idx"),
+        ),
+    ]
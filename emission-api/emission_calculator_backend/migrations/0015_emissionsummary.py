@@ -0,0 +1,59 @@
+# Generated by Django 4.1.13 on 2026-10-18 12:38
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def populate_emission_summary(apps, schema_editor):
+    """
+    Function to build the emission summary from the activity rows already ingested
+    """
+    emission_summary = apps.get_model("emission_calculator_backend", "EmissionSummary")
+    for model_name in ["AirTravel", "PurchasedGoodsAndServices", "Electricity"]:
+        activity_model = apps.get_model("emission_calculator_backend", model_name)
+        groups = (
+            activity_model.objects.annotate(month=TruncMonth("date"))
+            .values("activity", "scope", "category", "month")
+            .annotate(co2e_total=Sum("co2e"), row_count=Count("id"))
+        )
+        emission_summary.objects.bulk_create([
+            emission_summary(
+                activity_table=activity_model._meta.db_table,
+                activity=group["activity"],
+                scope=group["scope"],
+                category=group["category"],
+                month=group["month"],
+                co2e=group["co2e_total"],
+                rows=group["row_count"],
+            )
+            for group in groups
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("emission_calculator_backend", "0014_airtravel_emission_ca_co2e_fe80aa_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmissionSummary",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("activity_table", models.CharField(max_length=200)),
+                ("activity", models.CharField(max_length=200)),
+                ("scope", models.IntegerField()),
+                ("category", models.IntegerField(null=True)),
+                ("month", models.DateField()),
+                ("co2e", models.FloatField()),
+                ("rows", models.IntegerField()),
+            ],
+            options={
+                "verbose_name_plural": "Emission Summary",
+                "unique_together": {("activity_table", "activity", "scope", "category", "month")},
+            },
+        ),
+        migrations.RunPython(populate_emission_summary, migrations.RunPython.noop),
+    ]
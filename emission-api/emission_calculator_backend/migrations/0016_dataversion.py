@@ -0,0 +1,24 @@
+# Generated by Django 4.1.13 on 2026-10-18 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("emission_calculator_backend", "0015_emissionsummary"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DataVersion",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("name", models.CharField(max_length=200, unique=True)),
+                ("version", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name_plural": "Data Versions",
+            },
+        ),
+    ]
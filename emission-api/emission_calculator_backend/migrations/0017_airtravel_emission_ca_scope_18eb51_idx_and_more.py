@@ -0,0 +1,37 @@
+# Generated by Django 4.1.13 on 2026-10-18 12:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("emission_calculator_backend", "0016_dataversion"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="airtravel",
+            index=models.Index(fields=["scope", "category", "co2e", "id"], name="emission_ca_scope_18eb51_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="airtravel",
+            index=models.Index(fields=["date", "co2e"], name="emission_ca_date_cb6b4a_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="electricity",
+            index=models.Index(fields=["scope", "category", "co2e", "id"], name="emission_ca_scope_4104b8_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="electricity",
+            index=models.Index(fields=["date", "co2e"], name="emission_ca_date_256b9d_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="purchasedgoodsandservices",
+            index=models.Index(fields=["scope", "category", "co2e", "id"], name="emission_ca_scope_b601af_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="purchasedgoodsandservices",
+            index=models.Index(fields=["date", "co2e"], name="emission_ca_date_f3bbe7_idx"),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.1.13 on 2026-10-18 13:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("emission_calculator_backend", "0017_airtravel_emission_ca_scope_18eb51_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ingestmanifest",
+            name="stale",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="ingestmanifest",
+            name="unmatched_rows",
+            field=models.IntegerField(default=0),
+        ),
+    ]
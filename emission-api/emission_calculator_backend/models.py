@@ -1,9 +1,11 @@
 from django.db import models
+from django.utils import timezone
 import logging
 from datetime import datetime
+from operator import itemgetter
 import json
 
-import config
+from emission_calculator_backend.ingest.dates import date_parser
 
 
 logger = logging.getLogger("root")
@@ -22,13 +24,117 @@ def convert_date(date: str) -> datetime.date:
     :return: Date in as date type
     """
     try:
-        date = datetime.strptime(date, "%d/%m/%Y").date()
+        date = date_parser.parse(date)
     except ValueError:
-        logger.error(f"Incorrect Air Travel datetime format. Data: {date}")
         raise ValueError(f"Incorrect Air Travel datetime format. Data: {date}")
     return date
 
 
+def column_getter(header: list, columns: tuple) -> itemgetter:
+    """
+    Function to resolve the positions of an input class's columns in a CSV header, once per file
+
+    :param header: CSV header row
+    :param columns: Column names, in the order the input class takes them
+
+    :return: Getter returning a tuple of the column values from a CSV row
+    """
+    positions = {column: i for i, column in enumerate(header)}
+    # KeyError is raised for the first missing column, as with a dictionary lookup of each row
+    return itemgetter(*[positions[column] for column in columns])
+
+
+class IngestManifest(models.Model):
+    id = models.AutoField(primary_key=True)
+    path = models.CharField(max_length=1000, unique=True, null=False)
+    size = models.BigIntegerField(null=False)
+    mtime = models.FloatField(null=False)
+    content_hash = models.CharField(max_length=64, null=False)
+    ingested_at = models.DateTimeField(auto_now=True)
+    # Rows without an emission factor are ingested again once factors are added or changed
+    unmatched_rows = models.IntegerField(default=0)
+    stale = models.BooleanField(default=False)
+
+    class Meta:
+        verbose_name_plural = "Ingest Manifest"
+
+
+class IngestRun(models.Model):
+    id = models.AutoField(primary_key=True)
+    started_at = models.DateTimeField(null=False)
+    finished_at = models.DateTimeField(null=True)
+    status = models.CharField(max_length=200, null=False)
+    report = models.JSONField(null=False)
+
+    class Meta:
+        verbose_name_plural = "Ingest Runs"
+
+
+class IngestSchedule(models.Model):
+    id = models.AutoField(primary_key=True)
+    name = models.CharField(max_length=200, unique=True, null=False)
+    activity = models.CharField(max_length=200, null=False)
+    path = models.CharField(max_length=1000, null=False)
+    cron = models.CharField(max_length=200, null=False)
+    priority = models.IntegerField(null=False, default=0)
+    enabled = models.BooleanField(null=False, default=True)
+    last_run_at = models.DateTimeField(null=True)
+    next_run_at = models.DateTimeField(null=True)
+
+    class Meta:
+        verbose_name_plural = "Ingest Schedules"
+
+
+class IngestJob(models.Model):
+    id = models.AutoField(primary_key=True)
+    activity = models.CharField(max_length=200, null=False)
+    file_name = models.CharField(max_length=200, null=True)
+    path = models.CharField(max_length=1000, null=True)
+    schedule = models.ForeignKey(IngestSchedule, on_delete=models.SET_NULL, null=True)
+    priority = models.IntegerField(null=False, default=0)
+    attempts = models.IntegerField(null=False, default=0)
+    max_attempts = models.IntegerField(null=False, default=1)
+    run_after = models.DateTimeField(default=timezone.now)
+    size = models.BigIntegerField(null=False, default=0)
+    status = models.CharField(max_length=200, null=False)
+    rows_processed = models.IntegerField(null=False, default=0)
+    rows_rejected = models.IntegerField(null=False, default=0)
+    error = models.TextField(null=True)
+    report = models.JSONField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True)
+    finished_at = models.DateTimeField(null=True)
+
+    class Meta:
+        verbose_name_plural = "Ingest Jobs"
+        # Queued jobs are claimed by highest priority, then earliest run time
+        indexes = [models.Index(fields=["status", "-priority", "run_after"])]
+
+
+class EmissionSummary(models.Model):
+    id = models.AutoField(primary_key=True)
+    activity_table = models.CharField(max_length=200, null=False)
+    activity = models.CharField(max_length=200, null=False)
+    scope = models.IntegerField(null=False)
+    category = models.IntegerField(null=True)
+    month = models.DateField(null=False)
+    co2e = models.FloatField(null=False)
+    rows = models.IntegerField(null=False)
+
+    class Meta:
+        verbose_name_plural = "Emission Summary"
+        unique_together = ("activity_table", "activity", "scope", "category", "month")
+
+
+class DataVersion(models.Model):
+    id = models.AutoField(primary_key=True)
+    name = models.CharField(max_length=200, null=False, unique=True)
+    version = models.BigIntegerField(null=False, default=0)
+
+    class Meta:
+        verbose_name_plural = "Data Versions"
+
+
 class EmissionFactors(models.Model):
     id = models.AutoField(primary_key=True)
     activity = models.CharField(max_length=200, null=False)
@@ -44,23 +150,34 @@ class EmissionFactors(models.Model):
 
 
 class InputEmissionFactors:
-    def __init__(self, **kwargs):
-        self.activity = kwargs["Activity"].lower()
-        self.lookup_identifier = kwargs["Lookup identifiers"].lower()
-        self.unit = kwargs["Unit"].lower()
-        self.co2e = float(kwargs["CO2e"])
-        self.scope = kwargs["Scope"]
-        self.category = kwargs["Category"] if kwargs["Category"] else None
+    __slots__ = ("activity", "lookup_identifier", "unit", "co2e", "scope", "category")
+    COLUMNS = ("Activity", "Lookup identifiers", "Unit", "CO2e", "Scope", "Category")
+
+    def __init__(self, activity, lookup_identifier, unit, co2e, scope, category):
+        self.activity = activity.lower()
+        self.lookup_identifier = lookup_identifier.lower()
+        self.unit = unit.lower()
+        self.co2e = float(co2e)
+        self.scope = scope
+        self.category = category if category else None
 
     def __str__(self):
-        return json.dumps({
+        return json.dumps(self.to_dict())
+
+    def to_dict(self) -> dict:
+        """
+        Function returning the input object's fields, eg for the rejected rows sink
+
+        :return: Dictionary of fields
+        """
+        return {
             "activity": self.activity,
             "lookup_identifier": self.lookup_identifier,
             "unit": self.unit,
             "co2e": self.co2e,
             "scope": self.scope,
             "category": self.category,
-        })
+        }
 
 
 class AirTravel(models.Model):
@@ -76,24 +193,47 @@ class AirTravel(models.Model):
     scope = models.IntegerField(null=False)
     category = models.IntegerField(null=True)
 
+    ingest_file = models.ForeignKey(IngestManifest, null=True, on_delete=models.CASCADE)
+
     class Meta:
         verbose_name_plural = "Air Travel"
+        indexes = [
+            # Supports the emissions response's keyset pagination, ordered by CO2e then id
+            models.Index(fields=["co2e", "id"]),
+            # Supports pages filtered by scope and category, in the same order
+            models.Index(fields=["scope", "category", "co2e", "id"]),
+            # Supports pages and CO2e totals filtered by a date range
+            models.Index(fields=["date", "co2e"]),
+        ]
 
 
 class InputAirTravel:
-    def __init__(self, **kwargs):
-        self.date = kwargs["Date"]
-        self.activity = kwargs["Activity"].lower()
-        self.distance_travelled = float(kwargs["Distance travelled"]) if kwargs["Distance travelled"] else 0.0
-        self.distance_unit = kwargs["Distance units"].lower()
-        self.flight_range = kwargs["Flight range"].lower()
-        self.passenger_class = kwargs["Passenger class"].lower()
+    __slots__ = (
+        "date", "activity", "distance_travelled", "distance_unit", "flight_range", "passenger_class", "booking_type",
+    )
+    COLUMNS = ("Date", "Activity", "Distance travelled", "Distance units", "Flight range", "Passenger class")
+
+    def __init__(self, date, activity, distance_travelled, distance_unit, flight_range, passenger_class):
+        self.date = date
+        self.activity = activity.lower()
+        self.distance_travelled = float(distance_travelled) if distance_travelled else 0.0
+        self.distance_unit = distance_unit.lower()
+        self.flight_range = flight_range.lower()
+        self.passenger_class = passenger_class.lower()
         self.booking_type = self.flight_range.lower() + ", " + self.passenger_class.lower()
-        self.transform_distance_unit()
+        self.validate_distance_unit()
         self.date = convert_date(self.date)
 
     def __str__(self):
-        return json.dumps({
+        return json.dumps(self.to_dict())
+
+    def to_dict(self) -> dict:
+        """
+        Function returning the input object's fields, eg for the rejected rows sink
+
+        :return: Dictionary of fields
+        """
+        return {
             "date": str(self.date),
             "activity": self.activity,
             "distance_travelled": self.distance_travelled,
@@ -101,21 +241,14 @@ class InputAirTravel:
             "flight_range": self.flight_range,
             "passenger_class": self.passenger_class,
             "booking_type": self.booking_type,
-        })
+        }
 
-    def transform_distance_unit(self) -> None:
+    def validate_distance_unit(self) -> None:
         """
-        Function to validate and transform distance to kilometres
+        Function to validate distance unit. Distances are converted to kilometres
+        for a whole chunk of rows at a time, in the ingest calculation stage
         """
-        # Checks if distance unit is miles, if yes, unit is standardised
-        if self.distance_unit == "miles":
-            # Convert distance to kilometres
-            self.distance_travelled = self.distance_travelled * config.MILES_TO_KM_CONVERSION
-            self.distance_unit = "kilometres"
-        elif self.distance_unit == "kilometres":
-            self.distance_travelled = self.distance_travelled
-        else:
-            logger.error(f"No standard distance unit used. Unit: {self.distance_unit}")
+        if self.distance_unit not in ("miles", "kilometres"):
             raise ValueError(f"Air Travel distance unit validation failed. Unit: {self.distance_unit}")
 
 
@@ -130,27 +263,48 @@ class PurchasedGoodsAndServices(models.Model):
     scope = models.IntegerField(null=False)
     category = models.IntegerField(null=True)
 
+    ingest_file = models.ForeignKey(IngestManifest, null=True, on_delete=models.CASCADE)
+
     class Meta:
         verbose_name_plural = "Purchased Goods and Services"
+        indexes = [
+            # Supports the emissions response's keyset pagination, ordered by CO2e then id
+            models.Index(fields=["co2e", "id"]),
+            # Supports pages filtered by scope and category, in the same order
+            models.Index(fields=["scope", "category", "co2e", "id"]),
+            # Supports pages and CO2e totals filtered by a date range
+            models.Index(fields=["date", "co2e"]),
+        ]
 
 
 class InputPurchasedGoodsAndServices:
-    def __init__(self, **kwargs):
-        self.date = kwargs["Date"]
-        self.activity = kwargs["Activity"].lower()
-        self.supplier_category = kwargs["Supplier category"].lower()
-        self.spend = float(kwargs["Spend"]) if kwargs["Spend"] else 0.0
-        self.spend_unit = kwargs["Spend units"].lower()
+    __slots__ = ("date", "activity", "supplier_category", "spend", "spend_unit")
+    COLUMNS = ("Date", "Activity", "Supplier category", "Spend", "Spend units")
+
+    def __init__(self, date, activity, supplier_category, spend, spend_unit):
+        self.date = date
+        self.activity = activity.lower()
+        self.supplier_category = supplier_category.lower()
+        self.spend = float(spend) if spend else 0.0
+        self.spend_unit = spend_unit.lower()
         self.date = convert_date(self.date)
 
     def __str__(self):
-        return json.dumps({
+        return json.dumps(self.to_dict())
+
+    def to_dict(self) -> dict:
+        """
+        Function returning the input object's fields, eg for the rejected rows sink
+
+        :return: Dictionary of fields
+        """
+        return {
             "date": str(self.date),
             "activity": self.activity,
             "supplier_category": self.supplier_category,
             "spend": self.spend,
             "spend_unit": self.spend_unit,
-        })
+        }
 
 
 class Electricity(models.Model):
@@ -164,24 +318,45 @@ class Electricity(models.Model):
     scope = models.IntegerField(null=False)
     category = models.IntegerField(null=True)
 
+    ingest_file = models.ForeignKey(IngestManifest, null=True, on_delete=models.CASCADE)
+
     class Meta:
         verbose_name_plural = "Electricity"
+        indexes = [
+            # Supports the emissions response's keyset pagination, ordered by CO2e then id
+            models.Index(fields=["co2e", "id"]),
+            # Supports pages filtered by scope and category, in the same order
+            models.Index(fields=["scope", "category", "co2e", "id"]),
+            # Supports pages and CO2e totals filtered by a date range
+            models.Index(fields=["date", "co2e"]),
+        ]
 
 
 class InputElectricity:
-    def __init__(self, **kwargs):
-        self.activity = kwargs["Activity"].lower()
-        self.date = kwargs["Date"]
-        self.country = kwargs["Country"].lower()
-        self.electricity_usage = float(kwargs["Electricity Usage"]) if kwargs["Electricity Usage"] else 0.0
-        self.unit = kwargs["Units"].lower()
+    __slots__ = ("activity", "date", "country", "electricity_usage", "unit")
+    COLUMNS = ("Activity", "Date", "Country", "Electricity Usage", "Units")
+
+    def __init__(self, activity, date, country, electricity_usage, unit):
+        self.activity = activity.lower()
+        self.date = date
+        self.country = country.lower()
+        self.electricity_usage = float(electricity_usage) if electricity_usage else 0.0
+        self.unit = unit.lower()
         self.date = convert_date(self.date)
 
     def __str__(self):
-        return json.dumps({
+        return json.dumps(self.to_dict())
+
+    def to_dict(self) -> dict:
+        """
+        Function returning the input object's fields, eg for the rejected rows sink
+
+        :return: Dictionary of fields
+        """
+        return {
             "activity": self.activity,
             "date": str(self.date),
             "country": self.country,
             "electricity_usage": self.electricity_usage,
             "unit": self.unit,
-        })
+        }
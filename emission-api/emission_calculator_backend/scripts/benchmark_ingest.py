@@ -0,0 +1,232 @@
+import csv
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from django.db import connection
+
+from emission_calculator_backend.scripts import import_data
+import config
+
+logger = logging.getLogger("root")
+
+DEFAULT_ROWS = 10000
+DEFAULT_OUTPUT_PATH = "./ingest_benchmark.json"
+
+ACTIVITY_FOLDERS = {
+    "air travel": "air_travel",
+    "purchased goods and services": "purchased_goods_and_services",
+    "electricity": "electricity",
+}
+
+START_DATE = date(2023, 1, 1)
+DATE_RANGE_DAYS = 365
+
+
+def _read_emission_factors(emission_factor_path: str) -> list:
+    """
+    Function to read the raw rows of all emission factor CSV files in a folder
+
+    :param emission_factor_path: Folder path containing emission factor files
+
+    :return: Array of emission factor rows
+    """
+    factor_rows = []
+    for file_path in import_data._find_csv_files(emission_factor_path):
+        with open(file_path, newline="", encoding="utf-8") as file:
+            factor_rows.extend(csv.DictReader(file))
+    return factor_rows
+
+
+def generate_dataset(
+    output_dir: str,
+    rows: int,
+    emission_factor_path: str = config.EMISSION_FACTOR_INGEST_FOLDER,
+    seed: int = 0,
+) -> dict:
+    """
+    Function to generate synthetic emission factor and activity CSV files.
+    Activity rows use the real lookup identifiers from the emission factor files, and are split
+    evenly across Air Travel, Purchased Goods and Services and Electricity. Files are written
+    one row at a time, so any number of rows can be generated
+
+    :param output_dir: Folder the ingest folders are created in
+    :param rows: Total number of activity rows
+    :param emission_factor_path: Folder path containing the emission factor files used as lookups
+    :param seed: Random seed, so the same data is generated for each benchmark run
+
+    :return: Dictionary of ingest folder paths, keyed by the import_data.run parameter name
+    """
+    rng = random.Random(seed)
+    factor_rows = _read_emission_factors(emission_factor_path)
+
+    lookups = {activity: [] for activity in ACTIVITY_FOLDERS}
+    for factor_row in factor_rows:
+        activity = factor_row["Activity"].lower()
+        if activity in lookups:
+            lookups[activity].append((factor_row["Lookup identifiers"], factor_row["Unit"]))
+
+    paths = {
+        "emission_factor_path": os.path.join(output_dir, "emission_factors"),
+        "air_travel_path": os.path.join(output_dir, "air_travel"),
+        "goods_services_path": os.path.join(output_dir, "purchased_goods_and_services"),
+        "electricity_path": os.path.join(output_dir, "electricity"),
+    }
+    for path in paths.values():
+        os.makedirs(path, exist_ok=True)
+
+    with open(os.path.join(paths["emission_factor_path"], "emission_factors.csv"), "w", newline="") as file:
+        writer = csv.DictWriter(
+            file, fieldnames=["Activity", "Lookup identifiers", "Unit", "CO2e", "Scope", "Category"],
+        )
+        writer.writeheader()
+        writer.writerows(
+            {field: factor_row[field] for field in writer.fieldnames} for factor_row in factor_rows
+        )
+
+    def random_date() -> str:
+        return (START_DATE + timedelta(days=rng.randrange(DATE_RANGE_DAYS))).strftime("%d/%m/%Y")
+
+    activity_rows = rows // 3
+
+    with open(os.path.join(paths["air_travel_path"], "air_travel.csv"), "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Date", "Activity", "Distance travelled", "Distance units", "Flight range", "Passenger class"])
+        for _ in range(activity_rows):
+            flight_range, passenger_class = rng.choice(lookups["air travel"])[0].split(", ", 1)
+            writer.writerow([
+                random_date(),
+                "Air Travel",
+                rng.randint(100, 10000),
+                rng.choice(["miles", "kilometres"]),
+                flight_range,
+                passenger_class,
+            ])
+
+    with open(os.path.join(paths["goods_services_path"], "purchased_goods_and_services.csv"), "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Date", "Activity", "Supplier category", "Spend", "Spend units"])
+        for _ in range(activity_rows):
+            supplier_category, spend_unit = rng.choice(lookups["purchased goods and services"])
+            writer.writerow([
+                random_date(), "Purchased Goods and Services", supplier_category, rng.randint(10, 50000), spend_unit,
+            ])
+
+    with open(os.path.join(paths["electricity_path"], "electricity.csv"), "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Activity", "Date", "Country", "Electricity Usage", "Units"])
+        for _ in range(rows - 2 * activity_rows):
+            country, unit = rng.choice(lookups["electricity"])
+            writer.writerow(["Electricity", random_date(), country, round(rng.uniform(1, 1000), 6), unit])
+
+    return paths
+
+
+def _peak_rss_mb() -> float:
+    """
+    Function returning the peak resident set size of this process and its worker processes
+
+    :return: Peak RSS in megabytes
+    """
+    peak_rss = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # ru_maxrss is reported in bytes on macOS, and kilobytes on Linux
+    return peak_rss / (1024 * 1024) if sys.platform == "darwin" else peak_rss / 1024
+
+
+def _git_commit() -> str:
+    """
+    Function returning the current git commit, so results can be compared between commits
+
+    :return: Commit hash, or None if not run in a git repository
+    """
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(rows: int = DEFAULT_ROWS, output_path: str = DEFAULT_OUTPUT_PATH, **ingest_options) -> dict:
+    """
+    Function to run the ingest end to end against a scratch SQLite database, using a
+    synthetic dataset, and write the results to a JSON file
+
+    :param rows: Total number of activity rows generated
+    :param output_path: JSON file path the results are written to
+    :param ingest_options: Extra ingest options passed to the import_data run function
+
+    :return: Benchmark results
+    """
+    stages = {}
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        start = time.perf_counter()
+        paths = generate_dataset(os.path.join(temp_dir, "data"), rows)
+        stages["generate"] = time.perf_counter() - start
+
+        # Scratch database created through Django's test database creation, so the
+        # configured database is left untouched
+        connection.settings_dict.setdefault("TEST", {})["NAME"] = os.path.join(temp_dir, "benchmark.sqlite3")
+        start = time.perf_counter()
+        old_database_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        stages["migrate"] = time.perf_counter() - start
+
+        try:
+            start = time.perf_counter()
+            report = import_data.run(**paths, report_folder=None, store_run=False, **ingest_options)
+            stages["ingest"] = time.perf_counter() - start
+        finally:
+            connection.creation.destroy_test_db(old_database_name, verbosity=0)
+
+    results = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "rows": rows,
+        "ingest_options": ingest_options,
+        "stages": stages,
+        "ingest_stages": report.stage_seconds,
+        "ingest_rows": report.activities,
+        "rows_per_second": rows / stages["ingest"] if stages["ingest"] else None,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+    with open(output_path, "w") as file:
+        json.dump(results, file, indent=4)
+
+    logger.info(f"Ingest benchmark complete: {json.dumps(results)}")
+    return results
+
+
+def run(*args) -> None:
+    """
+    Function being run through Django's runscript method, eg:
+    python manage.py runscript benchmark_ingest --script-args rows=1000000 workers=4 output=results.json
+
+    :param args: Optional rows, output, workers, write_mode and batch_size arguments, as key=value strings
+    """
+    options = dict(arg.split("=", 1) for arg in args)
+
+    ingest_options = {}
+    if "workers" in options:
+        ingest_options["workers"] = int(options["workers"])
+    if "batch_size" in options:
+        ingest_options["batch_size"] = int(options["batch_size"])
+    if "write_mode" in options:
+        ingest_options["write_mode"] = options["write_mode"]
+
+    run_benchmark(
+        rows=int(options.get("rows", DEFAULT_ROWS)),
+        output_path=options.get("output", DEFAULT_OUTPUT_PATH),
+        **ingest_options,
+    )
@@ -0,0 +1,19 @@
+import logging
+
+from emission_calculator_backend.ingest import jobs
+
+logger = logging.getLogger("root")
+
+
+def run(*args) -> None:
+    """
+    Function being run through Django's runscript method, eg:
+    python manage.py runscript enqueue_ingest --script-args "activity=air travel" path=./backfill/ priority=-10
+
+    Queues an incremental ingest of a folder, eg a large backfill with a low priority, to be run by the ingest job queue
+
+    :param args: Activity and path arguments, and an optional priority argument, as key=value strings
+    """
+    options = dict(arg.split("=", 1) for arg in args)
+    job = jobs.enqueue_job(options["activity"], options["path"], int(options.get("priority", 0)))
+    logger.info(f"Queued ingest job: {job.pk}")
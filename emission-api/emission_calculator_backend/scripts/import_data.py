@@ -1,248 +1,577 @@
 import csv
 import os
 import logging
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import count, islice
+from operator import attrgetter
+from typing import Iterable, Iterator
+
+import numpy as np
 
 import emission_calculator_backend.serializers as serializers
 import emission_calculator_backend.models as models
+from emission_calculator_backend.ingest import activities, calculation
+from emission_calculator_backend.ingest.activities import ActivityType
+from emission_calculator_backend.ingest.dates import date_parser
+from emission_calculator_backend.ingest.factor_index import EmissionFactorIndex
+from emission_calculator_backend.ingest.manifest import (
+    find_files_to_ingest,
+    mark_unmatched_files_stale,
+    remove_untracked_rows,
+    replace_file_rows,
+)
+from emission_calculator_backend.ingest.ranges import read_byte_range, split_byte_ranges
+from emission_calculator_backend.ingest.recalculation import recalculate_changed_factors
+from emission_calculator_backend.ingest.rejects import INVALID_ROW, FACTOR_NOT_FOUND
+from emission_calculator_backend.ingest.report import IngestReport
+from emission_calculator_backend.ingest.writers import create_writer
+from emission_calculator_backend.ingest.workers import init_worker
 import config
 
 logger = logging.getLogger("root")
 
 
-def _data_ingest(ingest_folder_path: str, input_class) -> list:
+def _find_csv_files(ingest_folder_path: str) -> list:
     """
-    Reusable component to find CSV file paths in a directory and return the content
+    Function to find CSV file paths in a directory
 
     :param ingest_folder_path: Folder path containing files to be ingested
 
-    :return: Array with objects containing CSV data
+    :return: Array of CSV file paths
     """
     # Find all file paths in ingest folder with .csv extension
     try:
-        file_paths = [
-            file_path for file_path in os.listdir(ingest_folder_path)
+        return [
+            os.path.join(ingest_folder_path, file_path) for file_path in os.listdir(ingest_folder_path)
             if os.path.splitext(file_path)[1] == ".csv"
         ]
     except FileNotFoundError as e:
         logger.error(f"No directory found. See {e}")
         return []
 
-    file_content_array = []
-    content = []
 
-    # Loop through file paths and extract data
-    for path in file_paths:
-        logger.info(f"Ingesting: '{path}'")
-        with open(os.path.join(ingest_folder_path, path), newline="", encoding="utf-8") as file:
-            file_content = csv.DictReader(file)
-            try:
-                # Create array of objects with content. In future return only
-                # file without creating array (better scalability)
-                for row in file_content:
-                    try:
-                        content.append(input_class(**row))
-                    except ValueError:
-                        # If value error returned, this means data validation has failed,
-                        # and this row will be skipped
-                        continue
-            except KeyError as e:
-                raise KeyError(f"Column validation failed for: '{path}' on column: {e}")
-        file_content_array.append(content)
+def _validate_rows(
+    reader: Iterator,
+    header: list,
+    file_path: str,
+    input_class,
+    activity: str,
+    report: IngestReport,
+) -> Iterator:
+    """
+    Generator validating CSV rows one at a time, and yielding input objects
 
-    return file_content_array
+    :param reader: CSV reader returning each row as a list
+    :param header: CSV header row
+    :param file_path: CSV file path, used for error messages
+    :param input_class: Input class used to validate each row
+    :param activity: Activity name rows are counted against in the report
+    :param report: Ingest report timing the parse and validation stages, and collecting rejected rows
 
+    :return: Iterator of input objects
+    """
+    parse_seconds = 0.0
+    validation_seconds = 0.0
+    # Column positions are resolved from the header on the first row, rather than building a dictionary per row
+    get_columns = None
 
-def _fetch_emission_factor_object(
-    activity: str,
-    lookup_identifier: str,
-    unit: str,
-) -> models.EmissionFactors:
+    try:
+        while True:
+            # Timed without context managers, as this runs for every row
+            start = time.perf_counter()
+            row = next(reader, None)
+            parsed = time.perf_counter()
+            parse_seconds += parsed - start
+            if row is None:
+                break
+            if not row:
+                # Blank lines are skipped
+                continue
+            if len(row) < len(header):
+                # Missing trailing values are read as None
+                row += [None] * (len(header) - len(row))
+
+            try:
+                if get_columns is None:
+                    get_columns = models.column_getter(header, input_class.COLUMNS)
+                input_obj = input_class(*get_columns(row))
+            except ValueError as e:
+                # If value error returned, this means data validation has failed,
+                # and this row will be skipped
+                report.reject(activity, INVALID_ROW, dict(zip(header, row)), str(e))
+                continue
+            finally:
+                validation_seconds += time.perf_counter() - parsed
+            yield input_obj
+    except KeyError as e:
+        raise KeyError(f"Column validation failed for: '{os.path.basename(file_path)}' on column: {e}")
+    finally:
+        report.add_time("csv_parse", parse_seconds)
+        report.add_time("validation", validation_seconds)
+
+
+def _read_csv_file(file_path: str, input_class, activity: str, report: IngestReport) -> Iterator:
     """
-    Function to return emission factor object
+    Generator reading a CSV file one row at a time, and yielding validated input objects
 
-    :param activity: Activity name
-    :param lookup_identifier: Identifier for specific activity
-    :param unit: Unit of measure for activity
+    :param file_path: CSV file path
+    :param input_class: Input class used to validate each row
+    :param activity: Activity name rows are counted against in the report
+    :param report: Ingest report timing the parse and validation stages, and collecting rejected rows
 
-    :return: Emission Factor object
+    :return: Iterator of input objects
     """
-    emission_factor_obj = models.EmissionFactors.objects.filter(
-        activity=activity,
-        lookup_identifier=lookup_identifier,
-        unit=unit,
-    ).first()  # first() method can be used due to unique_together property in model
+    logger.info(f"Ingesting: '{os.path.basename(file_path)}'")
 
-    return emission_factor_obj
+    with open(file_path, newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        header = next(reader, [])
+        yield from _validate_rows(reader, header, file_path, input_class, activity, report)
 
 
-def _emission_factor_data_ingest(emission_factor_path: str) -> None:
+def _find_files_to_ingest(ingest_folder_path: str, report: IngestReport, incremental: bool) -> list:
     """
-    Function to ingest emission factor data via CSV file.
-    It ingests all files in the emission factor ingest folder
+    Function to find the CSV files in a directory that need to be ingested
 
-    :param emission_factor_path: File path containing emission factor files
+    :param ingest_folder_path: Folder path containing files to be ingested
+    :param report: Ingest report timing the file discovery stage
+    :param incremental: Skip files that have already been ingested with the same content
+
+    :return: Array of SourceFile objects
     """
-    for file in _data_ingest(emission_factor_path, models.InputEmissionFactors):
-        for emission_factor_obj in file:
-            # Create model object using ingested data
-            emission_factor_serializer = serializers.EmissionFactorsSerializer(
-                data={
-                    "activity": emission_factor_obj.activity,
-                    "lookup_identifier": emission_factor_obj.lookup_identifier,
-                    "unit": emission_factor_obj.unit,
-                    "co2e": emission_factor_obj.co2e,
-                    "scope": emission_factor_obj.scope,
-                    "category": emission_factor_obj.category,
-                },
-            )
-            # Execute mandatory input object validator method
-            if emission_factor_serializer.is_valid():
-                emission_factor_serializer.save()
-            else:
-                logger.error(f"Ingest data validation failed. Data: {emission_factor_obj}")
-                continue
-    logger.info("Emission factor files ingest complete")
+    with report.stage("file_discovery"):
+        return find_files_to_ingest(_find_csv_files(ingest_folder_path), incremental)
 
 
-def _air_travel_data_ingest(air_travel_path: str) -> None:
+def _data_ingest(
+    ingest_folder_path: str,
+    input_class,
+    activity: str,
+    report: IngestReport,
+    incremental: bool = config.INGEST_INCREMENTAL,
+) -> Iterator:
     """
-    Function to ingest Air Travel emissions data via CSV file.
-    It ingests all files in the Air Travel ingest folder
+    Reusable component to find CSV file paths in a directory and stream the content.
+    Nothing is read until iterated, and only one row is held in memory at a time
 
-    :param air_travel_path: File path containing air travel emission files
+    :param ingest_folder_path: Folder path containing files to be ingested
+    :param input_class: Input class used to validate each row
+    :param activity: Activity name rows are counted against in the report
+    :param report: Ingest report for the run
+    :param incremental: Skip files that have already been ingested with the same content
+
+    :return: Iterator with a (source file, iterator of input objects) tuple per CSV file
     """
-    for file in _data_ingest(air_travel_path, models.InputAirTravel):
-        for air_travel_obj in file:
-            # Fetch emission factor from mapping table
-            emission_factor_obj = _fetch_emission_factor_object(
-                activity=air_travel_obj.activity,
-                lookup_identifier=air_travel_obj.booking_type,
-                unit=air_travel_obj.distance_unit,
-            )
+    for source_file in _find_files_to_ingest(ingest_folder_path, report, incremental):
+        yield source_file, _read_csv_file(source_file.path, input_class, activity, report)
 
-            # Validate one emission factor entry has been returned for activity
-            if not emission_factor_obj:
-                logger.error(f"Emission factor not found for: {air_travel_obj}")
-                continue
 
-            # Create model object using ingested data
-            air_travel_serializer = serializers.AirTravelSerializer(
-                data={
-                    "date": air_travel_obj.date,
-                    "activity": air_travel_obj.activity,
-                    "distance_travelled": air_travel_obj.distance_travelled,
-                    "distance_unit": "kilometres",
-                    "flight_range": air_travel_obj.flight_range,
-                    "passenger_class": air_travel_obj.passenger_class,
-                    "booking_type": air_travel_obj.booking_type,
-                    # Converting spend to float to allow multiplication with emission factor
-                    "co2e": emission_factor_obj.co2e * air_travel_obj.distance_travelled,
-                    "scope": emission_factor_obj.scope,
-                    "category": emission_factor_obj.category,
-                },
-            )
+def _chunked(rows: Iterable, chunk_size: int) -> Iterator:
+    """
+    Generator grouping rows into lists of at most chunk_size rows
 
-            # Execute mandatory input object validator method
-            if air_travel_serializer.is_valid():
-                air_travel_serializer.save()
-            else:
-                logger.error(f"Ingest data validation failed. Data: {air_travel_obj}, " +
-                             f"Reason: {air_travel_serializer.errors}")
-                continue
-    logger.info("Air travel files ingest complete")
+    :param rows: Iterable of rows
+    :param chunk_size: Maximum number of rows per chunk
 
+    :return: Iterator of row lists
+    """
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        yield chunk
 
-def _good_and_services_data_ingest(goods_services_path: str) -> None:
+
+def _date_parser_counts(start: dict) -> dict:
     """
-    Function to ingest Purchased Goods and Services Emission data via CSV file.
-    It ingests all files in the Purchased Goods and Services ingest folder
+    Function returning the date parser cache hits and misses since an earlier stats snapshot. The cache is kept
+    for the life of the process, so its own counts also include earlier runs and worker tasks
+
+    :param start: Date parser stats taken at the start of the run or worker task
 
-    :param goods_services_path: File path containing purchased goods and services emission files
+    :return: Dictionary of hit and miss counts
     """
-    for file in _data_ingest(goods_services_path, models.InputPurchasedGoodsAndServices):
-        for goods_and_services in file:
-            # Fetch emission factor from mapping table
-            emission_factor_obj = _fetch_emission_factor_object(
-                activity=goods_and_services.activity,
-                lookup_identifier=goods_and_services.supplier_category,
-                unit=goods_and_services.spend_unit,
-            )
+    stats = date_parser.stats()
+    return {key: stats[key] - start[key] for key in ("hits", "misses")}
 
-            # Validate only one emission factor entry has been returned for activity
-            if not emission_factor_obj:
-                logger.error(f"Emission factor not found for: {goods_and_services}")
-                continue
 
-            # Create model object using ingested data
-            goods_and_services_serializer = serializers.PurchasedGoodsAndServicesSerializer(
-                data={
-                    "date": goods_and_services.date,
-                    "activity": goods_and_services.activity,
-                    "supplier_category": goods_and_services.supplier_category,
-                    "spend": goods_and_services.spend,
-                    "spend_unit": goods_and_services.spend_unit,
-                    # Converting spend to float to allow multiplication with emission factor
-                    "co2e": emission_factor_obj.co2e * goods_and_services.spend,
-                    "scope": emission_factor_obj.scope,
-                    "category": emission_factor_obj.category,
-                },
-            )
+def _parse_csv_file(file_path: str, input_class, activity: str, rejects_path: str = None) -> tuple:
+    """
+    Worker task to parse and validate a whole CSV file in a separate process
 
-            # Execute mandatory input object validator method
-            if goods_and_services_serializer.is_valid():
-                goods_and_services_serializer.save()
-            else:
-                logger.error(f"Ingest data validation failed. Data: {goods_and_services}, " +
-                             f"Reason: {goods_and_services_serializer.errors}")
-                continue
-    logger.info("Purchased goods and services files ingest complete")
+    :param file_path: CSV file path
+    :param input_class: Input class used to validate each row
+    :param activity: Activity name rows are counted against in the report
+    :param rejects_path: File the worker writes rejected rows to, appended to the run's rejects file once merged
+
+    :return: Array of input objects, and the worker's ingest report to merge into the run's report
+    """
+    date_parser_start = date_parser.stats()
+    worker_report = IngestReport(rejects_path)
+    rows = list(_read_csv_file(file_path, input_class, activity, worker_report))
+    worker_report.add_stats("date_parser", _date_parser_counts(date_parser_start))
+    worker_report.rejects.flush()
+    return rows, worker_report
+
+
+def _parse_byte_range(
+    file_path: str,
+    start: int,
+    end: int,
+    header: list,
+    input_class,
+    activity: str,
+    rejects_path: str = None,
+) -> tuple:
+    """
+    Worker task to parse and validate a byte range of a large CSV file in a separate process
 
+    :param file_path: CSV file path
+    :param start: Range start byte offset, at the start of a row
+    :param end: Range end byte offset, at the end of a row
+    :param header: CSV header row, read once from the start of the file
+    :param input_class: Input class used to validate each row
+    :param activity: Activity name rows are counted against in the report
+    :param rejects_path: File the worker writes rejected rows to, appended to the run's rejects file once merged
 
-def _electricity_data_ingest(electricity_path: str) -> None:
+    :return: Array of input objects, and the worker's ingest report to merge into the run's report
+    """
+    date_parser_start = date_parser.stats()
+    worker_report = IngestReport(rejects_path)
+    reader = csv.reader(read_byte_range(file_path, start, end))
+    rows = list(_validate_rows(reader, header, file_path, input_class, activity, worker_report))
+    worker_report.add_stats("date_parser", _date_parser_counts(date_parser_start))
+    worker_report.rejects.flush()
+    return rows, worker_report
+
+
+def _read_large_csv_file(
+    executor: ProcessPoolExecutor,
+    workers: int,
+    file_path: str,
+    input_class,
+    activity: str,
+    report: IngestReport,
+    rejects_paths: Iterator,
+    range_size: int = config.INGEST_RANGE_SIZE,
+) -> Iterator:
+    """
+    Generator parsing a large CSV file across a process pool, split into byte ranges aligned to row
+    boundaries. Ranges are parsed in parallel, and the rows are yielded in file order. At most two ranges
+    per worker are parsed ahead of the rows being consumed, so memory use does not grow with file size
+
+    :param executor: Process pool parsing the ranges
+    :param workers: Number of worker processes in the pool
+    :param file_path: CSV file path
+    :param input_class: Input class used to validate each row
+    :param activity: Activity name rows are counted against in the report
+    :param report: Ingest report for the run
+    :param rejects_paths: Iterator of rejects file paths for each range, or None values if rejects are not written
+    :param range_size: Target number of bytes per range
+
+    :return: Iterator of input objects
+    """
+    logger.info(f"Ingesting: '{os.path.basename(file_path)}' in byte ranges of {range_size} bytes")
+    with report.stage("range_split"):
+        header, ranges = split_byte_ranges(file_path, range_size)
+
+    pending = deque()
+    ranges = iter(ranges)
+    max_pending = workers * 2
+    while True:
+        for start, end in islice(ranges, max_pending - len(pending)):
+            pending.append(executor.submit(
+                _parse_byte_range, file_path, start, end, header, input_class, activity, next(rejects_paths),
+            ))
+        if not pending:
+            break
+
+        rows, worker_report = pending.popleft().result()
+        report.merge(worker_report)
+        yield from rows
+
+
+def _parallel_activity_ingest(
+    activity_ingests: list,
+    factor_index: EmissionFactorIndex,
+    report: IngestReport,
+    workers: int,
+    write_mode: str = config.INGEST_WRITE_MODE,
+    batch_size: int = config.INGEST_BATCH_SIZE,
+    incremental: bool = config.INGEST_INCREMENTAL,
+    large_file_size: int = config.INGEST_LARGE_FILE_SIZE,
+    range_size: int = config.INGEST_RANGE_SIZE,
+) -> None:
+    """
+    Function to parse activity CSV files concurrently across a process pool.
+    Files from all activity folders are parsed at the same time, and this process is the
+    single writer, loading each file into the database as soon as it has been parsed.
+    At most two files per worker are parsed ahead of being loaded, so parsed rows do not pile up
+    when loading is slower than parsing. Files of at least large_file_size bytes are split into byte
+    ranges parsed in parallel, and are loaded once all smaller files have been loaded
+
+    :param activity_ingests: Array of (ingest folder path, activity type) tuples
+    :param factor_index: Emission factor index shared across activity ingesters
+    :param report: Ingest report for the run. Parse and validation times are summed across workers
+    :param workers: Number of worker processes
+    :param write_mode: "batch" or "strict" write mode
+    :param batch_size: Number of rows inserted per transaction in batch mode
+    :param incremental: Skip files that have already been ingested with the same content
+    :param large_file_size: Size in bytes from which a file is split into byte ranges
+    :param range_size: Target number of bytes per range for large files
     """
-    Function to ingest Electricity emission data via CSV file.
-    It ingests all files in the Electricity ingest folder
+    # Each worker task has its own rejects file, so workers never write to the same file
+    rejects_paths = (
+        f"{report.rejects.path}.{i}" if report.rejects.path else None for i in count()
+    )
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        small_files = []
+        large_files = []
+        for ingest_folder_path, activity_type in activity_ingests:
+            for source_file in _find_files_to_ingest(ingest_folder_path, report, incremental):
+                if source_file.size >= large_file_size:
+                    large_files.append((source_file, activity_type))
+                else:
+                    small_files.append((source_file, activity_type))
+
+        try:
+            pending = {}
+            small_files = iter(small_files)
+            max_pending = workers * 2
+            while True:
+                for source_file, activity_type in islice(small_files, max_pending - len(pending)):
+                    future = executor.submit(
+                        _parse_csv_file,
+                        source_file.path,
+                        activity_type.input_class,
+                        activity_type.name,
+                        next(rejects_paths),
+                    )
+                    pending[future] = (source_file, activity_type)
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    source_file, activity_type = pending.pop(future)
+                    rows, worker_report = future.result()
+                    report.merge(worker_report)
+                    _activity_data_ingest(
+                        activity_type, [(source_file, rows)], factor_index, report, write_mode, batch_size,
+                    )
+
+            for source_file, activity_type in large_files:
+                rows = _read_large_csv_file(
+                    executor,
+                    workers,
+                    source_file.path,
+                    activity_type.input_class,
+                    activity_type.name,
+                    report,
+                    rejects_paths,
+                    range_size,
+                )
+                _activity_data_ingest(
+                    activity_type, [(source_file, rows)], factor_index, report, write_mode, batch_size,
+                )
+        except Exception:
+            # Stop parsing remaining files if a file fails column validation
+            executor.shutdown(cancel_futures=True)
+            raise
+
+
+def _emission_factor_data_ingest(
+    emission_factor_path: str,
+    factor_index: EmissionFactorIndex,
+    report: IngestReport,
+    write_mode: str = config.INGEST_WRITE_MODE,
+    batch_size: int = config.INGEST_BATCH_SIZE,
+    incremental: bool = config.INGEST_INCREMENTAL,
+) -> None:
+    """
+    Function to ingest emission factor data via CSV file.
+    It ingests all files in the emission factor ingest folder. New factors are inserted and existing factors
+    updated, and CO2e is recalculated for activity rows already ingested with a changed factor
 
-    :param electricity_path: File path containing electricity emission files
+    :param emission_factor_path: File path containing emission factor files
+    :param factor_index: Emission factor index, invalidated once new factors are saved
+    :param report: Ingest report for the run
+    :param write_mode: "batch" or "strict" write mode
+    :param batch_size: Number of rows inserted per transaction in batch mode
+    :param incremental: Skip files that have already been ingested with the same content
     """
-    # Find all file paths in ingest folder with .csv extension
-    for file in _data_ingest(electricity_path, models.InputElectricity):
-        for electricity in file:
-            # Fetch emission factor from mapping table
-            emission_factor_obj = _fetch_emission_factor_object(
-                activity=electricity.activity,
-                lookup_identifier=electricity.country,
-                unit=electricity.unit,
+    files = _data_ingest(emission_factor_path, models.InputEmissionFactors, "emission factors", report, incremental)
+    _emission_factor_files_ingest(files, factor_index, report, write_mode, batch_size)
+
+
+def _emission_factor_files_ingest(
+    files: Iterable,
+    factor_index: EmissionFactorIndex,
+    report: IngestReport,
+    write_mode: str = config.INGEST_WRITE_MODE,
+    batch_size: int = config.INGEST_BATCH_SIZE,
+) -> None:
+    """
+    Function to upsert emission factors from parsed CSV files, and recalculate CO2e for activity rows
+    already ingested with a changed factor
+
+    :param files: Iterable with a (source file, iterable of InputEmissionFactors objects) tuple per CSV file
+    :param factor_index: Emission factor index, invalidated once new factors are saved
+    :param report: Ingest report for the run
+    :param write_mode: "batch" or "strict" write mode
+    :param batch_size: Number of rows inserted per transaction in batch mode
+    """
+    for source_file, file in files:
+        with replace_file_rows(source_file, report=report):
+            # Factors are matched on the unique together fields, and updated if already in the table
+            writer = create_writer(
+                serializers.EmissionFactorsUpdateSerializer,
+                write_mode,
+                batch_size,
+                report=report,
+                activity="emission factors",
+                unique_fields=["activity", "lookup_identifier", "unit"],
+                update_fields=["co2e", "scope", "category"],
+            )
+            for emission_factor_obj in file:
+                # Create model object using ingested data
+                writer.write(
+                    {
+                        "activity": emission_factor_obj.activity,
+                        "lookup_identifier": emission_factor_obj.lookup_identifier,
+                        "unit": emission_factor_obj.unit,
+                        "co2e": emission_factor_obj.co2e,
+                        "scope": emission_factor_obj.scope,
+                        "category": emission_factor_obj.category,
+                    },
+                    emission_factor_obj,
+                )
+            writer.close()
+            report.count("emission factors", "accepted", writer.added + writer.changed + writer.unchanged)
+            report.count("emission factors", "added", writer.added)
+            report.count("emission factors", "changed", writer.changed)
+            report.count("emission factors", "unchanged", writer.unchanged)
+            logger.info(
+                f"Emission factors added: {writer.added}, changed: {writer.changed}, unchanged: {writer.unchanged}"
             )
 
-            # Validate an emission factor entry has been returned for activity
-            if not emission_factor_obj:
-                logger.error(f"Emission factor not found for: {electricity}")
-                continue
+            if writer.added or writer.changed:
+                # Rows rejected for having no emission factor may now match one
+                with report.stage("db_write"):
+                    stale_files = mark_unmatched_files_stale()
+                if stale_files:
+                    logger.info(f"Files with rows that had no emission factor to ingest again: {stale_files}")
+
+            if writer.changed_rows:
+                # Activity rows ingested with the previous factors are recalculated in the same transaction
+                with report.stage("co2e_calculation"):
+                    rows_changed = recalculate_changed_factors(writer.changed_rows)
+                logger.info(f"Recalculated CO2e for changed emission factors. Rows changed: {rows_changed}")
+    # Factors have changed, so any previously loaded index is stale
+    factor_index.invalidate()
+    logger.info("Emission factor files ingest complete")
+
 
-            # Create model object using ingested data
-            electricity_serializer = serializers.ElectricitySerializer(
-                data={
-                    "activity": electricity.activity,
-                    "date": electricity.date,
-                    "country": electricity.country,
-                    "electricity_usage": electricity.electricity_usage,
-                    "unit": electricity.unit,
-                    # Converting spend to float to allow multiplication with emission factor
-                    "co2e": emission_factor_obj.co2e * float(electricity.electricity_usage),
-                    "scope": emission_factor_obj.scope,
-                    "category": emission_factor_obj.category,
-                },
+def _activity_data_ingest(
+    activity_type: ActivityType,
+    files: Iterable,
+    factor_index: EmissionFactorIndex,
+    report: IngestReport,
+    write_mode: str = config.INGEST_WRITE_MODE,
+    batch_size: int = config.INGEST_BATCH_SIZE,
+    chunk_size: int = config.INGEST_CHUNK_SIZE,
+) -> None:
+    """
+    Function to ingest emission data for an activity type via CSV file.
+    It ingests all parsed files from the activity type's ingest folder
+
+    :param activity_type: Activity type declaration
+    :param files: Iterable with a (source file, iterable of the activity type's input objects) tuple per CSV file
+    :param factor_index: Emission factor index shared across activity ingesters
+    :param report: Ingest report for the run
+    :param write_mode: "batch" or "strict" write mode
+    :param batch_size: Number of rows inserted per transaction in batch mode
+    :param chunk_size: Number of rows calculated together in the CO2e calculation stage
+    """
+    get_fields = attrgetter(*activity_type.fields)
+    get_lookup = attrgetter(activity_type.lookup_field)
+    get_quantity = attrgetter(activity_type.quantity_field)
+    get_unit = attrgetter(activity_type.unit_field)
+
+    for source_file, file in files:
+        # Rows previously ingested from the same file are replaced in one transaction
+        with replace_file_rows(source_file, activity_type.model, report) as ingest_file:
+            writer = create_writer(
+                activity_type.serializer_class,
+                write_mode,
+                batch_size,
+                instance_fields={"ingest_file": ingest_file},
+                report=report,
+                activity=activity_type.name,
             )
+            unmatched_rows = 0
+            for chunk in _chunked(file, chunk_size):
+                quantities = np.array([get_quantity(input_obj) for input_obj in chunk])
+                units = [get_unit(input_obj) for input_obj in chunk]
+                if activity_type.unit_conversions:
+                    # Convert all quantities in the chunk to the standard unit
+                    quantities = calculation.convert_units(quantities, units, activity_type.unit_conversions)
+                    units = [activity_type.standard_unit] * len(chunk)
+
+                # Join chunk to emission factors and calculate CO2e
+                emissions = calculation.calculate_emissions(
+                    factor_index,
+                    activities=[input_obj.activity for input_obj in chunk],
+                    lookup_identifiers=[get_lookup(input_obj) for input_obj in chunk],
+                    units=units,
+                    quantities=quantities,
+                    report=report,
+                )
+
+                for input_obj, quantity, unit, (matched, co2e, scope, category) in zip(
+                    chunk, quantities.tolist(), units, emissions.rows(),
+                ):
+                    # Validate an emission factor entry has been returned for activity
+                    if not matched:
+                        report.reject(activity_type.name, FACTOR_NOT_FOUND, input_obj.to_dict())
+                        unmatched_rows += 1
+                        continue
 
-            # Execute mandatory input object validator method
-            if electricity_serializer.is_valid():
-                electricity_serializer.save()
-            else:
-                logger.error(f"Ingest data validation failed. Data: {electricity}, " +
-                             f"Reason: {electricity_serializer.errors}")
-                continue
-    logger.info("Electricity files ingest complete")
+                    # Create model object using ingested data
+                    data = dict(zip(activity_type.fields, get_fields(input_obj)))
+                    data[activity_type.quantity_field] = quantity
+                    data[activity_type.unit_field] = unit
+                    data["co2e"] = co2e
+                    data["scope"] = scope
+                    data["category"] = category
+                    writer.write(data, input_obj)
+            writer.close()
+            report.count(activity_type.name, "accepted", writer.written)
+
+            if unmatched_rows:
+                # File is ingested again once emission factors are added or changed
+                with report.stage("db_write"):
+                    ingest_file.unmatched_rows = unmatched_rows
+                    ingest_file.save(update_fields=["unmatched_rows"])
+    logger.info(f"{activity_type.name.capitalize()} files ingest complete")
+
+
+def _remove_untracked_rows(activity_ingests: list, report: IngestReport) -> None:
+    """
+    Function to delete the rows ingested before files were tracked, on the first folder run after the upgrade,
+    before any file is written. Only activity models with CSV files to ingest them again from are cleared
+
+    :param activity_ingests: Array of (ingest folder path, activity type) tuples
+    :param report: Ingest report for the run
+    """
+    with report.stage("db_write"):
+        activity_models = dict.fromkeys(
+            activity_type.model for ingest_folder_path, activity_type in activity_ingests
+            if _find_csv_files(ingest_folder_path)
+        )
+        for activity_model in activity_models:
+            remove_untracked_rows(activity_model)
 
 
 def run(
@@ -250,7 +579,15 @@ def run(
     air_travel_path: str = config.AIR_TRAVEL_INGEST_FOLDER,
     goods_services_path: str = config.GOODS_AND_SERVICES_INGEST_FOLDER,
     electricity_path: str = config.ELECTRICITY_INGEST_FOLDER,
-) -> None:
+    write_mode: str = config.INGEST_WRITE_MODE,
+    batch_size: int = config.INGEST_BATCH_SIZE,
+    workers: int = config.INGEST_WORKERS,
+    incremental: bool = config.INGEST_INCREMENTAL,
+    report_folder: str = config.INGEST_REPORT_FOLDER,
+    store_run: bool = config.INGEST_STORE_RUN,
+    large_file_size: int = config.INGEST_LARGE_FILE_SIZE,
+    range_size: int = config.INGEST_RANGE_SIZE,
+) -> IngestReport:
     """
     Function being run through Django's runscript method
 
@@ -258,15 +595,80 @@ def run(
     :param air_travel_path: Air Travel emission data file path
     :param goods_services_path: Purchased Goods & Services emission data file path
     :param electricity_path: Electricity emission data file path
+    :param write_mode: "batch" for bulk inserts, or "strict" for per-row serializer saves (debug mode)
+    :param batch_size: Number of rows inserted per transaction in batch mode
+    :param workers: Number of processes parsing activity files. With 1 worker, files are ingested sequentially
+    :param incremental: Skip files already ingested with the same content. Changed files always replace their
+        previously ingested rows
+    :param report_folder: Folder the run report JSON and rejected rows NDJSON files are written to, or None to
+        not write files
+    :param store_run: Store the run report in the IngestRun table
+    :param large_file_size: Size in bytes from which an activity file is split into byte ranges parsed in parallel,
+        when there is more than 1 worker
+    :param range_size: Target number of bytes per range for large activity files
+
+    :return: Run report with the time spent in each stage, and row counts per activity
     """
+    date_parser_start = date_parser.stats()
+    report = IngestReport()
+    if report_folder:
+        report.rejects.path = report.file_path(report_folder, "_rejects.ndjson")
+    # Single index shared by all ingesters, so the factor table is read once per run
+    factor_index = EmissionFactorIndex()
+    error = None
     try:
         # Ingest emission factor data
-        _emission_factor_data_ingest(emission_factor_path)
-        # Ingest Air Travel emission data
-        _air_travel_data_ingest(air_travel_path)
-        # Ingest Purchased Goods and Services emission data
-        _good_and_services_data_ingest(goods_services_path)
-        # Ingest Electricity emission data
-        _electricity_data_ingest(electricity_path)
+        _emission_factor_data_ingest(emission_factor_path, factor_index, report, write_mode, batch_size, incremental)
+        # Every registered activity type is ingested from its folder, unless a folder is given for it
+        activity_paths = {
+            activities.AIR_TRAVEL.name: air_travel_path,
+            activities.PURCHASED_GOODS_AND_SERVICES.name: goods_services_path,
+            activities.ELECTRICITY.name: electricity_path,
+        }
+        activity_ingests = [
+            (activity_paths.get(name, activity_type.folder), activity_type)
+            for name, activity_type in activities.ACTIVITY_TYPES.items()
+        ]
+        _remove_untracked_rows(activity_ingests, report)
+
+        if workers > 1:
+            _parallel_activity_ingest(
+                activity_ingests,
+                factor_index,
+                report,
+                workers,
+                write_mode,
+                batch_size,
+                incremental,
+                large_file_size,
+                range_size,
+            )
+        else:
+            for ingest_folder_path, activity_type in activity_ingests:
+                _activity_data_ingest(
+                    activity_type,
+                    _data_ingest(
+                        ingest_folder_path, activity_type.input_class, activity_type.name, report, incremental,
+                    ),
+                    factor_index,
+                    report,
+                    write_mode,
+                    batch_size,
+                )
     except Exception as e:
         logger.error(f"Error occurred during data ingestion, see: {e}")
+        error = e
+
+    # Dates parsed in this process are added to those counted by worker processes and merged into the report
+    report.add_stats("date_parser", _date_parser_counts(date_parser_start))
+    report.stats["emission_factor_index"] = factor_index.stats()
+    logger.info(f"Emission factor index stats: {report.stats['emission_factor_index']}")
+    logger.info(f"Date parser cache stats: {report.stats['date_parser']}")
+    report.finish(error)
+    logger.info(f"Ingest run {report.status}. Stage seconds: {report.stage_seconds}, Rows: {report.activities}")
+
+    if report_folder:
+        report.write(report_folder)
+    if store_run:
+        report.save()
+    return report
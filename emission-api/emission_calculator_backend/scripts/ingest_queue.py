@@ -0,0 +1,36 @@
+import logging
+import signal
+import threading
+
+from emission_calculator_backend.ingest.queue import JobQueue
+import config
+
+logger = logging.getLogger("root")
+
+
+def run(*args) -> None:
+    """
+    Function being run through Django's runscript method, eg:
+    python manage.py runscript ingest_queue --script-args workers=4
+
+    Runs the ingest job queue and schedules in the foreground until stopped, eg for a dedicated worker container.
+    Running jobs are finished before exiting
+
+    :param args: Optional workers and poll_seconds arguments, as key=value strings
+    """
+    options = dict(arg.split("=", 1) for arg in args)
+    queue = JobQueue(
+        workers=int(options.get("workers", config.INGEST_JOB_WORKERS)),
+        poll_seconds=float(options.get("poll_seconds", config.INGEST_QUEUE_POLL_SECONDS)),
+    )
+
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+
+    queue.wake()
+    try:
+        stopped.wait()
+    except KeyboardInterrupt:
+        pass
+    logger.info("Stopping ingest job queue")
+    queue.stop()
@@ -0,0 +1,42 @@
+import logging
+from itertools import chain
+
+import emission_calculator_backend.models as models
+from emission_calculator_backend.ingest.recalculation import recalculate_emissions
+from emission_calculator_backend.ingest.report import IngestReport
+from emission_calculator_backend.scripts import import_data
+import config
+
+logger = logging.getLogger("root")
+
+
+def run(emission_factor_path: str = config.EMISSION_FACTOR_INGEST_FOLDER) -> dict:
+    """
+    Function being run through Django's runscript method, eg:
+    python manage.py runscript recalculate_emissions --script-args ./emission_factors_2024/
+
+    Applies an updated emission factor set, and recalculates CO2e for the activity rows using a changed factor
+
+    :param emission_factor_path: Folder path containing the updated emission factor files
+
+    :return: Dictionary with the number of factors added, changed and rejected, and rows changed per table
+    """
+    report = IngestReport()
+    try:
+        emission_factors = chain.from_iterable(
+            import_data._read_csv_file(file_path, models.InputEmissionFactors, "emission factors", report)
+            for file_path in import_data._find_csv_files(emission_factor_path)
+        )
+        result = recalculate_emissions(emission_factors)
+    except Exception as e:
+        logger.error(f"Error occurred during emission recalculation, see: {e}")
+        return None
+    finally:
+        # Logs the count and samples of factor rows failing input validation
+        report.rejects.close()
+
+    result["factors"]["rejected"] += report.rejects.total
+    logger.info(f"Emission factors added: {result['factors']['added']}, changed: {result['factors']['changed']}")
+    for table, rows in result["rows_changed"].items():
+        logger.info(f"Recalculated CO2e for {rows} rows in: '{table}'")
+    return result
@@ -8,6 +8,14 @@ class EmissionFactorsSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class EmissionFactorsUpdateSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.EmissionFactors
+        fields = "__all__"
+        # Factors may update existing factors, so the unique together check is not applied
+        validators = []
+
+
 class AirTravelSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.AirTravel
@@ -24,3 +32,10 @@ class ElectricitySerializer(serializers.ModelSerializer):
     class Meta:
         model = models.Electricity
         fields = "__all__"
+
+
+class IngestJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.IngestJob
+        # Upload paths on the server are not returned
+        exclude = ["path"]
@@ -1,25 +1,61 @@
 from django.test import TestCase, Client
+from django.db import connection
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+import csv
+import inspect
+import io
 import json
 import os
 import logging
+from datetime import date, datetime, timedelta, timezone
+import random
+import shutil
+import tempfile
+from unittest.mock import patch
 
-from emission_calculator_backend.scripts.import_data import run
+import numpy as np
+
+from emission_calculator_backend.scripts.import_data import run, _data_ingest
+from emission_calculator_backend.scripts import import_data
+from emission_calculator_backend.scripts.benchmark_ingest import generate_dataset
+from emission_calculator_backend.scripts import recalculate_emissions
+from emission_calculator_backend import cache
+from emission_calculator_backend.ingest import activities, calculation, jobs, queue, summary
+from emission_calculator_backend.ingest.cron import CronSchedule
+from emission_calculator_backend.ingest.dates import DateParser
+from emission_calculator_backend.ingest.factor_index import EmissionFactorIndex
+from emission_calculator_backend.ingest.ranges import read_byte_range, split_byte_ranges
+from emission_calculator_backend.ingest.report import IngestReport, STAGES
+from emission_calculator_backend.ingest.writers import BatchWriter
+import emission_calculator_backend.serializers as serializers
+import emission_calculator_backend.views as views
+import emission_calculator_backend.models as models
+import config
 
 JWT = "eyJ0eXAiOiJKV1QiLCJhbGciOiJIUzI1NiJ9.eyJpZCI6MSwiZXhwIjoxNzQyNjg2MzA0LCJpYXQiOjE3" \
       + "NDI2ODI3MDR9.Y8oUbSmmjs3CM51AqTearFFZQM7IWW2zq75jO2rofeg"
 
 
-def test_data_load_helper(test_data_dir: str) -> None:
+def test_data_load_helper(test_data_dir: str, **kwargs) -> IngestReport:
     """
     Helper function to load test data
+
+    :param test_data_dir: Folder in test data directory to load
+    :param kwargs: Extra ingest options passed to the run function
+
+    :return: Ingest run report
     """
     base_path = "./emission_calculator_backend/tests/test_data/"
+    # Run report files are not written unless a test asks for them
+    kwargs.setdefault("report_folder", None)
 
-    run(
+    return run(
         emission_factor_path=os.path.join(base_path, test_data_dir, "emission_factors"),
         air_travel_path=os.path.join(base_path, test_data_dir, "air_travel"),
         goods_services_path=os.path.join(base_path, test_data_dir, "purchased_goods_and_services"),
         electricity_path=os.path.join(base_path, test_data_dir, "electricity"),
+        **kwargs,
     )
 
 
@@ -32,6 +68,8 @@ class EmissionCalculatorTests(TestCase):
         Set-up method to load test data and start mock API client
         """
         logging.disable(logging.CRITICAL)
+        # Data versions are rolled back after each test, so responses cached by an earlier test are cleared
+        cache.response_cache.clear()
         # Execute data load script for test DB using test data paths
         test_data_load_helper("success_test_data")
         self.client = Client()
@@ -108,6 +146,7 @@ class EmissionCalculatorTests(TestCase):
                         "activity": "electricity",
                     },
                 ],
+                "next_cursor": None,
                 "total_air_travel_co2e": 765.402104,
                 "total_purchased_goods_and_services_co2e": 6616.8,
                 "total_electricity_co2e": 134.0,
@@ -118,6 +157,287 @@ class EmissionCalculatorTests(TestCase):
         self.assertEquals(response.status_code, 200)
         self.assertEquals(json.loads(response.content), expected_output)
 
+    def test_cursor_pagination(self):
+        """
+        Testing pages fetched with the next cursor return every row once in CO2e order, including rows with
+        the same CO2e across tables, with totals only on the first page
+        """
+        self.client.cookies.load({"jwt": JWT})
+        models.Electricity.objects.create(
+            activity="electricity", date="2023-01-01", country="germany", electricity_usage=1, unit="kwh",
+            co2e=305.7746, scope=2,
+        )
+        expected = json.loads(self.client.get("/emissions/").content)["emissions"]["emissions_array"]
+
+        pages = []
+        cursor = None
+        while True:
+            with self.assertNumQueries(1 if cursor else 2):
+                response = self.client.get("/emissions/", {"page_size": 3, **({"cursor": cursor} if cursor else {})})
+            output = json.loads(response.content)["emissions"]
+            self.assertEquals("total_co2e" in output, cursor is None)
+            pages.append(output["emissions_array"])
+            cursor = output["next_cursor"]
+            if cursor is None:
+                break
+
+        self.assertEquals([len(page) for page in pages], [3, 3, 3, 2])
+        self.assertEquals([row for page in pages for row in page], expected)
+        self.assertEquals(len(expected), 11)
+
+        for params in [{"cursor": "invalid"}, {"page_size": 0}, {"page_size": "all"}]:
+            self.assertEquals(self.client.get("/emissions/", params).status_code, 400)
+
+    def test_response_cache(self):
+        """
+        Testing repeated requests are served from the response cache without any queries, and responses
+        are rebuilt once an ingest changes the data version
+        """
+        self.client.cookies.load({"jwt": JWT})
+        response = self.client.get("/emissions/")
+        self.assertEquals(response["X-Cache"], "MISS")
+
+        with self.assertNumQueries(0):
+            cached_response = self.client.get("/emissions/")
+        self.assertEquals(cached_response["X-Cache"], "HIT")
+        self.assertEquals(json.loads(cached_response.content), json.loads(response.content))
+        # Other query parameters are cached separately
+        self.assertEquals(self.client.get("/emissions/", {"page_size": 2})["X-Cache"], "MISS")
+
+        version = cache.data_version()
+        models.IngestManifest.objects.filter(path__endswith="mock_electricity.csv").delete()
+        self.assertGreater(cache.data_version(), version)
+
+        response = self.client.get("/emissions/")
+        self.assertEquals(response["X-Cache"], "MISS")
+        self.assertEquals(json.loads(response.content)["emissions"]["total_electricity_co2e"], 0)
+
+        stats = json.loads(self.client.get("/emissions/cache/").content)
+        self.assertEquals(
+            {key: stats[key] for key in ["data_version", "hits", "misses", "skipped"]},
+            {"data_version": cache.data_version(), "hits": 1, "misses": 3, "skipped": 0},
+        )
+
+        # Responses over the maximum entry size are not cached
+        small_cache = cache.ResponseCache(max_entry_size=10)
+        self.assertFalse(small_cache.set("large", {"emissions": "x" * 10}))
+        self.assertEquals(small_cache.get("large"), None)
+        self.assertEquals(small_cache.stats()["skipped"], 1)
+
+    def test_conditional_get(self):
+        """
+        Testing responses have an ETag for the data version and query parameters, and requests with a matching
+        If-None-Match header are answered with 304 Not Modified without any queries
+        """
+        self.client.cookies.load({"jwt": JWT})
+        response = self.client.get("/emissions/")
+        etag = response["ETag"]
+        self.assertEquals(response.status_code, 200)
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/emissions/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(response.status_code, 304)
+        self.assertEquals(response.content, b"")
+
+        response = self.client.get("/emissions/", {"page_size": 2}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(response.status_code, 200)
+        self.assertNotEquals(response["ETag"], etag)
+
+        # Ingests change the data version, so the payload is sent again
+        models.IngestManifest.objects.filter(path__endswith="mock_electricity.csv").delete()
+        response = self.client.get("/emissions/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(response.status_code, 200)
+        self.assertNotEquals(response["ETag"], etag)
+
+        # Error responses have no ETag, so are never answered with 304 Not Modified
+        for path, params in [
+            ("/emissions/", {"page_size": "invalid"}),
+            ("/emissions/timeseries/", {"interval": "invalid"}),
+            ("/emissions/export/csv/", {"date_from": "invalid"}),
+        ]:
+            response = self.client.get(path, params)
+            self.assertEquals(response.status_code, 400)
+            self.assertFalse(response.has_header("ETag"))
+
+    def test_emissions_export(self):
+        """
+        Testing every emission row is streamed in chunks as a JSON array, NDJSON and CSV
+        """
+        self.client.cookies.load({"jwt": JWT})
+        expected = sorted(
+            (row["activity"], row["co2e"], row["scope"], row["category"], str(row["date"]))
+            for activity_model in views.EMISSION_MODELS
+            for row in activity_model.objects.values(*views.EXPORT_FIELDS)
+        )
+
+        self.assertEquals([len(rows) for rows in views.fetch_emission_chunks(4)], [4, 4, 2])
+
+        exports = {}
+        for export_format in ["json", "ndjson", "csv"]:
+            response = self.client.get(f"/emissions/export/{export_format}/")
+            self.assertEquals(response.status_code, 200)
+            self.assertTrue(response.streaming)
+            self.assertEquals(response["Content-Type"], views.EXPORT_CONTENT_TYPES[export_format])
+            exports[export_format] = b"".join(response.streaming_content).decode()
+
+        rows = {
+            "json": json.loads(exports["json"]),
+            "ndjson": [json.loads(line) for line in exports["ndjson"].splitlines()],
+            # CSV values are strings, and empty categories are written as empty strings
+            "csv": [
+                {**row, "co2e": float(row["co2e"]), "scope": int(row["scope"]), "category": int(row["category"] or 0)}
+                for row in csv.DictReader(io.StringIO(exports["csv"]))
+            ],
+        }
+        for export_format, export_rows in rows.items():
+            self.assertEquals(
+                sorted(
+                    (row["activity"], row["co2e"], row["scope"], row["category"] or None, row["date"])
+                    for row in export_rows
+                ),
+                expected,
+            )
+
+        self.assertEquals(self.client.get("/emissions/export/xml/").status_code, 400)
+
+        # Empty exports are still valid files
+        models.IngestManifest.objects.all().delete()
+        response = self.client.get("/emissions/export/json/")
+        self.assertEquals(json.loads(b"".join(response.streaming_content)), [])
+
+    def test_emission_filters(self):
+        """
+        Testing rows and totals are filtered by date range, scope, category and activity, and tables not matching
+        the activity filter are left out of the query
+        """
+        self.client.cookies.load({"jwt": JWT})
+        all_rows = [
+            (activity_model, row)
+            for activity_model in views.EMISSION_MODELS
+            for row in activity_model.objects.values(*views.EXPORT_FIELDS)
+        ]
+
+        cases = [
+            (
+                {"date_from": "2023-01-15", "date_to": "2023-02-12"},
+                lambda row: "2023-01-15" <= str(row["date"]) <= "2023-02-12",
+            ),
+            ({"scope": "2"}, lambda row: row["scope"] == 2),
+            ({"category": ["1", "6"]}, lambda row: row["category"] in [1, 6]),
+            ({"activity": "air travel,electricity"}, lambda row: row["activity"] in ["air travel", "electricity"]),
+            (
+                {"scope": "3", "date_to": "2023-01-31"},
+                lambda row: row["scope"] == 3 and str(row["date"]) <= "2023-01-31",
+            ),
+        ]
+        for params, matches in cases:
+            output = json.loads(self.client.get("/emissions/", params).content)["emissions"]
+            expected = [(activity_model, row) for activity_model, row in all_rows if matches(row)]
+
+            self.assertEquals(
+                sorted(row["co2e"] for row in output["emissions_array"]), sorted(row["co2e"] for _, row in expected),
+            )
+            self.assertGreater(len(output["emissions_array"]), 0)
+            self.assertAlmostEqual(output["total_co2e"], sum(row["co2e"] for _, row in expected))
+            self.assertAlmostEqual(
+                output["total_electricity_co2e"],
+                sum(row["co2e"] for activity_model, row in expected if activity_model == models.Electricity),
+            )
+
+        with CaptureQueriesContext(connection) as queries:
+            views.fetch_emissions_page(10, filters={"activity": ["electricity"]})
+        self.assertNotIn(models.AirTravel._meta.db_table, queries[0]["sql"])
+
+        export = self.client.get("/emissions/export/ndjson/", {"scope": "2"})
+        self.assertEquals(
+            {json.loads(line)["activity"] for line in b"".join(export.streaming_content).decode().splitlines()},
+            {"electricity"},
+        )
+
+        for params in [
+            {"date_from": "2023-13-01"},
+            {"date_from": "2023-02-01", "date_to": "2023-01-01"},
+            {"scope": "three"},
+            {"activity": "cars"},
+        ]:
+            self.assertEquals(self.client.get("/emissions/", params).status_code, 400)
+
+    def test_emissions_timeseries(self):
+        """
+        Testing CO2e is grouped into day, week, month, quarter and year buckets in one query, optionally split by
+        activity, scope or category, from the emission summary or the activity tables
+        """
+        self.client.cookies.load({"jwt": JWT})
+        periods = {
+            "day": lambda day: day,
+            "week": lambda day: day - timedelta(days=day.weekday()),
+            "month": lambda day: day.replace(day=1),
+            "quarter": lambda day: day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1),
+            "year": lambda day: day.replace(month=1, day=1),
+        }
+        all_rows = [
+            row
+            for activity_model in views.EMISSION_MODELS
+            for row in activity_model.objects.values(*views.EXPORT_FIELDS)
+        ]
+
+        for interval, period in periods.items():
+            for split_by in [None, "activity", "scope", "category"]:
+                expected = {}
+                for row in all_rows:
+                    key = (period(row["date"]).isoformat(), row[split_by] if split_by else None)
+                    co2e, rows = expected.get(key, (0, 0))
+                    expected[key] = (co2e + row["co2e"], rows + 1)
+
+                with self.assertNumQueries(1):
+                    buckets = views.fetch_emission_timeseries(interval, split_by)
+                self.assertEquals(
+                    {
+                        (bucket["period"].isoformat(), bucket[split_by] if split_by else None): (
+                            round(bucket["co2e"], 6), bucket["rows"],
+                        )
+                        for bucket in buckets
+                    },
+                    {key: (round(co2e, 6), rows) for key, (co2e, rows) in expected.items()},
+                )
+                periods_returned = [bucket["period"] for bucket in buckets]
+                self.assertEquals(periods_returned, sorted(periods_returned))
+
+        # Date ranges not on month boundaries are grouped from the activity tables
+        self.assertTrue(views.summary_covers("month", {"date_from": date(2023, 1, 1), "date_to": date(2023, 2, 28)}))
+        self.assertFalse(views.summary_covers("month", {"date_to": date(2023, 2, 12)}))
+        params = {"interval": "month", "date_to": "2023-02-12", "scope": "2"}
+        output = json.loads(self.client.get("/emissions/timeseries/", params).content)
+        self.assertEquals(
+            output,
+            {
+                "interval": "month",
+                "split_by": None,
+                "timeseries": [
+                    {"period": "2023-01-01", "co2e": 30.0, "rows": 2},
+                    {"period": "2023-02-01", "co2e": 38.0, "rows": 1},
+                ],
+            },
+        )
+
+        for params in [{"interval": "hour"}, {"split_by": "country"}, {"date_from": "yesterday"}]:
+            self.assertEquals(self.client.get("/emissions/timeseries/", params).status_code, 400)
+
+    def test_totals_single_query(self):
+        """
+        Testing totals for every activity are read from the emission summary in one query, and match each
+        table's sum
+        """
+        # Rows deleted with their file are removed from the emission summary
+        models.IngestManifest.objects.filter(path__endswith="mock_electricity.csv").delete()
+        with self.assertNumQueries(1):
+            totals = views.fetch_emission_totals()
+
+        for activity_model in views.EMISSION_MODELS:
+            self.assertAlmostEqual(totals[activity_model], sum(activity_model.objects.values_list("co2e", flat=True)))
+        self.assertEquals(totals[models.Electricity], 0)
+
 
 class EtlScriptTests(TestCase):
 
@@ -128,6 +448,7 @@ class EtlScriptTests(TestCase):
         Set-up method to create test DB and start mock API client
         """
         logging.disable(logging.CRITICAL)
+        cache.response_cache.clear()
         self.client = Client()
 
     def test_air_travel_distance(self):
@@ -161,6 +482,7 @@ class EtlScriptTests(TestCase):
                         "activity": "air travel",
                     },
                 ],
+                "next_cursor": None,
                 "total_air_travel_co2e": 909.6275039999999,
                 "total_purchased_goods_and_services_co2e": 0,
                 "total_electricity_co2e": 0,
@@ -207,6 +529,7 @@ class EtlScriptTests(TestCase):
                         "activity": "electricity",
                     },
                 ],
+                "next_cursor": None,
                 "total_air_travel_co2e": 305.7746,
                 "total_purchased_goods_and_services_co2e": 3856.8,
                 "total_electricity_co2e": 20,
@@ -229,6 +552,7 @@ class EtlScriptTests(TestCase):
         expected_output = {
             "emissions": {
                 "emissions_array": [],
+                "next_cursor": None,
                 "total_air_travel_co2e": 0,
                 "total_purchased_goods_and_services_co2e": 0,
                 "total_electricity_co2e": 0,
@@ -298,3 +622,1015 @@ class EtlScriptTests(TestCase):
                 '''failed for: 'mock_purchased_goods_and_services.csv' on column: 'Spend units'"''',
                 cm.output,
             )
+
+    def test_multiple_files(self):
+        """
+        Testing each file in an ingest folder is loaded once, when a folder contains multiple files
+        """
+        test_data_load_helper("multi_file_test_data")
+
+        self.assertEquals(models.AirTravel.objects.count(), 5)
+        self.assertEquals(
+            models.AirTravel.objects.filter(date__month=3).aggregate(Sum("co2e"))["co2e__sum"],
+            150,
+        )
+
+    def test_lazy_file_read(self):
+        """
+        Testing ingest folders and files are not read until the content is iterated
+        """
+        files = _data_ingest("./emission_calculator_backend/tests/test_data/success_test_data/air_travel",
+                             models.InputAirTravel, "air travel", IngestReport())
+        self.assertTrue(inspect.isgenerator(files))
+
+        source_file, rows = next(files)
+        self.assertTrue(source_file.path.endswith("mock_air_travel.csv"))
+        self.assertTrue(inspect.isgenerator(rows))
+        self.assertEquals(next(rows).booking_type, "long-haul, business class")
+
+    def test_positional_columns(self):
+        """
+        Testing input objects are built from column positions resolved from each file's header,
+        so reordered columns give the same rows, and objects have no per-instance dictionary
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with open(os.path.join(temp_dir, "electricity.csv"), "w") as file:
+                file.write("Units,Country,Date,Electricity Usage,Activity\n")
+                file.write("kWh,United Kingdom,01/01/2023,100,Electricity\n")
+                file.write("\n")
+                file.write("kWh,Germany,12/02/2023,,Electricity\n")
+
+            _, rows = next(_data_ingest(temp_dir, models.InputElectricity, "electricity", IngestReport()))
+            rows = list(rows)
+
+        self.assertEquals(
+            [row.to_dict() for row in rows],
+            [
+                {
+                    "activity": "electricity",
+                    "date": "2023-01-01",
+                    "country": "united kingdom",
+                    "electricity_usage": 100.0,
+                    "unit": "kwh",
+                },
+                {
+                    "activity": "electricity",
+                    "date": "2023-02-12",
+                    "country": "germany",
+                    "electricity_usage": 0.0,
+                    "unit": "kwh",
+                },
+            ],
+        )
+        self.assertFalse(hasattr(rows[0], "__dict__"))
+
+
+class EmissionFactorIndexTests(TestCase):
+
+    def setUp(self):
+        """
+        Set-up method to load test emission factors
+        """
+        logging.disable(logging.CRITICAL)
+        test_data_load_helper("success_test_data")
+
+    def test_single_query_per_load(self):
+        """
+        Testing the factor table is read once, and lookups are then served from memory
+        """
+        factor_index = EmissionFactorIndex()
+
+        with self.assertNumQueries(1):
+            factor = factor_index.get("electricity", "germany", "kwh")
+            factor_index.get("electricity", "united kingdom", "kwh")
+            missing_factor = factor_index.get("electricity", "france", "kwh")
+
+        self.assertEquals(factor.co2e, 0.3)
+        self.assertIsNone(missing_factor)
+        self.assertEquals(factor_index.stats(), {"factors": 7, "hits": 2, "misses": 1})
+
+    def test_invalidate(self):
+        """
+        Testing factors saved after an invalidation are picked up by the next lookup
+        """
+        factor_index = EmissionFactorIndex()
+        self.assertIsNone(factor_index.get("electricity", "france", "kwh"))
+
+        models.EmissionFactors.objects.create(
+            activity="electricity", lookup_identifier="france", unit="kwh", co2e=0.1, scope=2,
+        )
+        self.assertIsNone(factor_index.get("electricity", "france", "kwh"))
+
+        factor_index.invalidate()
+        self.assertEquals(factor_index.get("electricity", "france", "kwh").co2e, 0.1)
+
+    def test_vectorised_calculation_matches_per_row(self):
+        """
+        Testing CO2e calculated for a chunk of rows exactly matches the per-row calculation
+        """
+        factor_index = EmissionFactorIndex()
+        factor = factor_index.get("air travel", "long-haul, business class", "kilometres")
+
+        random.seed(1)
+        distances = [random.uniform(0, 10000) for _ in range(1000)]
+        units = [random.choice(["miles", "kilometres"]) for _ in range(1000)]
+
+        converted = calculation.convert_units(np.array(distances), units, calculation.DISTANCE_UNIT_CONVERSIONS)
+        emissions = calculation.calculate_emissions(
+            factor_index,
+            activities=["air travel"] * 1000,
+            lookup_identifiers=["long-haul, business class"] * 999 + ["unknown"],
+            units=["kilometres"] * 1000,
+            quantities=converted,
+        )
+
+        expected_co2e = [
+            factor.co2e * (distance * 1.60934 if unit == "miles" else distance)
+            for distance, unit in zip(distances, units)
+        ]
+        rows = list(emissions.rows())
+        self.assertEquals([co2e for _, co2e, _, _ in rows[:-1]], expected_co2e[:-1])
+        self.assertEquals(rows[0][2:], (3, 6))
+        self.assertFalse(rows[-1][0])
+
+
+class WriteModeTests(TestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        """
+        Set-up method to start mock API client
+        """
+        logging.disable(logging.CRITICAL)
+        cache.response_cache.clear()
+        self.client = Client()
+
+    def test_strict_and_batch_output_match(self):
+        """
+        Testing the per-row strict write mode and the bulk batch write mode load the same data
+        """
+        test_data_load_helper("success_test_data", write_mode="strict")
+        strict_output = json.loads(self.client.get("/emissions/").content)
+
+        # Deleting manifest entries also deletes the activity rows ingested from each file
+        for model in [models.IngestManifest, models.EmissionFactors]:
+            model.objects.all().delete()
+
+        test_data_load_helper("success_test_data", write_mode="batch", batch_size=2)
+        batch_output = json.loads(self.client.get("/emissions/").content)
+
+        self.assertEquals(batch_output, strict_output)
+
+    def test_batch_rejects_invalid_rows(self):
+        """
+        Testing an invalid row is rejected without dropping the rest of its batch
+        """
+        writer = BatchWriter(serializers.PurchasedGoodsAndServicesSerializer, batch_size=10)
+        row = {
+            "date": "2023-01-01",
+            "activity": "purchased goods and services",
+            "supplier_category": "real estate activities",
+            "spend": 100,
+            "spend_unit": "gbp",
+            "co2e": 10.0,
+            "scope": 3,
+            "category": 1,
+        }
+        writer.write(row, None)
+        writer.write({**row, "spend": "invalid"}, None)
+        writer.write(row, None)
+
+        with self.assertNumQueries(3):  # Savepoint, bulk insert and release
+            writer.close()
+
+        self.assertEquals(writer.written, 2)
+        self.assertEquals(writer.rejected, 1)
+        self.assertEquals(models.PurchasedGoodsAndServices.objects.count(), 2)
+
+
+class ParallelIngestTests(TestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        """
+        Set-up method to start mock API client
+        """
+        logging.disable(logging.CRITICAL)
+        cache.response_cache.clear()
+        self.client = Client()
+
+    def test_parallel_output_matches_sequential(self):
+        """
+        Testing activity files parsed across a process pool load the same data as a sequential ingest
+        """
+        test_data_load_helper("success_test_data", workers=1)
+        sequential_output = json.loads(self.client.get("/emissions/").content)
+
+        # Deleting manifest entries also deletes the activity rows ingested from each file
+        for model in [models.IngestManifest, models.EmissionFactors]:
+            model.objects.all().delete()
+
+        test_data_load_helper("success_test_data", workers=3)
+        parallel_output = json.loads(self.client.get("/emissions/").content)
+
+        self.assertEquals(parallel_output, sequential_output)
+
+    def test_parallel_files_bounded(self):
+        """
+        Testing at most two small files per worker are parsed ahead of being loaded, and every file is loaded
+        """
+        base_path = "./emission_calculator_backend/tests/test_data/success_test_data"
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for i in range(10):
+                shutil.copy(
+                    os.path.join(base_path, "air_travel", "mock_air_travel.csv"),
+                    os.path.join(temp_dir, f"mock_air_travel_{i}.csv"),
+                )
+
+            waited = []
+            futures_wait = import_data.wait
+
+            def recording_wait(futures, **kwargs):
+                waited.append(len(futures))
+                return futures_wait(futures, **kwargs)
+
+            with patch("emission_calculator_backend.scripts.import_data.wait", side_effect=recording_wait):
+                run(
+                    emission_factor_path=os.path.join(base_path, "emission_factors"),
+                    air_travel_path=temp_dir,
+                    goods_services_path=os.path.join(base_path, "purchased_goods_and_services"),
+                    electricity_path=os.path.join(base_path, "electricity"),
+                    workers=2,
+                    report_folder=None,
+                )
+
+        self.assertLessEqual(max(waited), 4)
+        self.assertEquals(models.AirTravel.objects.count(), 30)
+
+    def test_parallel_date_parser_stats(self):
+        """
+        Testing dates parsed in worker processes are counted in the run's date parser stats
+        """
+        sequential_report = test_data_load_helper("success_test_data", workers=1)
+
+        for model in [models.IngestManifest, models.EmissionFactors]:
+            model.objects.all().delete()
+
+        parallel_report = test_data_load_helper("success_test_data", workers=2)
+
+        sequential_stats = sequential_report.stats["date_parser"]
+        parallel_stats = parallel_report.stats["date_parser"]
+        self.assertGreater(parallel_stats["hits"] + parallel_stats["misses"], 0)
+        self.assertEquals(
+            parallel_stats["hits"] + parallel_stats["misses"],
+            sequential_stats["hits"] + sequential_stats["misses"],
+        )
+
+    def test_parallel_column_validation(self):
+        """
+        Testing column validation errors raised in worker processes are reported by the ingest
+        """
+        logging.disable(logging.INFO)  # Allowing ERROR logs to run assert method
+        with self.assertLogs(logger="root", level="ERROR") as cm:
+            test_data_load_helper("incorrect_air_travel_column_test_data", workers=2)
+
+            self.assertIn(
+                '''ERROR:root:Error occurred during data ingestion, see: "Column validation ''' +
+                '''failed for: 'mock_air_travel.csv' on column: 'Activity'"''',
+                cm.output,
+            )
+
+
+class ByteRangeTests(TestCase):
+
+    def test_quote_safe_ranges(self):
+        """
+        Testing rows split into byte ranges of any size, including quoted newlines and escaped quotes,
+        are the same as reading the whole file
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "factors.csv")
+            with open(file_path, "w", newline="") as file:
+                file.write('Activity,"Lookup\nidentifiers",Unit\r\n')
+                file.write('Air Travel,"Long-haul, Business class",kilometres\r\n')
+                file.write('Purchased Goods and Services,"Manufacture of ""computer""\n,\nproducts",GBP\r\n')
+                file.write('Electricity,"""United\n\nKingdom""",kWh\r\n')
+                file.write('Electricity,Germany,kWh')
+
+            with open(file_path, newline="") as file:
+                expected_header, *expected_rows = csv.reader(file)
+
+            for range_size in range(1, 120):
+                header, ranges = split_byte_ranges(file_path, range_size)
+                rows = [row for start, end in ranges for row in csv.reader(read_byte_range(file_path, start, end))]
+
+                self.assertEquals(header, expected_header)
+                self.assertEquals(rows, expected_rows)
+
+    def test_large_file_output_matches_sequential(self):
+        """
+        Testing a large file parsed in byte ranges across a process pool loads the same rows, in the
+        same order, as a sequential ingest
+        """
+        logging.disable(logging.CRITICAL)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = generate_dataset(temp_dir, rows=300)
+            outputs = []
+            for options in [{"workers": 1}, {"workers": 2, "large_file_size": 0, "range_size": 500}]:
+                for model in [models.IngestManifest, models.EmissionFactors]:
+                    model.objects.all().delete()
+
+                report = run(**paths, report_folder=None, **options)
+                outputs.append((
+                    list(models.PurchasedGoodsAndServices.objects.order_by("id").values_list(
+                        "supplier_category", "spend", "co2e",
+                    )),
+                    list(models.Electricity.objects.order_by("id").values_list("country", "electricity_usage", "co2e")),
+                    report.activities,
+                ))
+
+        self.assertEquals(outputs[0], outputs[1])
+        self.assertEquals(len(outputs[1][0]), 100)
+        # Splitting large files into ranges is timed as its own stage
+        self.assertGreater(report.stage_seconds["range_split"], 0)
+
+
+class IncrementalIngestTests(TestCase):
+
+    def setUp(self):
+        """
+        Set-up method to copy test data into a temporary ingest folder
+        """
+        logging.disable(logging.CRITICAL)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = os.path.join(self.temp_dir.name, "data")
+        shutil.copytree("./emission_calculator_backend/tests/test_data/success_test_data", self.data_dir)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _run(self, **kwargs) -> IngestReport:
+        return run(
+            emission_factor_path=os.path.join(self.data_dir, "emission_factors"),
+            air_travel_path=os.path.join(self.data_dir, "air_travel"),
+            goods_services_path=os.path.join(self.data_dir, "purchased_goods_and_services"),
+            electricity_path=os.path.join(self.data_dir, "electricity"),
+            report_folder=None,
+            **kwargs,
+        )
+
+    def test_unchanged_files_skipped(self):
+        """
+        Testing re-running an ingest skips unchanged files, and does not duplicate rows
+        """
+        self._run()
+        self._run()
+
+        self.assertEquals(models.IngestManifest.objects.count(), 4)
+        self.assertEquals(models.AirTravel.objects.count(), 3)
+        self.assertEquals(models.PurchasedGoodsAndServices.objects.count(), 3)
+        self.assertEquals(models.Electricity.objects.count(), 4)
+
+    def test_changed_file_replaced(self):
+        """
+        Testing rows from a changed file are replaced, and rows from other files are kept
+        """
+        self._run()
+
+        with open(os.path.join(self.data_dir, "electricity", "mock_electricity.csv"), "w") as file:
+            file.write("Activity,Date,Country,Electricity Usage,Units\n")
+            file.write("Electricity,01/03/2023,United Kingdom,500,kWh\n")
+        self._run()
+
+        self.assertEquals(list(models.Electricity.objects.values_list("co2e", flat=True)), [100])
+        self.assertEquals(models.AirTravel.objects.count(), 3)
+
+        # Forcing a full ingest replaces rows rather than duplicating them
+        self._run(incremental=False)
+        self.assertEquals(models.Electricity.objects.count(), 1)
+        self.assertEquals(models.AirTravel.objects.count(), 3)
+
+    def test_changed_factors_upserted(self):
+        """
+        Testing a changed emission factor file updates existing factors and adds new ones, in both write modes,
+        and rows from unchanged activity files are recalculated with the updated factors
+        """
+        for write_mode in ["batch", "strict"]:
+            for model in [models.IngestManifest, models.EmissionFactors]:
+                model.objects.all().delete()
+            shutil.copy(
+                "./emission_calculator_backend/tests/test_data/success_test_data/emission_factors/"
+                "mock_emission_factors.csv",
+                os.path.join(self.data_dir, "emission_factors", "mock_emission_factors.csv"),
+            )
+            self._run(write_mode=write_mode)
+
+            factor_path = os.path.join(self.data_dir, "emission_factors", "mock_emission_factors.csv")
+            with open(factor_path) as file:
+                factors = file.read().replace("United Kingdom,kWh,0.200", "United Kingdom,kWh,0.100")
+            with open(factor_path, "w") as file:
+                file.write(factors + "\nElectricity,France,kWh,0.050,2,")
+            report = self._run(write_mode=write_mode)
+
+            self.assertEquals(
+                report.activities["emission factors"],
+                {"accepted": 8, "rejected": 0, "unmatched": 0, "added": 1, "changed": 1, "unchanged": 6},
+            )
+            self.assertEquals(models.EmissionFactors.objects.count(), 8)
+            self.assertEquals(
+                sorted(models.Electricity.objects.values_list("co2e", flat=True)), [5.0, 10.0, 19.0, 66.0],
+            )
+
+    def test_duplicate_factor_keys_rejected(self):
+        """
+        Testing the first emission factor for a repeated key is kept and later ones are rejected, with the same
+        counts whatever the batch size or write mode
+        """
+        factor_path = os.path.join(self.data_dir, "emission_factors", "mock_emission_factors.csv")
+        with open(factor_path) as file:
+            factors = file.read().rstrip("\n")
+        with open(factor_path, "w") as file:
+            file.write(factors + "\nElectricity,France,kWh,0.100,2,\nElectricity,France,kWh,0.200,2,\n")
+
+        for write_mode, batch_size in [("batch", 5000), ("batch", 1), ("strict", 5000)]:
+            for model in [models.IngestManifest, models.EmissionFactors]:
+                model.objects.all().delete()
+            report = self._run(write_mode=write_mode, batch_size=batch_size)
+
+            self.assertEquals(
+                report.activities["emission factors"],
+                {"accepted": 8, "rejected": 1, "unmatched": 0, "added": 8, "changed": 0, "unchanged": 0},
+            )
+            self.assertEquals(models.EmissionFactors.objects.get(lookup_identifier="france").co2e, 0.1)
+
+    def test_unmatched_rows_reingested(self):
+        """
+        Testing an unchanged file with rows that had no emission factor is ingested again once factors are added,
+        and unchanged files without such rows are still skipped
+        """
+        factors_path = os.path.join(self.data_dir, "emission_factors", "mock_emission_factors.csv")
+        with open(factors_path) as file:
+            factors = file.read()
+        with open(factors_path, "w") as file:
+            file.write(factors.replace("Electricity,Germany,kWh,0.300,2,\n", ""))
+
+        report = self._run()
+        self.assertEquals(models.Electricity.objects.count(), 3)
+        self.assertEquals(report.activities["electricity"]["unmatched"], 1)
+
+        with open(factors_path, "w") as file:
+            file.write(factors)
+        report = self._run()
+
+        self.assertEquals(models.Electricity.objects.get(country="germany").co2e, 66)
+        self.assertEquals(models.Electricity.objects.count(), 4)
+        self.assertEquals(report.activities["electricity"], {"accepted": 4, "rejected": 0, "unmatched": 0})
+        self.assertNotIn("air travel", report.activities)
+        self.assertFalse(models.IngestManifest.objects.filter(stale=True).exists())
+
+    def test_untracked_rows_replaced(self):
+        """
+        Testing rows ingested before files were tracked, with no manifest entry, are replaced on the first
+        folder run rather than duplicated, and later runs keep rows added without a file
+        """
+        self._run()
+        summary_rows = models.EmissionSummary.objects.order_by(*summary.SUMMARY_FIELDS).values("co2e", "rows")
+        emission_summary = list(summary_rows)
+        # Rows are unlinked from their files before the manifest is removed, as they were before the upgrade
+        for activity_model in summary.activity_models():
+            activity_model.objects.update(ingest_file=None)
+        models.IngestManifest.objects.all().delete()
+
+        self._run(incremental=True)
+
+        self.assertEquals(models.AirTravel.objects.count(), 3)
+        self.assertEquals(models.PurchasedGoodsAndServices.objects.count(), 3)
+        self.assertEquals(models.Electricity.objects.count(), 4)
+        for activity_model in summary.activity_models():
+            self.assertFalse(activity_model.objects.filter(ingest_file__isnull=True).exists())
+        self.assertEquals(list(summary_rows.all()), emission_summary)
+
+        # Once files are tracked, rows added without a file, eg through the admin, are kept by later runs
+        added_row = models.AirTravel.objects.first()
+        added_row.pk, added_row.ingest_file = None, None
+        added_row.save()
+        self._run(incremental=False)
+
+        self.assertEquals(models.AirTravel.objects.count(), 4)
+        self.assertTrue(models.AirTravel.objects.filter(pk=added_row.pk).exists())
+
+    def test_emission_summary_maintained(self):
+        """
+        Testing the emission summary matches the activity rows after an ingest, a changed file replacing rows,
+        and a changed emission factor recalculating rows, and matches a rebuild of the summary
+        """
+        def grouped_rows():
+            return {
+                (activity_model._meta.db_table, group["activity"], group["scope"], group["category"], group["month"]):
+                    (round(group["co2e_total"], 6), group["row_count"])
+                for activity_model in summary.activity_models()
+                for group in summary._month_groups(activity_model.objects.all())
+            }
+
+        def summary_rows():
+            return {
+                (row.activity_table, row.activity, row.scope, row.category, row.month): (round(row.co2e, 6), row.rows)
+                for row in models.EmissionSummary.objects.all()
+            }
+
+        self._run()
+        self.assertEquals(summary_rows(), grouped_rows())
+        self.assertEquals(len(summary_rows()), 6)
+
+        with open(os.path.join(self.data_dir, "electricity", "mock_electricity.csv"), "w") as file:
+            file.write("Activity,Date,Country,Electricity Usage,Units\n")
+            file.write("Electricity,01/03/2023,United Kingdom,500,kWh\n")
+        self._run()
+        self.assertEquals(summary_rows(), grouped_rows())
+
+        factor_path = os.path.join(self.data_dir, "emission_factors", "mock_emission_factors.csv")
+        with open(factor_path) as file:
+            factors = file.read().replace("United Kingdom,kWh,0.200", "United Kingdom,kWh,0.100")
+        with open(factor_path, "w") as file:
+            file.write(factors)
+        self._run()
+        self.assertEquals(summary_rows(), grouped_rows())
+        self.assertEquals(
+            models.EmissionSummary.objects.get(activity_table=models.Electricity._meta.db_table).co2e, 50,
+        )
+
+        expected = summary_rows()
+        summary.rebuild()
+        self.assertEquals(summary_rows(), expected)
+
+
+class DateParserTests(TestCase):
+
+    def test_matches_strptime(self):
+        """
+        Testing parsed dates and rejected dates are the same as datetime.strptime
+        """
+        date_parser = DateParser(cache_size=16)
+        date_strings = [
+            "01/01/2023", "29/02/2024", "1/2/2023", "31/12/0999",
+            "29/02/2023", "00/01/2023", "01-01-2023", "2023-01-01", "01/01/23", "01/01/２０２３", "",
+        ]
+
+        for date_string in date_strings:
+            try:
+                expected = datetime.strptime(date_string, "%d/%m/%Y").date()
+            except ValueError:
+                with self.assertRaises(ValueError):
+                    date_parser.parse(date_string)
+                continue
+            self.assertEquals(date_parser.parse(date_string), expected)
+
+    def test_cache_stats(self):
+        """
+        Testing repeated dates are served from the cache, and the cache size is bounded
+        """
+        date_parser = DateParser(cache_size=2)
+        for date_string in ["01/01/2023", "01/01/2023", "02/01/2023", "01/01/2023", "03/01/2023"]:
+            date_parser.parse(date_string)
+
+        self.assertEquals(date_parser.stats(), {"hits": 2, "misses": 3, "size": 2, "max_size": 2})
+
+
+class BenchmarkTests(TestCase):
+
+    def test_synthetic_dataset(self):
+        """
+        Testing every row of a generated synthetic dataset matches an emission factor and is ingested
+        """
+        logging.disable(logging.CRITICAL)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            run(**generate_dataset(temp_dir, rows=300), report_folder=None)
+
+        self.assertEquals(models.EmissionFactors.objects.count(), 101)
+        self.assertEquals(models.AirTravel.objects.count(), 100)
+        self.assertEquals(models.PurchasedGoodsAndServices.objects.count(), 100)
+        self.assertEquals(models.Electricity.objects.count(), 100)
+
+
+class IngestReportTests(TestCase):
+
+    def test_run_report(self):
+        """
+        Testing the run report counts rows per activity, times every stage, and is written to a file
+        """
+        logging.disable(logging.CRITICAL)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            report = run(
+                emission_factor_path="./emission_calculator_backend/tests/test_data/success_test_data/emission_factors",
+                air_travel_path="./emission_calculator_backend/tests/test_data/success_test_data/air_travel",
+                goods_services_path="./emission_calculator_backend/tests/test_data/"
+                                    "success_test_data/purchased_goods_and_services",
+                electricity_path="./emission_calculator_backend/tests/test_data/success_test_data/electricity",
+                report_folder=temp_dir,
+            )
+            report_files = os.listdir(temp_dir)
+            self.assertEquals(len(report_files), 1)
+            with open(os.path.join(temp_dir, report_files[0])) as file:
+                self.assertEquals(json.load(file), report.to_dict())
+
+        self.assertEquals(report.status, "success")
+        self.assertEquals(list(report.stage_seconds), list(STAGES))
+        self.assertEquals(
+            report.activities["air travel"], {"accepted": 3, "rejected": 0, "unmatched": 0},
+        )
+        self.assertEquals(
+            report.activities["electricity"], {"accepted": 4, "rejected": 0, "unmatched": 0},
+        )
+
+    def test_stage_seconds_cover_run(self):
+        """
+        Testing the stage timings of a sequential run account for most of its duration, without counting any
+        time twice
+        """
+        logging.disable(logging.CRITICAL)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            report = run(**generate_dataset(temp_dir, rows=300), report_folder=None)
+
+        run_seconds = (report.finished_at - report.started_at).total_seconds()
+        stage_seconds = sum(report.stage_seconds.values())
+        self.assertGreater(stage_seconds, run_seconds * 0.8)
+        self.assertLess(stage_seconds, run_seconds + 0.01)
+
+    def test_run_stored(self):
+        """
+        Testing each run is stored in the IngestRun table, including failed runs
+        """
+        test_data_load_helper("success_test_data")
+        test_data_load_helper("incorrect_air_travel_column_test_data")
+
+        self.assertEquals(
+            list(models.IngestRun.objects.order_by("started_at").values_list("status", flat=True)),
+            ["success", "failed"],
+        )
+        self.assertEquals(
+            models.IngestRun.objects.get(status="success").report["activities"]["purchased goods and services"],
+            {"accepted": 3, "rejected": 0, "unmatched": 0},
+        )
+
+    def test_rejected_rows_sink(self):
+        """
+        Testing rejected rows are written to the run's rejects file with reason codes, from both sequential
+        and parallel ingests, and only aggregate counts and samples are logged
+        """
+        logging.disable(logging.INFO)  # Allowing ERROR logs to run assert method
+        for workers in [1, 2]:
+            models.IngestManifest.objects.all().delete()
+            models.EmissionFactors.objects.all().delete()
+
+            with tempfile.TemporaryDirectory() as temp_dir:
+                with self.assertLogs(logger="root", level="ERROR") as cm:
+                    report = test_data_load_helper("invalid_date_test_data", report_folder=temp_dir, workers=workers)
+
+                with open(report.rejects.path) as file:
+                    rejects = [json.loads(line) for line in file]
+
+            self.assertEquals(len(rejects), 7)
+            self.assertEquals(
+                report.rejects.counts,
+                {
+                    "air travel": {"invalid_row": 2},
+                    "purchased goods and services": {"invalid_row": 2},
+                    "electricity": {"invalid_row": 3},
+                },
+            )
+            self.assertEquals(report.activities["electricity"]["rejected"], 3)
+            self.assertIn(
+                {
+                    "activity": "electricity",
+                    "reason": "invalid_row",
+                    "detail": "Incorrect Air Travel datetime format. Data: 15-01-2023",
+                    "row": {
+                        "Activity": "Electricity",
+                        "Date": "15-01-2023",
+                        "Country": "United Kingdom",
+                        "Electricity Usage": "50",
+                        "Units": "kWh",
+                    },
+                },
+                rejects,
+            )
+            # Count summary, one line per sample and the rejects file path
+            self.assertEquals(len(cm.output), 9)
+
+
+class RecalculationTests(TestCase):
+
+    def test_changed_factors_recalculated(self):
+        """
+        Testing only activity rows using a changed emission factor are recalculated, new factors are added,
+        and the result matches a full ingest with the updated factors
+        """
+        logging.disable(logging.CRITICAL)
+        test_data_load_helper("success_test_data")
+        air_travel = list(models.AirTravel.objects.order_by("id").values_list("co2e", flat=True))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with open(os.path.join(temp_dir, "emission_factors.csv"), "w") as file:
+                file.write("Activity,Lookup identifiers,Unit,CO2e,Scope,Category\n")
+                file.write('Air Travel,"Long-haul, Business class",kilometres,0.050,3,6\n')
+                file.write("Purchased Goods and Services,Real estate activities,GBP,0.150,3,1\n")
+                file.write("Electricity,United Kingdom,kWh,0.100,2,\n")
+                file.write("Electricity,France,kWh,0.050,2,\n")
+                # Repeated keys are rejected, and the first factor kept, as with the emission factor ingest
+                file.write("Electricity,France,kWh,0.070,2,\n")
+                file.write("Electricity,Spain,kWh,invalid,2,\n")
+
+            # Same number of queries for any number of activity rows. Emission summary updates are one
+            # per activity, scope, category and month group
+            with self.assertNumQueries(35):
+                result = recalculate_emissions.run(temp_dir)
+
+        self.assertEquals(result["factors"], {"added": 1, "changed": 2, "rejected": 2})
+        self.assertEquals(
+            result["rows_changed"],
+            {
+                models.AirTravel._meta.db_table: 0,
+                models.PurchasedGoodsAndServices._meta.db_table: 1,
+                models.Electricity._meta.db_table: 3,
+            },
+        )
+        self.assertEquals(list(models.AirTravel.objects.order_by("id").values_list("co2e", flat=True)), air_travel)
+        self.assertEquals(
+            models.EmissionFactors.objects.get(activity="electricity", lookup_identifier="united kingdom").co2e, 0.1,
+        )
+        self.assertEquals(models.EmissionFactors.objects.get(lookup_identifier="france").co2e, 0.05)
+
+        for electricity in models.Electricity.objects.all():
+            emission_factor = models.EmissionFactors.objects.get(
+                activity="electricity", lookup_identifier=electricity.country, unit=electricity.unit,
+            )
+            self.assertEquals(electricity.co2e, emission_factor.co2e * electricity.electricity_usage)
+
+
+class ActivityRegistryTests(TestCase):
+
+    def test_registered_activity_type_ingested(self):
+        """
+        Testing an activity type declared in the registry is ingested by the ingest engine, and names
+        can only be registered once
+        """
+        logging.disable(logging.CRITICAL)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with open(os.path.join(temp_dir, "rail.csv"), "w") as file:
+                file.write("Activity,Date,Country,Electricity Usage,Units\n")
+                file.write("Rail,01/01/2023,United Kingdom,1000,kWh\n")
+                file.write("Rail,01/02/2023,France,1000,kWh\n")
+
+            activities.register(activities.ActivityType(
+                name="rail",
+                folder=temp_dir,
+                input_class=models.InputElectricity,
+                model=models.Electricity,
+                serializer_class=serializers.ElectricitySerializer,
+                lookup_field="country",
+                quantity_field="electricity_usage",
+                unit_field="unit",
+                unit_conversions={"kwh": 0.001},
+                standard_unit="mwh",
+            ))
+            try:
+                with self.assertRaises(ValueError):
+                    activities.register(activities.ActivityType(
+                        "rail", temp_dir, models.InputElectricity, models.Electricity,
+                        serializers.ElectricitySerializer, "country", "electricity_usage", "unit",
+                    ))
+                models.EmissionFactors.objects.create(
+                    activity="rail", lookup_identifier="united kingdom", unit="mwh", co2e=50, scope=3, category=6,
+                )
+                report = test_data_load_helper("success_test_data")
+            finally:
+                del activities.ACTIVITY_TYPES["rail"]
+
+        self.assertEquals(report.activities["rail"], {"accepted": 1, "rejected": 0, "unmatched": 1})
+        self.assertEquals(
+            list(models.Electricity.objects.filter(activity="rail").values_list("electricity_usage", "unit", "co2e")),
+            [(1.0, "mwh", 50.0)],
+        )
+
+
+class IngestJobTests(TestCase):
+
+    def setUp(self):
+        """
+        Set-up method to upload files to a temporary folder and start mock API client
+        """
+        logging.disable(logging.CRITICAL)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.upload_folder = config.INGEST_UPLOAD_FOLDER
+        config.INGEST_UPLOAD_FOLDER = self.temp_dir.name
+        self.client = Client()
+        self.client.cookies.load({"jwt": JWT})
+
+    def tearDown(self):
+        config.INGEST_UPLOAD_FOLDER = self.upload_folder
+        self.temp_dir.cleanup()
+
+    def _upload(self, activity: str, file_name: str, content: str) -> int:
+        # Jobs are started once the upload is committed, so are run here rather than in a worker thread
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            response = self.client.post(
+                f"/ingest/upload/?activity={activity}&file_name={file_name}", data=content, content_type="text/csv",
+            )
+        self.assertEquals(response.status_code, 202)
+        self.assertEquals(len(callbacks), 1)
+
+        job_id = json.loads(response.content)["job_id"]
+        self.assertEquals(models.IngestJob.objects.get(pk=job_id).status, jobs.QUEUED_STATUS)
+        jobs.run_job(job_id)
+        return job_id
+
+    def test_upload_job(self):
+        """
+        Testing an uploaded CSV file is written to disk and queued, and the job status reports
+        the rows processed and rejected, and the job's run report
+        """
+        base_path = "./emission_calculator_backend/tests/test_data/success_test_data/"
+        with open(os.path.join(base_path, "emission_factors", "mock_emission_factors.csv")) as file:
+            self._upload("emission factors", "factors.csv", file.read())
+
+        content = (
+            "Activity,Date,Country,Electricity Usage,Units\n"
+            "Electricity,01/01/2023,United Kingdom,100,kWh\n"
+            "Electricity,12/02/2024,Germany,220,kWh\n"
+            "Electricity,31/02/2024,Germany,220,kWh\n"
+            "Electricity,12/02/2024,France,220,kWh\n"
+        )
+        job_id = self._upload("electricity", "electricity.csv", content)
+        job = models.IngestJob.objects.get(pk=job_id)
+        with open(job.path) as file:
+            self.assertEquals(file.read(), content)
+
+        response = self.client.get(f"/ingest/jobs/{job_id}/")
+        output = json.loads(response.content)
+
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(output["status"], "success")
+        self.assertEquals(output["size"], len(content))
+        self.assertEquals((output["rows_processed"], output["rows_rejected"]), (4, 2))
+        self.assertEquals(
+            output["report"]["activities"]["electricity"], {"accepted": 2, "rejected": 1, "unmatched": 1},
+        )
+        self.assertNotIn("path", output)
+        self.assertEquals(sorted(models.Electricity.objects.values_list("co2e", flat=True)), [20.0, 66.0])
+
+    def test_upload_keeps_untracked_rows(self):
+        """
+        Testing an uploaded file only adds rows, and rows without a file, eg added through the admin, are kept
+        """
+        test_data_load_helper("success_test_data")
+        models.AirTravel.objects.update(ingest_file=None)
+
+        content = (
+            "Date,Activity,Distance travelled,Distance units,Flight range,Passenger class\n"
+            "01/01/2023,Air Travel,3800,miles,Long-haul,Business class\n"
+        )
+        job_id = self._upload("air travel", "air_travel.csv", content)
+
+        self.assertEquals(models.IngestJob.objects.get(pk=job_id).status, "success")
+        self.assertEquals(models.AirTravel.objects.filter(ingest_file__isnull=True).count(), 3)
+        self.assertEquals(models.AirTravel.objects.count(), 4)
+
+    def test_invalid_upload(self):
+        """
+        Testing uploads for an unknown activity or without a CSV file name are rejected, and
+        unknown jobs are not found
+        """
+        response = self.client.post("/ingest/upload/?activity=rail", data="Activity\n", content_type="text/csv")
+        self.assertEquals(response.status_code, 400)
+
+        response = self.client.post(
+            "/ingest/upload/?activity=electricity&file_name=electricity.txt",
+            data="Activity\n",
+            content_type="text/csv",
+        )
+        self.assertEquals(response.status_code, 400)
+
+        self.assertEquals(self.client.get("/ingest/jobs/1000/").status_code, 404)
+        self.assertEquals(models.IngestJob.objects.count(), 0)
+
+
+class JobQueueTests(TestCase):
+
+    def setUp(self):
+        """
+        Set-up method to write job files to a temporary folder
+        """
+        logging.disable(logging.CRITICAL)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.upload_folder = config.INGEST_UPLOAD_FOLDER
+        config.INGEST_UPLOAD_FOLDER = self.temp_dir.name
+        self.base_path = "./emission_calculator_backend/tests/test_data/"
+
+    def tearDown(self):
+        config.INGEST_UPLOAD_FOLDER = self.upload_folder
+        self.temp_dir.cleanup()
+
+    def test_cron_schedule(self):
+        """
+        Testing next run times of cron expressions, and invalid expressions
+        """
+        after = datetime(2024, 3, 1, 10, 7, tzinfo=timezone.utc)
+
+        self.assertEquals(
+            CronSchedule("*/15 * * * *").next_after(after), datetime(2024, 3, 1, 10, 15, tzinfo=timezone.utc),
+        )
+        # Weekdays only, so Friday's run has passed and the next is on Monday
+        self.assertEquals(
+            CronSchedule("30 2 * * 1-5").next_after(after), datetime(2024, 3, 4, 2, 30, tzinfo=timezone.utc),
+        )
+        self.assertEquals(CronSchedule("0 0 29 2 *").next_after(after), datetime(2028, 2, 29, tzinfo=timezone.utc))
+        # Day of month and day of week are both restricted, so either runs
+        self.assertEquals(CronSchedule("0 0 15 * 0").next_after(after), datetime(2024, 3, 3, tzinfo=timezone.utc))
+        # 7 is also Sunday
+        self.assertEquals(CronSchedule("0 0 * * 7").next_after(after), datetime(2024, 3, 3, tzinfo=timezone.utc))
+        self.assertEquals(CronSchedule("0 0 * * 6-7").weekdays, frozenset({6, 0}))
+
+        for expression in ["61 * * * *", "* * *", "*/0 * * * *", "5-1 * * * *", "0 0 30 2 *", "0 0 * * 8"]:
+            with self.assertRaises(ValueError):
+                CronSchedule(expression).next_after(after)
+
+    def test_claim_priority_and_concurrency(self):
+        """
+        Testing due jobs are claimed by priority, without going over each activity's concurrency limit
+        """
+        electricity = jobs.enqueue_job("electricity", self.base_path, priority=0)
+        electricity_urgent = jobs.enqueue_job("electricity", self.base_path, priority=5)
+        air_travel = jobs.enqueue_job("air travel", self.base_path, priority=1)
+        jobs.enqueue_job("air travel", self.base_path, priority=10, run_after=datetime(2100, 1, 1, tzinfo=timezone.utc))
+        factors = jobs.enqueue_job("emission factors", self.base_path, priority=-1)
+
+        self.assertEquals(queue.claim_jobs(2), [electricity_urgent.pk, air_travel.pk])
+        self.assertEquals(queue.claim_jobs(10), [factors.pk])
+        self.assertEquals(queue.claim_jobs(10), [])
+
+        config.INGEST_ACTIVITY_CONCURRENCY = {"electricity": 2}
+        try:
+            self.assertEquals(queue.claim_jobs(10), [electricity.pk])
+        finally:
+            config.INGEST_ACTIVITY_CONCURRENCY = {}
+        self.assertEquals(models.IngestJob.objects.get(pk=electricity.pk).attempts, 1)
+
+        with self.assertRaises(ValueError):
+            jobs.enqueue_job("rail", self.base_path)
+
+    def test_retry_backoff(self):
+        """
+        Testing a failed job is queued again after a backoff delay doubled for each attempt,
+        until it has been attempted max attempts times
+        """
+        job = jobs.enqueue_job(
+            "electricity", os.path.join(self.base_path, "incorrect_electricity_column_test_data", "electricity"),
+        )
+        delays = []
+        for _ in range(config.INGEST_JOB_MAX_ATTEMPTS):
+            models.IngestJob.objects.filter(pk=job.pk).update(run_after=datetime(2000, 1, 1, tzinfo=timezone.utc))
+            self.assertEquals(queue.claim_jobs(1), [job.pk])
+            job = jobs.run_job(job.pk)
+            delays.append(job.run_after - job.finished_at)
+
+        self.assertEquals(job.status, "failed")
+        self.assertEquals(job.attempts, config.INGEST_JOB_MAX_ATTEMPTS)
+        self.assertIn("Column validation failed", job.error)
+        self.assertEquals(
+            delays[:-1], [timedelta(seconds=config.INGEST_JOB_RETRY_BACKOFF * 2 ** i) for i in range(len(delays) - 1)],
+        )
+
+    def test_schedule_queues_jobs(self):
+        """
+        Testing a due schedule queues a folder ingest job, and is skipped while its previous job has not finished
+        """
+        test_data_load_helper("success_test_data")
+        schedule_config = {
+            "name": "air travel",
+            "activity": "air travel",
+            "path": os.path.join(self.base_path, "multi_file_test_data", "air_travel"),
+            "cron": "*/5 * * * *",
+        }
+        queue.sync_schedules([schedule_config])
+        schedule = models.IngestSchedule.objects.get(name="air travel")
+        self.assertGreater(schedule.next_run_at, datetime.now(timezone.utc))
+        self.assertEquals(queue.enqueue_due_schedules(), [])
+
+        models.IngestSchedule.objects.update(next_run_at=datetime(2000, 1, 1, tzinfo=timezone.utc))
+        [job] = queue.enqueue_due_schedules()
+        self.assertEquals(job.schedule_id, schedule.pk)
+        self.assertGreater(models.IngestSchedule.objects.get().next_run_at, datetime.now(timezone.utc))
+
+        models.IngestSchedule.objects.update(next_run_at=datetime(2000, 1, 1, tzinfo=timezone.utc))
+        self.assertEquals(queue.enqueue_due_schedules(), [])
+
+        queue.claim_jobs(1)
+        job = jobs.run_job(job.pk)
+        self.assertEquals(job.status, "success")
+        self.assertEquals(job.rows_processed, job.report["activities"]["air travel"]["accepted"])
+        self.assertGreater(job.rows_processed, 0)
+
+        with self.assertRaises(ValueError):
+            queue.sync_schedules([{**schedule_config, "cron": "* * * *"}])
@@ -1,23 +1,159 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Sum, Model
+from django.db import connection, transaction
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+from django.db.models import Count, DateField, IntegerField, Q, QuerySet, Sum, Model, Value
+from django.db.models.functions import Trunc
+import base64
+import binascii
+import csv
+import calendar
+from datetime import date
+from functools import wraps
+import io
+import json
 import logging
+import os
+from typing import Iterator
 
+from emission_calculator_backend import cache
 import emission_calculator_backend.models as models
+import emission_calculator_backend.serializers as serializers
+from emission_calculator_backend.ingest import jobs
+from emission_calculator_backend.ingest.activities import ACTIVITY_TYPES
+from emission_calculator_backend.ingest.queue import job_queue
+import config
 
 logger = logging.getLogger("root")
 
+# Activity tables in the emissions response. Ids are only unique within a table, so each table's position
+# is used as the source of its rows in the pagination cursor
+EMISSION_MODELS = (models.AirTravel, models.PurchasedGoodsAndServices, models.Electricity)
+EMISSION_FIELDS = ("co2e", "scope", "category", "activity")
+EXPORT_FIELDS = (*EMISSION_FIELDS, "date")
+
+# Time series bucket sizes, and the fields a time series can be split by
+TIMESERIES_INTERVALS = ("day", "week", "month", "quarter", "year")
+TIMESERIES_SPLITS = ("activity", "scope", "category")
+
+# Content type of each emissions export format
+EXPORT_CONTENT_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
 #######################
 # Helper Functions
 #######################
 
 
-def fetch_activity_query(activity_model: Model):
+def activity_model_names() -> dict:
+    """
+    Function returning the activity name of each activity table in the emissions response
+
+    :return: Dictionary of activity models keyed by activity name
+    """
+    return {
+        name: activity_type.model for name, activity_type in ACTIVITY_TYPES.items()
+        if activity_type.model in EMISSION_MODELS
+    }
+
+
+def _list_param(query_params, name: str) -> list:
+    """
+    Function returning the values of a query parameter, given more than once or comma separated
+
+    :param query_params: Request query parameters
+    :param name: Query parameter name
+
+    :return: Array of values
+    """
+    return [value.strip() for param in query_params.getlist(name) for value in param.split(",") if value.strip()]
+
+
+def parse_emission_filters(query_params) -> dict:
+    """
+    Function returning the emission row filters in a request's query parameters, eg:
+    ?date_from=2023-01-01&date_to=2023-03-31&scope=3&category=1,6&activity=air travel
+
+    :param query_params: Request query parameters
+
+    :return: Dictionary of filters, with sorted values so equal filters compare equal
+    """
+    filters = {}
+    for name in ["date_from", "date_to"]:
+        value = query_params.get(name)
+        if value:
+            try:
+                filters[name] = date.fromisoformat(value)
+            except ValueError:
+                raise ValueError(f"{name} must be a date in the format YYYY-MM-DD: '{value}'")
+    if "date_from" in filters and "date_to" in filters and filters["date_from"] > filters["date_to"]:
+        raise ValueError("date_from must not be after date_to")
+
+    for name in ["scope", "category"]:
+        values = _list_param(query_params, name)
+        if values:
+            try:
+                filters[name] = sorted({int(value) for value in values})
+            except ValueError:
+                raise ValueError(f"{name} must be integers: '{','.join(values)}'")
+
+    activities = _list_param(query_params, "activity")
+    if activities:
+        unknown = set(activities) - set(activity_model_names())
+        if unknown:
+            raise ValueError(f"activity must be one of: {', '.join(activity_model_names())}")
+        filters["activity"] = sorted(set(activities))
+    return filters
+
+
+def filtered_models(filters: dict = None) -> list:
+    """
+    Function returning the activity tables matching an activity filter, with their position in EMISSION_MODELS,
+    so tables with no matching rows are left out of the union rather than queried
+
+    :param filters: Emission row filters
+
+    :return: Array of (source, activity model) tuples
+    """
+    if not filters or "activity" not in filters:
+        return list(enumerate(EMISSION_MODELS))
+    selected = {activity_model_names()[name] for name in filters["activity"]}
+    return [
+        (source, activity_model) for source, activity_model in enumerate(EMISSION_MODELS) if activity_model in selected
+    ]
+
+
+def filter_rows(query: QuerySet, filters: dict = None) -> QuerySet:
+    """
+    Function returning an activity or emission summary query filtered by scope, category and activity
+
+    :param query: Query to filter
+    :param filters: Emission row filters
+
+    :return: Filtered query
+    """
+    filters = filters or {}
+    if "scope" in filters:
+        query = query.filter(scope__in=filters["scope"])
+    if "category" in filters:
+        query = query.filter(category__in=filters["category"])
+    if "activity" in filters:
+        query = query.filter(activity__in=filters["activity"])
+    return query
+
+
+def fetch_activity_query(activity_model: Model, filters: dict = None):
     """
     Function returning query containing activity fields
 
     :param activity_model: Django model for activity
+    :param filters: Emission row filters, applied to the table's rows
 
     :return: Activity data query
     """
@@ -28,65 +164,512 @@ def fetch_activity_query(activity_model: Model):
         "activity",
     )
 
-    return query
+    filters = filters or {}
+    if "date_from" in filters:
+        query = query.filter(date__gte=filters["date_from"])
+    if "date_to" in filters:
+        query = query.filter(date__lte=filters["date_to"])
+    return filter_rows(query, filters)
 
 
-def fetch_emission_total(activity_model: Model):
+def encode_cursor(co2e: float, source: int, row_id: int) -> str:
     """
-    Function returning total for CO2e for a specific activity
+    Function returning an opaque cursor for the position after a row
 
-    :param activity_model: Django model for activity
+    :param co2e: Row CO2e
+    :param source: Position of the row's table in EMISSION_MODELS
+    :param row_id: Row id
+
+    :return: URL safe cursor string
+    """
+    return base64.urlsafe_b64encode(json.dumps([co2e, source, row_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Function returning the row position in a cursor
+
+    :param cursor: Cursor string from a previous page
+
+    :return: (CO2e, source, id) tuple
+    """
+    try:
+        co2e, source, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(co2e), int(source), int(row_id)
+    except (binascii.Error, TypeError, ValueError):
+        raise ValueError(f"Invalid cursor: '{cursor}'")
+
+
+def fetch_emissions_page(page_size: int, cursor: tuple = None, filters: dict = None) -> tuple:
+    """
+    Function returning a page of emission rows across all activity tables, ordered by CO2e descending.
+    Pages are fetched by keyset on (CO2e, source, id), pushed down into each table's query with a limit,
+    so each page is read from the (co2e, id) indexes however deep it is, in a single query.
+    Filters are pushed down into each table's query, and tables not matching the activity filter are skipped
+
+    :param page_size: Number of rows per page
+    :param cursor: (CO2e, source, id) of the last row of the previous page, or None for the first page
+    :param filters: Emission row filters
+
+    :return: Array of emission rows, and the cursor for the next page or None for the last page
+    """
+    branches = []
+    params = []
+    for source, activity_model in filtered_models(filters):
+        query = fetch_activity_query(activity_model, filters).annotate(
+            source=Value(source, output_field=IntegerField()),
+        )
+        if cursor:
+            co2e, cursor_source, cursor_id = cursor
+            # Rows with the cursor's CO2e are ordered by source, then id
+            if source < cursor_source:
+                query = query.filter(co2e__lte=co2e)
+            elif source == cursor_source:
+                query = query.filter(Q(co2e__lt=co2e) | Q(co2e=co2e, id__lt=cursor_id))
+            else:
+                query = query.filter(co2e__lt=co2e)
+        query = query.values(*EMISSION_FIELDS, "source", "id").order_by("-co2e", "-id")[:page_size + 1]
+
+        sql, query_params = query.query.sql_with_params()
+        branches.append(f"SELECT {', '.join(EMISSION_FIELDS)}, source, id FROM ({sql})")
+        params.extend(query_params)
+
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(
+            " UNION ALL ".join(branches) + " ORDER BY co2e DESC, source DESC, id DESC LIMIT %s",
+            [*params, page_size + 1],
+        )
+        rows = db_cursor.fetchall()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        co2e, *_, source, row_id = rows[page_size - 1]
+        next_cursor = encode_cursor(co2e, source, row_id)
+    return [dict(zip(EMISSION_FIELDS, row)) for row in rows[:page_size]], next_cursor
+
+
+def fetch_emission_totals(filters: dict = None) -> dict:
+    """
+    Function returning the total CO2e for each activity table, in a single query. Totals are added up from the
+    emission summary table, which has a row per activity, scope, category and month, so do not depend on the
+    number of activity rows. The summary is by month, so totals for a date range are summed from the activity
+    tables instead, each in its own branch of a UNION ALL
+
+    :param filters: Emission row filters
+
+    :return: Dictionary of CO2e totals keyed by activity model. Empty tables total 0
+    """
+    filters = filters or {}
+    if "date_from" in filters or "date_to" in filters:
+        queries = [
+            fetch_activity_query(activity_model, filters)
+            .annotate(source=Value(source, output_field=IntegerField()))
+            .values("source")
+            .annotate(total=Sum("co2e"))
+            .values_list("source", "total")
+            for source, activity_model in filtered_models(filters)
+        ]
+        totals = dict(queries[0].union(*queries[1:], all=True))
+        return {activity_model: totals.get(source) or 0 for source, activity_model in enumerate(EMISSION_MODELS)}
+
+    # Summary rows are added up here in month order, rather than with SUM in the order the database reads them,
+    # so float totals are the same whichever index or plan is used
+    totals = {}
+    for activity_table, co2e in (
+        filter_rows(models.EmissionSummary.objects, filters)
+        .order_by("activity_table", "month", "scope", "category")
+        .values_list("activity_table", "co2e")
+    ):
+        totals[activity_table] = totals.get(activity_table, 0) + co2e
+
+    return {activity_model: totals.get(activity_model._meta.db_table) or 0 for activity_model in EMISSION_MODELS}
+
+
+def summary_covers(interval: str, filters: dict) -> bool:
+    """
+    Function returning whether a time series can be read from the emission summary table, which has a row per
+    month. Buckets must be whole months, and any date range must start and end on month boundaries
+
+    :param interval: Time series bucket size
+    :param filters: Emission row filters
+
+    :return: True if the summary table can be used
+    """
+    if interval not in ("month", "quarter", "year"):
+        return False
+    date_from, date_to = filters.get("date_from"), filters.get("date_to")
+    if date_from and date_from.day != 1:
+        return False
+    if date_to and date_to.day != calendar.monthrange(date_to.year, date_to.month)[1]:
+        return False
+    return True
+
+
+def fetch_emission_timeseries(interval: str, split_by: str = None, filters: dict = None) -> list:
+    """
+    Function returning the total CO2e and row count in each time bucket, optionally split by activity, scope or
+    category, in a single grouped query. Month, quarter and year buckets are grouped from the emission summary
+    table. Day and week buckets, or date ranges not on month boundaries, are grouped in each activity table's
+    branch of a UNION ALL, and buckets found in more than one table are added together
+
+    :param interval: Bucket size, one of TIMESERIES_INTERVALS
+    :param split_by: Field buckets are split by, one of TIMESERIES_SPLITS, or None
+    :param filters: Emission row filters
+
+    :return: Array of buckets, ordered by period
+    """
+    filters = filters or {}
+    group_fields = ["period", split_by] if split_by else ["period"]
+
+    if summary_covers(interval, filters):
+        query = filter_rows(models.EmissionSummary.objects.order_by(), filters)
+        if "date_from" in filters:
+            query = query.filter(month__gte=filters["date_from"])
+        if "date_to" in filters:
+            query = query.filter(month__lte=filters["date_to"])
+        rows = (
+            query.annotate(period=Trunc("month", interval, output_field=DateField()))
+            .values(*group_fields)
+            .annotate(co2e=Sum("co2e"), rows=Sum("rows"))
+        )
+    else:
+        queries = [
+            fetch_activity_query(activity_model, filters)
+            .order_by()
+            .annotate(period=Trunc("date", interval, output_field=DateField()))
+            .values(*group_fields)
+            .annotate(co2e=Sum("co2e"), rows=Count("id"))
+            for _, activity_model in filtered_models(filters)
+        ]
+        rows = queries[0].union(*queries[1:], all=True)
+
+    buckets = {}
+    for row in rows:
+        key = tuple(row[field] for field in group_fields)
+        bucket = buckets.setdefault(key, {**{field: row[field] for field in group_fields}, "co2e": 0, "rows": 0})
+        bucket["co2e"] += row["co2e"]
+        bucket["rows"] += row["rows"]
+
+    # Empty categories are ordered first
+    return sorted(
+        buckets.values(),
+        key=lambda bucket: tuple((bucket[field] is not None, bucket[field]) for field in group_fields),
+    )
+
+
+def fetch_emission_chunks(chunk_size: int, filters: dict = None) -> Iterator[list]:
+    """
+    Generator returning every emission row across all activity tables, in chunks. The union query is read
+    through a chunked cursor (a server-side cursor where the database supports one), so only one chunk is
+    held in memory at a time. Rows are returned in table order, rather than sorted by CO2e
+
+    :param chunk_size: Number of rows fetched at a time
+    :param filters: Emission row filters
+
+    :return: Iterator of arrays of row tuples, with the values of EXPORT_FIELDS
+    """
+    branches = []
+    params = []
+    for _, activity_model in filtered_models(filters):
+        sql, query_params = fetch_activity_query(activity_model, filters).values(*EXPORT_FIELDS).query.sql_with_params()
+        branches.append(sql)
+        params.extend(query_params)
+
+    with connection.chunked_cursor() as db_cursor:
+        db_cursor.execute(" UNION ALL ".join(branches), params)
+        while rows := db_cursor.fetchmany(chunk_size):
+            yield rows
+
+
+def stream_json(chunks: Iterator[list]) -> Iterator[str]:
+    """
+    Generator returning emission rows as a JSON array, one chunk of rows at a time
+
+    :param chunks: Iterator of arrays of row tuples
 
-    :return: CO2e total
+    :return: Iterator of JSON strings
     """
-    db_total = activity_model.objects.aggregate(Sum("co2e"))["co2e__sum"]
+    separator = "["
+    for rows in chunks:
+        yield separator + ",".join(json.dumps(dict(zip(EXPORT_FIELDS, row)), default=str) for row in rows)
+        separator = ","
+    yield "[]" if separator == "[" else "]"
 
-    total = db_total if db_total else 0
 
-    return total
+def stream_ndjson(chunks: Iterator[list]) -> Iterator[str]:
+    """
+    Generator returning emission rows as newline delimited JSON, one chunk of rows at a time
+
+    :param chunks: Iterator of arrays of row tuples
+
+    :return: Iterator of NDJSON strings
+    """
+    for rows in chunks:
+        yield "".join(json.dumps(dict(zip(EXPORT_FIELDS, row)), default=str) + "\n" for row in rows)
+
+
+def stream_csv(chunks: Iterator[list]) -> Iterator[str]:
+    """
+    Generator returning emission rows as CSV with a header row, one chunk of rows at a time
+
+    :param chunks: Iterator of arrays of row tuples
+
+    :return: Iterator of CSV strings
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    yield buffer.getvalue()
+
+    for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+
+EXPORT_WRITERS = {
+    "json": stream_json,
+    "ndjson": stream_ndjson,
+    "csv": stream_csv,
+}
+
+
+def logged_stream(stream: Iterator[str]) -> Iterator[str]:
+    """
+    Generator logging errors raised while a response is streamed, as the status code has already been sent
+
+    :param stream: Iterator of response content
+
+    :return: Iterator of response content
+    """
+    try:
+        yield from stream
+    except Exception as e:
+        logger.error(f"Error occurred during emissions export, see: {e}")
+        raise
+
+
+def revalidated(response: Response) -> Response:
+    """
+    Function to mark a response as revalidated by browsers before each use, so they send the ETag back
+    in an If-None-Match header rather than refetching the payload
+
+    :param response: API response
+
+    :return: API response
+    """
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def versioned_condition(view_func):
+    """
+    Decorator answering requests with a matching If-None-Match header with 304 Not Modified, using an ETag
+    for the emissions data version and the request's query parameters. Only successful responses keep
+    the ETag, so an error response, eg for invalid query parameters, is never revalidated by a browser
+    """
+    conditional_view = condition(etag_func=cache.versioned_etag)(view_func)
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        response = conditional_view(request, *args, **kwargs)
+        if response.status_code not in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            del response["ETag"]
+        return response
+    return _wrapped_view
 
 #######################
 # API Views
 #######################
 
 
+@versioned_condition
 @api_view(["GET"])
 def emissions(request) -> Response:
     """
-    Function returning emission data for each activity
+    Function returning a page of emission data across activities, ordered by CO2e descending.
+    The next page is requested with the returned cursor, eg:
+    GET /emissions/?cursor=<next_cursor>&page_size=1000
+    Rows can be filtered by date range, scope, category and activity, eg:
+    GET /emissions/?date_from=2023-01-01&date_to=2023-03-31&scope=3&activity=air travel
+    Totals of the filtered rows are returned with the first page. Responses are served from the response
+    cache until the next ingest changes the data version, and requests with a matching If-None-Match header
+    are answered with 304 Not Modified before the view runs
     """
     try:
-        # Query for all air travel emission info
-        air_travel = fetch_activity_query(models.AirTravel)
-
-        # Query for all purchased goods and services emission info
-        purchased_goods_and_services = fetch_activity_query(models.PurchasedGoodsAndServices)
-
-        # Query for all electricity emission info
-        electricity = fetch_activity_query(models.Electricity)
+        page_size = int(request.query_params.get("page_size", config.EMISSIONS_PAGE_SIZE))
+        if not 1 <= page_size <= config.EMISSIONS_MAX_PAGE_SIZE:
+            raise ValueError(f"Page size must be between 1 and {config.EMISSIONS_MAX_PAGE_SIZE}")
+        cursor = request.query_params.get("cursor")
+        cursor = decode_cursor(cursor) if cursor else None
+        filters = parse_emission_filters(request.query_params)
+    except ValueError as e:
+        return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Union all tables together
-        output = air_travel.union(purchased_goods_and_services, electricity, all=True).order_by("-co2e")
-
-        # Calculate total CO2e values for each activity. If None is returned, default to 0
-        air_travel_total = fetch_emission_total(models.AirTravel)
-        purchased_goods_and_services_total = fetch_emission_total(models.PurchasedGoodsAndServices)
-        electricity_total = fetch_emission_total(models.Electricity)
-
-        # Calculate total CO2e across all activities
-        total = air_travel_total + purchased_goods_and_services_total + electricity_total
+    try:
+        # Responses are cached by data version, so a repeated request is a lookup until the next ingest
+        cache_key = cache.response_cache.key("emissions", cache.data_version(), page_size, cursor, filters)
+        response = cache.response_cache.get(cache_key)
+        if response is not None:
+            return revalidated(Response(response, headers={"X-Cache": "HIT"}))
 
+        emissions_array, next_cursor = fetch_emissions_page(page_size, cursor, filters)
         response = {
             "emissions": {
-                "emissions_array": list(output),
+                "emissions_array": emissions_array,
+                "next_cursor": next_cursor,
+            },
+        }
+
+        if cursor is None:
+            # Calculate total CO2e values for each activity in one query. Empty tables total 0
+            totals = fetch_emission_totals(filters)
+            air_travel_total = totals[models.AirTravel]
+            purchased_goods_and_services_total = totals[models.PurchasedGoodsAndServices]
+            electricity_total = totals[models.Electricity]
+
+            response["emissions"].update({
                 "total_air_travel_co2e": air_travel_total,
                 "total_purchased_goods_and_services_co2e": purchased_goods_and_services_total,
                 "total_electricity_co2e": electricity_total,
-                "total_co2e": total,
-            },
+                # Calculate total CO2e across all activities
+                "total_co2e": air_travel_total + purchased_goods_and_services_total + electricity_total,
+            })
+
+        cache.response_cache.set(cache_key, response)
+        return revalidated(Response(response, headers={"X-Cache": "MISS"}))
+    except Exception as e:
+        logger.error(f"Internal server error occurred, see: {e}")
+        return Response({"message": "Internal server error"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@versioned_condition
+@api_view(["GET"])
+def emissions_timeseries(request) -> Response:
+    """
+    Function returning the total CO2e in each day, week, month, quarter or year, optionally split by activity,
+    scope or category, eg:
+    GET /emissions/timeseries/?interval=month&split_by=activity
+    Rows are filtered with the same query parameters as the emissions response
+    """
+    interval = request.query_params.get("interval", "month")
+    split_by = request.query_params.get("split_by") or None
+    try:
+        if interval not in TIMESERIES_INTERVALS:
+            raise ValueError(f"Interval must be one of: {', '.join(TIMESERIES_INTERVALS)}")
+        if split_by is not None and split_by not in TIMESERIES_SPLITS:
+            raise ValueError(f"Split by must be one of: {', '.join(TIMESERIES_SPLITS)}")
+        filters = parse_emission_filters(request.query_params)
+    except ValueError as e:
+        return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        cache_key = cache.response_cache.key("timeseries", cache.data_version(), interval, split_by, filters)
+        response = cache.response_cache.get(cache_key)
+        if response is not None:
+            return revalidated(Response(response, headers={"X-Cache": "HIT"}))
+
+        response = {
+            "interval": interval,
+            "split_by": split_by,
+            "timeseries": [
+                {**bucket, "period": bucket["period"].isoformat()}
+                for bucket in fetch_emission_timeseries(interval, split_by, filters)
+            ],
         }
 
-        return Response(response)
+        cache.response_cache.set(cache_key, response)
+        return revalidated(Response(response, headers={"X-Cache": "MISS"}))
     except Exception as e:
         logger.error(f"Internal server error occurred, see: {e}")
         return Response({"message": "Internal server error"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@versioned_condition
+@api_view(["GET"])
+def emissions_export(request, export_format: str):
+    """
+    Function to stream every emission row as a JSON array, NDJSON or CSV file, eg:
+    GET /emissions/export/ndjson/?scope=2
+    Rows are filtered with the same query parameters as the emissions response, and are written to the client
+    as they are read, so memory use does not grow with the number of rows
+    """
+    if export_format not in EXPORT_WRITERS:
+        return Response(
+            {"message": f"Export format must be one of: {', '.join(EXPORT_WRITERS)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        filters = parse_emission_filters(request.query_params)
+    except ValueError as e:
+        return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    chunks = fetch_emission_chunks(config.EMISSIONS_EXPORT_CHUNK_SIZE, filters)
+    response = StreamingHttpResponse(
+        logged_stream(EXPORT_WRITERS[export_format](chunks)), content_type=EXPORT_CONTENT_TYPES[export_format],
+    )
+    response["Content-Disposition"] = f'attachment; filename="emissions.{export_format}"'
+    return revalidated(response)
+
+
+@api_view(["GET"])
+def response_cache_stats(request) -> Response:
+    """
+    Function returning the current emissions data version, and the response cache metrics of this process
+    """
+    return Response({"data_version": cache.data_version(), **cache.response_cache.stats()})
+
+
+@api_view(["POST"])
+def ingest_upload(request) -> Response:
+    """
+    Function to upload a CSV file as the request body, and queue an ingest job for it.
+    The activity, file name and an optional job priority are given as query parameters, eg:
+    POST /ingest/upload/?activity=electricity&file_name=electricity_2024.csv&priority=10
+    """
+    activity = request.query_params.get("activity")
+    if activity not in jobs.job_activities():
+        return Response(
+            {"message": f"Activity must be one of: {', '.join(jobs.job_activities())}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    file_name = os.path.basename(request.query_params.get("file_name", "upload.csv"))
+    if os.path.splitext(file_name)[1] != ".csv":
+        return Response({"message": "File name must have a .csv extension"}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        priority = int(request.query_params.get("priority", 0))
+    except ValueError:
+        return Response({"message": "Priority must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Request body is read from the stream in chunks, and never parsed into memory
+    if request.stream is None:
+        return Response({"message": "No file uploaded"}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        job = jobs.create_job(activity, file_name, request.stream, priority)
+        # Queue is woken once the job is committed, so the dispatcher can claim it
+        transaction.on_commit(job_queue.wake)
+    except Exception as e:
+        logger.error(f"Internal server error occurred, see: {e}")
+        return Response({"message": "Internal server error"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    return Response({"job_id": job.pk, "status": job.status}, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(["GET"])
+def ingest_job(request, job_id: int) -> Response:
+    """
+    Function returning the status, row counts and run report of an ingest job
+    """
+    try:
+        job = models.IngestJob.objects.get(pk=job_id)
+    except models.IngestJob.DoesNotExist:
+        return Response({"message": "Ingest job not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    response = serializers.IngestJobSerializer(job).data
+    # Row counts of a running job are read live from the worker
+    response.update(jobs.job_progress(job))
+    return Response(response)
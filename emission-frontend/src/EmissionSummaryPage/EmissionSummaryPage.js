@@ -24,11 +24,21 @@ export default function EmissionsPage() {
 
         setEmissions(data.emissions.emissions_array)
 
+        // Totals are only returned with the first page
         setTotalEmissions(data.emissions.total_co2e.toFixed(3))
 
         setTotalAirEmissions(data.emissions.total_air_travel_co2e.toFixed(3))
         setTotalGoodsAndServicesEmissions(data.emissions.total_purchased_goods_and_services_co2e.toFixed(3))
         setTotalElectricityEmissions(data.emissions.total_electricity_co2e.toFixed(3))
+
+        // Remaining pages are appended to the table as they arrive
+        let cursor = data.emissions.next_cursor
+        while (cursor) {
+            const pageResponse = await GetEmissions(cursor)
+            const page = await pageResponse.json()
+            setEmissions(emissions => emissions.concat(page.emissions.emissions_array))
+            cursor = page.emissions.next_cursor
+        }
     }
     useEffect(() => {
         getData()
@@ -13,10 +13,19 @@ function handleResponse(res) {
     return res;
   }  
 
-function GetEmissions() {
-    return fetch(BASE_URL + 'emissions/', {
+function GetEmissions(cursor, filters = {}) {
+    // Rows are filtered on the server, eg { scope: 3, date_from: '2023-01-01' }.
+    // Pages after the first are requested with the previous page's cursor
+    const params = new URLSearchParams(filters);
+    if (cursor) {
+        params.set('cursor', cursor);
+    }
+    const query = params.toString() ? '?' + params.toString() : '';
+    // Cached responses are revalidated with their ETag, so unchanged data is not downloaded again
+    return fetch(BASE_URL + 'emissions/' + query, {
         method: 'GET',
         credentials: 'include',
+        cache: 'no-cache',
     })
     .then(res => handleResponse(res))
     .then(data => {